@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark panel serialization: the legacy per-panel JSON export (per-value
+Python loops, every shared symbol converted once per panel) against the
+vectorized store encoding used by write_store().
+
+Usage:
+  python3 benchmarks/bench_export.py
+  python3 benchmarks/bench_export.py --tickers 1500 --days 1260 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_data  # noqa: E402
+from synthetic import synthetic_frames, synthetic_panels, synthetic_tickers  # noqa: E402
+
+
+def legacy_build_panel_json(panel, all_data):
+    """The pre-store build_panel_json(), kept verbatim as the benchmark baseline."""
+    close_data = all_data["Close"]
+    open_data = all_data["Open"]
+    high_data = all_data["High"]
+    low_data = all_data["Low"]
+    volume_data = all_data.get("Volume")
+
+    dates = [d.strftime("%Y-%m-%d") for d in close_data.index]
+
+    prices = {}
+    ohlc = {}
+    volume = {}
+    included_symbols = []
+
+    def to_list(series):
+        result = []
+        for val in series:
+            if val is not None and not (isinstance(val, float) and val != val):
+                result.append(round(float(val), 4))
+            else:
+                result.append(None)
+        return result
+
+    for sym in panel["symbols"]:
+        col = sym if sym in close_data.columns else None
+        if col is not None:
+            prices[sym] = to_list(close_data[col])
+            sym_ohlc = {}
+            if open_data is not None and col in open_data.columns:
+                sym_ohlc["o"] = to_list(open_data[col])
+            if high_data is not None and col in high_data.columns:
+                sym_ohlc["h"] = to_list(high_data[col])
+            if low_data is not None and col in low_data.columns:
+                sym_ohlc["l"] = to_list(low_data[col])
+            if sym_ohlc:
+                ohlc[sym] = sym_ohlc
+            if volume_data is not None and col in volume_data.columns:
+                vol_list = []
+                for val in volume_data[col]:
+                    if val is not None and not (isinstance(val, float) and val != val):
+                        vol_list.append(int(val))
+                    else:
+                        vol_list.append(None)
+                volume[sym] = vol_list
+            included_symbols.append(sym)
+
+    return {
+        "title": panel["title"],
+        "baseSymbol": panel["baseSymbol"],
+        "symbols": included_symbols,
+        "dates": dates,
+        "prices": prices,
+        "ohlc": ohlc,
+        "volume": volume,
+    }
+
+
+def run_legacy(all_data, panels):
+    total = 0
+    for panel in panels:
+        total += len(json.dumps(legacy_build_panel_json(panel, all_data)))
+    return total
+
+
+def run_vectorized(all_data, panels):
+    symbols = list(dict.fromkeys(s for p in panels for s in p["symbols"]))
+    _, chunks = fetch_data.encode_store_columns(all_data, symbols)
+    return sum(len(payload) for *_, payload in chunks)
+
+
+def best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs vectorized panel serialization.")
+    parser.add_argument("--tickers", type=int, default=1500)
+    parser.add_argument("--days", type=int, default=1260)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    all_data = synthetic_frames(args.tickers, args.days)
+    panels = synthetic_panels(synthetic_tickers(args.tickers))
+    n_refs = sum(len(p["symbols"]) for p in panels)
+    print(f"Synthetic frame: {args.tickers} tickers x {args.days} days, "
+          f"{len(panels)} panels ({n_refs} symbol references)")
+
+    legacy_s, legacy_bytes = best_of(lambda: run_legacy(all_data, panels), args.repeat)
+    vector_s, vector_bytes = best_of(lambda: run_vectorized(all_data, panels), args.repeat)
+
+    print(f"  legacy per-panel JSON : {legacy_s:7.3f} s  {legacy_bytes / 1e6:8.1f} MB")
+    print(f"  vectorized store      : {vector_s:7.3f} s  {vector_bytes / 1e6:8.1f} MB")
+    print(f"  speedup               : {legacy_s / vector_s:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark one live-mode tick without network access: RandomWalkQuoteProvider
+serves quotes for a synthetic universe, LiveSession.poll() computes the diff,
+and the diff is encoded as the SSE message the dashboard receives. Reports the
+poll and encode times per tick and the size of a diff against the snapshot a
+new client is sent.
+
+Usage:
+  python3 benchmarks/bench_live.py
+  python3 benchmarks/bench_live.py --tickers 1500 --ticks 50 --active 0.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_data  # noqa: E402
+from synthetic import synthetic_frames  # noqa: E402
+
+DEFAULT_SIZES = [500, 1500, 5000]
+
+
+def sse_bytes(messages):
+    """Encoded size of updates_since() messages, as LiveRequestHandler writes them."""
+    total = 0
+    for event, payload in messages:
+        data = json.dumps(payload, separators=(",", ":"))
+        total += len(f"id: {payload['seq']}\nevent: {event}\ndata: {data}\n\n".encode())
+    return total
+
+
+def bench_size(n, ticks, active, seed):
+    """(poll ms, encode ms, diff KB, snapshot KB) averaged over `ticks` polls."""
+    close = synthetic_frames(n, 2, seed=seed)["Close"]
+    provider = fetch_data.RandomWalkQuoteProvider(close.iloc[-1].to_dict(), "2026-03-16",
+                                                  active=active, seed=seed)
+    session = fetch_data.LiveSession({"symbols": {sym: {} for sym in close.columns}}, provider)
+    session.poll()  # the first poll opens every bar
+
+    poll_s = encode_s = 0.0
+    diff_bytes = 0
+    for _ in range(ticks):
+        seq = session.seq
+        started = time.perf_counter()
+        session.poll()
+        poll_s += time.perf_counter() - started
+        started = time.perf_counter()
+        messages, _ = session.updates_since(seq)
+        diff_bytes += sse_bytes(messages)
+        encode_s += time.perf_counter() - started
+    snapshot = sse_bytes(session.updates_since(-1)[0])
+    return poll_s / ticks * 1000, encode_s / ticks * 1000, diff_bytes / ticks / 1024, snapshot / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of one live-mode tick.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="universe sizes to run (default 500 1500 5000)")
+    parser.add_argument("--ticks", type=int, default=20, help="polls per size")
+    parser.add_argument("--active", type=float, default=0.3,
+                        help="share of tickers whose bar moves on each poll (default 0.3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"  {'tickers':>7} {'poll ms':>8} {'encode ms':>10} {'diff KB':>8} {'snapshot KB':>12}")
+    for n in sorted(args.tickers):
+        poll_ms, encode_ms, diff_kb, snapshot_kb = bench_size(n, args.ticks, args.active, args.seed)
+        print(f"  {n:>7} {poll_ms:>8.2f} {encode_ms:>10.2f} {diff_kb:>8.1f} {snapshot_kb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fetch_data.py pipeline end to end without network access.
+
+Synthetic (or recorded) yfinance-shaped frames are served through the real
+DownloadScheduler by SyntheticProvider, and full_refresh() / incremental_update()
+run against a temporary data directory. Each scenario is recorded with the same
+RunReport the production run writes to logs/run_report.json, so stage names
+match between the two:
+
+  full-cold     full refresh with an empty raw cache (download, merge, store, analytics)
+  full-warm     full refresh with every ticker cached today (cache read + merge)
+  incremental   append the held-out last days as day files
+
+Peak RSS is a process high-water mark, so sizes run smallest first and the
+figures of a size include whatever earlier sizes left behind.
+
+Recorded frames: --frames DIR replays a raw cache directory (e.g. cache/ from a
+real run) instead of synthetic data, taking up to --tickers tickers from it.
+
+Usage:
+  python3 benchmarks/bench_pipeline.py                         # 500, 1500 and 5000 tickers
+  python3 benchmarks/bench_pipeline.py --tickers 1500 --days 1260
+  python3 benchmarks/bench_pipeline.py --frames cache/ --tickers 500
+  python3 benchmarks/bench_pipeline.py --save baseline.json
+  python3 benchmarks/bench_pipeline.py --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_data  # noqa: E402
+from synthetic import SyntheticProvider, synthetic_frames, synthetic_panels  # noqa: E402
+
+DEFAULT_SIZES = [500, 1500, 5000]
+HELD_OUT_DAYS = 5             # trailing days withheld from the full refresh for the incremental run
+MIN_COMPARED_SECONDS = 0.05   # stages faster than this are too noisy to flag
+
+
+def recorded_frames(root, n_tickers):
+    """Up to `n_tickers` tickers of a raw cache directory as fetch_all_data() frames."""
+    cache = fetch_data.RawCache(root)
+    history = {}
+    for ticker in sorted(cache.meta["tickers"]):
+        frame = cache.get(ticker)
+        if frame is not None and not frame.empty:
+            history[ticker] = frame
+        if len(history) == n_tickers:
+            break
+    if not history:
+        sys.exit(f"No cached tickers found in {root}")
+    index = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in history.values()))))
+    return {
+        field: pd.DataFrame({ticker: frame[field] for ticker, frame in history.items()}).reindex(index)
+        for field in fetch_data.OHLCV_FIELDS
+    }
+
+
+def use_data_root(root):
+    """Point every path fetch_data writes to at `root`."""
+    fetch_data.DATA_DIR = os.path.join(root, "data")
+    fetch_data.LAST_FULL_REFRESH_FILE = os.path.join(fetch_data.DATA_DIR, ".last_full_refresh")
+    fetch_data.NAMES_FILE = os.path.join(fetch_data.DATA_DIR, "stock_names.json")
+    fetch_data.STORE_DIR = os.path.join(fetch_data.DATA_DIR, "store")
+    fetch_data.STORE_MANIFEST = os.path.join(fetch_data.STORE_DIR, "manifest.json")
+    fetch_data.CACHE_DIR = os.path.join(root, "cache")
+    fetch_data.CACHE_META = os.path.join(fetch_data.CACHE_DIR, "meta.json")
+    os.makedirs(fetch_data.DATA_DIR, exist_ok=True)
+
+
+def run_scenario(name, fn, verbose):
+    """Run one pipeline call under a fresh RunReport and return the report dict."""
+    report = fetch_data.start_run_report(name)
+    out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with out:
+        fn()
+    report.status = "ok"
+    return report.to_dict()
+
+
+def bench_size(frames, verbose):
+    """All scenarios for one universe. Returns {scenario: report dict}."""
+    tickers = list(frames["Close"].columns)
+    held_out = frames["Close"].index[-HELD_OUT_DAYS:]
+    history = {field: frame.drop(index=held_out) for field, frame in frames.items()}
+    provider = SyntheticProvider(history)
+    scheduler = fetch_data.DownloadScheduler(provider=provider, rate=1e9, burst=1e9, backoff=0)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        use_data_root(root)
+        fetch_data.PANELS = synthetic_panels(tickers)
+        # Known names keep fetch_company_names() from going to the network
+        with open(fetch_data.NAMES_FILE, "w") as f:
+            json.dump({sym: f"{sym} Corp" for sym in tickers}, f)
+
+        results["full-cold"] = run_scenario(
+            "full-cold", lambda: fetch_data.full_refresh(scheduler=scheduler), verbose)
+        results["full-warm"] = run_scenario(
+            "full-warm", lambda: fetch_data.full_refresh(scheduler=scheduler), verbose)
+        provider.frames = frames
+        results["incremental"] = run_scenario(
+            "incremental", lambda: fetch_data.incremental_update(scheduler=scheduler), verbose)
+    fetch_data.start_run_report(None)
+    return results
+
+
+def print_results(label, results):
+    print(f"\n{label}")
+    print(f"  {'scenario':<12} {'stage':<18} {'calls':>5} {'wall s':>8} {'cpu s':>8} "
+          f"{'peak MB':>8} {'+MB':>6} {'written KB':>11}")
+    for scenario, report in results.items():
+        for stage in report["stages"]:
+            peak = stage["peak_rss_mb"]
+            print(f"  {scenario:<12} {stage['name']:<18} {stage['calls']:>5} {stage['wall_s']:>8.3f} "
+                  f"{stage['cpu_s']:>8.3f} {peak if peak is not None else 'n/a':>8} "
+                  f"{stage['rss_growth_mb']:>6} {stage['bytes_written'] / 1024:>11.0f}")
+        print(f"  {scenario:<12} {'total':<18} {'':>5} {report['wall_s']:>8.3f} {report['cpu_s']:>8.3f} "
+              f"{report['peak_rss_mb'] if report['peak_rss_mb'] is not None else 'n/a':>8} {'':>6} "
+              f"{report['bytes_written'] / 1024:>11.0f}")
+
+
+def compare(results, baseline, tolerance):
+    """Stage wall times more than `tolerance` slower than the baseline, as lines."""
+    slower = []
+    for size, scenarios in baseline.items():
+        for scenario, report in scenarios.items():
+            current = results.get(size, {}).get(scenario)
+            if current is None:
+                continue
+            now = {stage["name"]: stage["wall_s"] for stage in current["stages"]}
+            for stage in report["stages"]:
+                before = stage["wall_s"]
+                after = now.get(stage["name"])
+                if after is None or max(before, after) < MIN_COMPARED_SECONDS:
+                    continue
+                if after > before * (1 + tolerance):
+                    slower.append(f"  {size} {scenario} {stage['name']}: {before:.3f}s -> {after:.3f}s "
+                                  f"(+{after / before - 1:.0%})" if before else
+                                  f"  {size} {scenario} {stage['name']}: new cost {after:.3f}s")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the fetch_data.py pipeline stages.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="universe sizes to run (default 500 1500 5000)")
+    parser.add_argument("--days", type=int, default=1260, help="trading days of synthetic history")
+    parser.add_argument("--frames", help="replay a raw cache directory instead of synthetic data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from --save; exit 1 on stage regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown per stage with --compare (default 0.25)")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    results = {}
+    for n in sorted(args.tickers):
+        if args.frames:
+            frames = recorded_frames(args.frames, n)
+            source = f"recorded ({args.frames})"
+        else:
+            frames = synthetic_frames(n, args.days + HELD_OUT_DAYS, seed=args.seed)
+            source = "synthetic"
+        size = len(frames["Close"].columns)
+        results[str(size)] = bench_size(frames, args.verbose)
+        print_results(f"{size} tickers x {len(frames['Close'])} days, {source}", results[str(size)])
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.tolerance)
+        if slower:
+            print(f"\nStages slower than {args.compare} by more than {args.tolerance:.0%}:")
+            print("\n".join(slower))
+            sys.exit(1)
+        print(f"\nNo stage slower than {args.compare} by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
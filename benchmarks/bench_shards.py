@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark a sharded fetch plus merge against a single run, without network access.
+
+SyntheticProvider serves the same frames to an unsharded pipeline and to N
+`--shard i/N` fetches whose outputs are then merged. Both produce data/ in
+their own temporary directory; the script times each shard and the merge, sizes
+the shard outputs, and checks that the two stores are byte-identical, first after
+a full refresh and then after an incremental update of the held-out last days.
+Before the incremental merge half of the raw cache is deleted, so the import
+takes those tickers' history from the store.
+
+  --drop I   delete shard I's output before the first merge to see the report
+             of a missing shard (the merge is expected to refuse)
+  --flaky P, --errors P
+             serve all-NaN columns / raise on that share of batch requests, so
+             both runs lean on the scheduler's per-ticker retries
+
+Usage:
+  python3 benchmarks/bench_shards.py
+  python3 benchmarks/bench_shards.py --tickers 1500 --shards 8
+  python3 benchmarks/bench_shards.py --drop 3
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_data  # noqa: E402
+from bench_pipeline import HELD_OUT_DAYS, use_data_root  # noqa: E402
+from synthetic import SyntheticProvider, synthetic_frames, synthetic_panels  # noqa: E402
+
+
+def quiet(fn, *args, verbose=False, **kwargs):
+    """Call fn with its output suppressed unless verbose; returns (result, seconds)."""
+    out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with out:
+        result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def tree_hashes(root):
+    """{relative path: sha1} of every file under data/, the manifest without its
+    "updated" timestamp."""
+    hashes = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            if name.startswith("."):
+                continue  # .last_full_refresh
+            path = os.path.join(folder, name)
+            with open(path, "rb") as f:
+                payload = f.read()
+            if path == fetch_data.STORE_MANIFEST:
+                manifest = json.loads(payload)
+                manifest.pop("updated", None)
+                payload = json.dumps(manifest, sort_keys=True).encode()
+            hashes[os.path.relpath(path, root)] = hashlib.sha1(payload).hexdigest()
+    return hashes
+
+
+def drop_half_cache():
+    """Delete every other raw cache entry, as on a runner whose cache was evicted."""
+    cache = fetch_data.RawCache()
+    for ticker in sorted(cache.meta["tickers"])[::2]:
+        del cache.meta["tickers"][ticker]
+        os.remove(cache.path(ticker))
+    cache.save()
+
+
+def tree_size(root):
+    return sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, files in os.walk(root) for name in files)
+
+
+def run_single(root, provider, mode, verbose):
+    use_data_root(root)
+    scheduler = fetch_data.DownloadScheduler(provider=provider, rate=1e9, burst=1e9, backoff=0)
+    fn = fetch_data.full_refresh if mode == "full" else fetch_data.incremental_update
+    _, seconds = quiet(fn, scheduler=scheduler, verbose=verbose)
+    return seconds
+
+
+def run_sharded(root, provider, count, mode, verbose, drop=None):
+    """Fetch every shard, optionally drop one, merge.
+    Returns (shard seconds, shard output bytes, merge seconds)."""
+    use_data_root(root)
+    shard_dir = os.path.join(root, "shards")
+    scheduler = fetch_data.DownloadScheduler(provider=provider, rate=1e9, burst=1e9, backoff=0)
+    shard_s = []
+    for index in range(1, count + 1):
+        _, seconds = quiet(fetch_data.fetch_shard, index, count, mode=mode, scheduler=scheduler,
+                           root=shard_dir, verbose=verbose)
+        shard_s.append(seconds)
+    if drop:
+        shutil.rmtree(fetch_data.shard_path(drop, count, shard_dir))
+        print(f"\nMerge with shard {drop}/{count} removed:")
+        try:
+            fetch_data.merge_shards(mode, root=shard_dir)
+        except SystemExit as e:
+            print(f"  merge exited with status {e.code}")
+        quiet(fetch_data.fetch_shard, drop, count, mode=mode, scheduler=scheduler, root=shard_dir,
+              verbose=verbose)
+    size = tree_size(shard_dir)
+    _, merge_s = quiet(fetch_data.merge_shards, mode, root=shard_dir, verbose=verbose)
+    return shard_s, size, merge_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline check and timing of sharded fetch + merge.")
+    parser.add_argument("--tickers", type=int, default=500, help="universe size (default 500)")
+    parser.add_argument("--days", type=int, default=1260, help="trading days of synthetic history")
+    parser.add_argument("--shards", type=int, default=4, help="shard count (default 4)")
+    parser.add_argument("--drop", type=int, help="remove this shard before the first merge")
+    parser.add_argument("--flaky", type=float, default=0.0,
+                        help="share of tickers returned as all-NaN columns by batch requests")
+    parser.add_argument("--errors", type=float, default=0.0,
+                        help="share of batch requests that raise")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated seconds per provider request (default 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.tickers, args.days + HELD_OUT_DAYS, seed=args.seed)
+    tickers = list(frames["Close"].columns)
+    held_out = frames["Close"].index[-HELD_OUT_DAYS:]
+    history = {field: frame.drop(index=held_out) for field, frame in frames.items()}
+    fetch_data.PANELS = synthetic_panels(tickers)
+
+    print(f"{len(tickers)} tickers x {len(frames['Close'])} days, {args.shards} shards")
+    print(f"  {'scenario':<12} {'single s':>9} {'max shard s':>12} {'shards KB':>10} {'merge s':>8} "
+          f"{'identical':>10}")
+    with tempfile.TemporaryDirectory() as single, tempfile.TemporaryDirectory() as sharded:
+        for root in (single, sharded):
+            use_data_root(root)
+            with open(fetch_data.NAMES_FILE, "w") as f:
+                json.dump({sym: f"{sym} Corp" for sym in tickers}, f)
+
+        for mode, data in (("full", history), ("incremental", frames)):
+            if mode == "incremental":
+                use_data_root(sharded)
+                drop_half_cache()
+            provider = SyntheticProvider(data, flaky=args.flaky, errors=args.errors, latency=args.latency)
+            single_s = run_single(single, provider, mode, args.verbose)
+            shard_s, size, merge_s = run_sharded(sharded, provider, args.shards, mode, args.verbose,
+                                           drop=args.drop if mode == "full" else None)
+            use_data_root(single)
+            expected = tree_hashes(fetch_data.DATA_DIR)
+            use_data_root(sharded)
+            same = tree_hashes(fetch_data.DATA_DIR) == expected
+            print(f"  {mode:<12} {single_s:>9.2f} {max(shard_s):>12.2f} {size / 1024:>10.0f} "
+                  f"{merge_s:>8.2f} {str(same):>10}")
+            if not same:
+                sys.exit(f"Sharded {mode} store differs from the single run")
+
+
+if __name__ == "__main__":
+    main()
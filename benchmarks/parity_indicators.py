@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Check the precomputed grid indicators against the dashboard's own maths, offline.
+
+The JS helpers are cut out of index.html and run under node; their results are
+compared with the vectorized Python ports in fetch_data.py:
+
+  emaSmooth        ema_columns           computeSMAArray  sma_columns
+  computeRSIArray  rsi_columns           computeAOArray   awesome_oscillator_columns
+  getWeeklyPrices  sample_rows           resampleBars     resample_bars / bar_index
+
+on synthetic series with gaps, then computeTileSpark() for every symbol and grid
+timeframe against indicator_bars() on a synthetic store with holidays, halts and
+missing highs/lows. Finally the published ind/ bundles plus their day files are
+read back through buildIndicatorBundle() / readIndicatorBundle() and compared with
+computeTileSpark() on the same range (float32 in the bundle, float64 computed).
+
+Float64 results must match bit for bit. Exits with status 1 on any mismatch.
+Requires node on PATH.
+
+Usage:
+  python3 benchmarks/parity_indicators.py
+  python3 benchmarks/parity_indicators.py --tickers 120 --days 1300 --seed 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_data  # noqa: E402
+from bench_pipeline import use_data_root  # noqa: E402
+from synthetic import synthetic_frames, synthetic_panels  # noqa: E402
+
+INDEX_HTML = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "index.html")
+JS_FUNCTIONS = [
+    "dateLookup", "dateIndex", "lodBucketKey", "barKey", "barRows",
+    "emaSmooth", "computeSMAArray", "computeRSIArray", "computeAOArray", "getWeeklyPrices",
+    "resampleBars", "computeTileSpark", "indicatorFile", "loadIndicatorDays", "buildIndicatorBundle", "readIndicatorBundle",
+]
+JS_CONSTANTS = ["dateLookupCache", "TILE_SPARK_LINES"]
+HELD_OUT_DAYS = 7   # dates published as store day files, so bundles carry day files too
+
+RUNNER = r"""
+const fs = require('fs');
+const fixture = JSON.parse(fs.readFileSync(process.argv[2]));
+let indicatorDaysPromise = null;
+function fetchCachedStoreFile(file) {
+  const b = fs.readFileSync(fixture.storeDir + '/' + file);
+  return Promise.resolve(b.buffer.slice(b.byteOffset, b.byteOffset + b.byteLength));
+}
+%s
+const out = { maths: {}, resample: {}, spark: {}, bundleMismatches: [] };
+const m = fixture.maths;
+out.maths.ema = [8, 21].map(span => m.series.map(s => emaSmooth(s, span)));
+out.maths.sma = m.periods.map(p => m.series.map(s => computeSMAArray(s, p)));
+out.maths.rsi = m.series.map(s => computeRSIArray(s, 14));
+out.maths.ao = m.series.map((s, k) => computeAOArray(m.highs[k], m.lows[k], s));
+out.maths.weekly = m.series.map(s => getWeeklyPrices(s));
+
+const data = fixture.data;
+const timeframes = fixture.manifest.indicators.timeframes.map(tf => tf.key);
+timeframes.forEach(tf => {
+  out.resample[tf] = { rows: Array.from(barRows(data.dates, tf)), bars: {} };
+  out.spark[tf] = {};
+  fixture.symbols.forEach(sym => {
+    out.resample[tf].bars[sym] = resampleBars(data.dates, data.prices[sym], data.ohlc[sym], data.volume[sym], tf);
+    out.spark[tf][sym] = computeTileSpark(data, sym, tf, 0);
+  });
+});
+
+const manifest = fixture.manifest, ind = manifest.indicators;
+const same = (stored, computed) => computed == null ? stored == null : stored === Math.fround(computed);
+loadIndicatorDays(manifest).then(days => Promise.all(fixture.symbols.map(sym =>
+  fetchCachedStoreFile(indicatorFile(ind, sym)).then(buf => {
+    const bundle = buildIndicatorBundle(manifest, ind, manifest.symbols[sym].slot, buf, days);
+    if (!bundle) { out.bundleMismatches.push(`${sym}: bundle does not match the manifest`); return; }
+    timeframes.forEach(tf => {
+      const sparkIdx = barRows(manifest.dates, tf).findIndex(bar => bar >= bundle[tf].first);
+      const read = readIndicatorBundle(bundle, tf, manifest.dates, sparkIdx);
+      const computed = computeTileSpark(data, sym, tf, sparkIdx);
+      Object.keys(computed).forEach(key => {
+        const a = read[key], b = computed[key];
+        const ok = a.length === b.length && a.every((v, i) => key === 'ohlc'
+          ? ['o', 'h', 'l', 'c'].every(f => v[f] === b[i][f])
+          : key === 'prices' || key === 'volume' ? v === b[i] : same(v, b[i]));
+        if (!ok) out.bundleMismatches.push(`${sym} ${tf} ${key}`);
+      });
+    });
+  })
+))).then(() => console.log(JSON.stringify(out)));
+"""
+
+
+def js_source():
+    """The JS functions and constants the runner needs, cut out of index.html."""
+    with open(INDEX_HTML) as f:
+        html = f.read()
+    parts = []
+    for name in JS_CONSTANTS:
+        match = re.search(rf"^ *(?:const|let) {name} = .*$", html, re.M)
+        parts.append(match.group(0))
+    for name in JS_FUNCTIONS:
+        start = html.index(f"    function {name}(")
+        parts.append(html[start:html.index("\n    }\n", start) + 6])
+    return "\n".join(parts)
+
+
+def as_json(values):
+    """ndarray -> list with None for NaN."""
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def as_array(values):
+    """JSON list with nulls -> float64 ndarray with NaN."""
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def gappy_frames(n_tickers, n_days, seed):
+    """Synthetic frames with market holidays, multi-week halts, missing open/high/low
+    and missing volumes, so empty bars and fallbacks are exercised."""
+    frames = synthetic_frames(n_tickers, n_days, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    keep = rng.random(n_days) > 0.015
+    keep[-HELD_OUT_DAYS - 1:] = True
+    frames = {field: frame[keep] for field, frame in frames.items()}
+    n = len(frames["Close"])
+    for j in rng.choice(n_tickers, size=max(1, n_tickers // 20), replace=False):
+        start = rng.integers(0, n - 60)
+        for frame in frames.values():
+            frame.iloc[start:start + 45, j] = np.nan
+    for field in ("Open", "High", "Low"):
+        frames[field] = frames[field].mask(rng.random(frames[field].shape) < 0.01)
+    frames["Volume"] = frames["Volume"].mask(rng.random(frames["Volume"].shape) < 0.005)
+    return frames
+
+
+def maths_fixture(rng):
+    """Short random series with gaps for the plain maths helpers."""
+    series, highs, lows = [], [], []
+    for length in (5, 40, 260, 420):
+        close = 50 + np.cumsum(rng.normal(0, 1, length))
+        gaps = rng.random(length) < 0.1
+        close[gaps] = np.nan
+        spread = np.abs(rng.normal(0, 0.5, length))
+        series.append(as_json(close))
+        highs.append(as_json(close + spread))
+        lows.append(as_json(close - spread))
+    return {"series": series, "highs": highs, "lows": lows, "periods": [5, 10, 34, 50, 200]}
+
+
+def check_maths(fixture, js, failures):
+    m = fixture
+    columns = [as_array(s)[:, None] for s in m["series"]]
+    for span, results in zip((8, 21), js["ema"]):
+        for col, got in zip(columns, results):
+            if not np.array_equal(as_array(got), fetch_data.ema_columns(col, span)[:, 0], equal_nan=True):
+                failures.append(f"emaSmooth({span}) != ema_columns, length {len(col)}")
+    for period, results in zip(m["periods"], js["sma"]):
+        for col, got in zip(columns, results):
+            if not np.array_equal(as_array(got), fetch_data.sma_columns(col, period)[:, 0], equal_nan=True):
+                failures.append(f"computeSMAArray({period}) != sma_columns, length {len(col)}")
+    for col, got in zip(columns, js["rsi"]):
+        if not np.array_equal(as_array(got), fetch_data.rsi_columns(col, 14)[:, 0], equal_nan=True):
+            failures.append(f"computeRSIArray != rsi_columns, length {len(col)}")
+    for k, (col, got) in enumerate(zip(columns, js["ao"])):
+        ao = fetch_data.awesome_oscillator_columns(as_array(m["highs"][k])[:, None], as_array(m["lows"][k])[:, None])
+        if not np.array_equal(as_array(got), ao[:, 0], equal_nan=True):
+            failures.append(f"computeAOArray != awesome_oscillator_columns, length {len(col)}")
+    for col, got in zip(columns, js["weekly"]):
+        expected = col[fetch_data.sample_rows(len(col), 5), 0]
+        if not np.array_equal(as_array(got), expected, equal_nan=True):
+            failures.append(f"getWeeklyPrices != sample_rows, length {len(col)}")
+
+
+def check_bars(manifest, daily, symbols, js, failures):
+    """resampleBars / computeTileSpark over the whole history against indicator_bars()."""
+    dates = manifest["dates"]
+    computed = fetch_data.indicator_bars(dates, daily, len(dates))
+    for timeframe, _ in fetch_data.INDICATOR_TIMEFRAMES:
+        index, bars = computed[timeframe]
+        if js["resample"][timeframe]["rows"] != index.tolist():
+            failures.append(f"barRows({timeframe}) != bar_index")
+            continue
+        for j, sym in enumerate(symbols):
+            got = js["resample"][timeframe]["bars"][sym]
+            ohlc = [bar or {} for bar in got["ohlc"]]
+            pairs = [("c", got["prices"]), ("v", [v if c is not None else None
+                                                  for v, c in zip(got["volume"], got["prices"])])]
+            pairs += [(key, [bar.get(key) for bar in ohlc]) for key in ("o", "h", "l")]
+            for key, values in pairs:
+                if not np.array_equal(as_array(values), bars[key][:, j], equal_nan=True):
+                    failures.append(f"resampleBars({timeframe}) {sym} {key} != resample_bars")
+
+            valid = ~np.isnan(bars["c"][:, j])
+            spark = js["spark"][timeframe][sym]
+            expected = {key: bars[key][valid, j] for key in ["c", "v"] + fetch_data.INDICATOR_FIELDS[4:]}
+            got = {"c": spark["prices"], "v": spark["volume"], "rsi": spark["rsi"], "ao": spark["ao"]}
+            got.update({key: spark[key] for key in fetch_data.INDICATOR_FIELDS[4:-2]})
+            for key in ("rsi", "ao"):   # the spark only lists bars where they are defined
+                expected[key] = expected[key][~np.isnan(expected[key])]
+            for key, values in got.items():
+                if not np.array_equal(as_array(values), expected[key], equal_nan=True):
+                    failures.append(f"computeTileSpark({timeframe}) {sym} {key} != indicator_bars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity of the grid indicators with index.html's maths.")
+    parser.add_argument("--tickers", type=int, default=60, help="universe size (default 60)")
+    parser.add_argument("--days", type=int, default=1300, help="trading days of synthetic history")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frames = gappy_frames(args.tickers, args.days, args.seed)
+    tickers = list(frames["Close"].columns)
+    fetch_data.PANELS = synthetic_panels(tickers)
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as root:
+        use_data_root(root)
+        index = frames["Close"].index
+        with contextlib.redirect_stdout(io.StringIO()):
+            manifest = fetch_data.write_store({field: frame.drop(index=index[-HELD_OUT_DAYS:])
+                                               for field, frame in frames.items()})
+            fetch_data.write_day_files(manifest, frames, index[-HELD_OUT_DAYS:])
+            fetch_data.write_manifest(manifest)
+            all_data = fetch_data.load_store(manifest)
+            fetch_data.update_indicator_bundles(manifest, all_data)
+        symbols = fetch_data.store_slots(manifest)
+        daily = fetch_data.indicator_daily_columns(manifest, all_data)
+
+        def column(m, j):
+            return as_json(m[:, j])
+
+        fixture = {
+            "storeDir": fetch_data.STORE_DIR,
+            "manifest": manifest,
+            "symbols": symbols,
+            "maths": maths_fixture(rng),
+            "data": {
+                "dates": manifest["dates"],
+                "prices": {sym: column(daily["c"], j) for j, sym in enumerate(symbols)},
+                # the raw stored o/h/l, so resampleBars() applies its own close fallback
+                "ohlc": {sym: {key: as_json(all_data[field][fetch_data.to_yf_symbol(sym)].to_numpy())
+                               for key, field in fetch_data.STORE_PRICE_FIELDS[1:]}
+                         for sym in symbols},
+                "volume": {sym: column(daily["v"], j) for j, sym in enumerate(symbols)},
+            },
+        }
+        fixture_path = os.path.join(root, "fixture.json")
+        runner_path = os.path.join(root, "runner.js")
+        with open(fixture_path, "w") as f:
+            json.dump(fixture, f)
+        with open(runner_path, "w") as f:
+            f.write(RUNNER % js_source())
+        js = json.loads(subprocess.check_output(["node", runner_path, fixture_path]))
+
+    failures = []
+    check_maths(fixture["maths"], js["maths"], failures)
+    check_bars(manifest, daily, symbols, js, failures)
+    failures += [f"bundle {m}" for m in js["bundleMismatches"]]
+    days = len(manifest["indicators"]["days"])
+    print(f"{len(symbols)} symbols x {len(manifest['dates'])} dates, bundles with {days} day file(s)")
+    if failures:
+        for failure in failures[:40]:
+            print(f"  MISMATCH {failure}")
+        sys.exit(f"{len(failures)} mismatch(es)")
+    print("  JS and Python indicators match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic yfinance-shaped data for offline benchmarks.
+
+Frames mirror what fetch_all_data() returns: one DataFrame per field indexed by
+business days, one column per ticker, with NaN gaps for late listings.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_tickers(n_tickers):
+    """Deterministic fake ticker symbols: T0000, T0001, ..."""
+    return [f"T{i:04d}" for i in range(n_tickers)]
+
+
+def synthetic_frames(n_tickers, n_days, seed=0, end="2026-03-13"):
+    """Random-walk OHLCV frames for `n_tickers` x `n_days`."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n_days)
+    tickers = synthetic_tickers(n_tickers)
+
+    returns = rng.normal(0.0004, 0.02, size=(n_days, n_tickers))
+    close = 20 + 80 * rng.random(n_tickers) * np.exp(np.cumsum(returns, axis=0))
+    spread = np.abs(rng.normal(0, 0.01, size=close.shape)) * close
+    opn = close * (1 + rng.normal(0, 0.005, size=close.shape))
+    high = np.maximum(opn, close) + spread
+    low = np.minimum(opn, close) - spread
+    volume = rng.integers(10_000, 50_000_000, size=close.shape).astype(np.float64)
+
+    # ~5% of tickers list partway through the window
+    late = rng.random(n_tickers) < 0.05
+    listing = rng.integers(0, n_days, size=n_tickers)
+    for j in np.flatnonzero(late):
+        for values in (close, opn, high, low, volume):
+            values[:listing[j], j] = np.nan
+
+    def frame(values):
+        return pd.DataFrame(values, index=index, columns=tickers)
+
+    return {
+        "Close": frame(close),
+        "Open": frame(opn),
+        "High": frame(high),
+        "Low": frame(low),
+        "Volume": frame(volume),
+    }
+
+
+def synthetic_panels(tickers, n_panels=16, shared=30, seed=0):
+    """Panels of overlapping symbols, like PANELS: every panel repeats a block of
+    `shared` benchmark-like tickers and takes a slice of the rest."""
+    rng = np.random.default_rng(seed)
+    head, rest = tickers[:shared], tickers[shared:]
+    chunks = np.array_split(np.array(rest), n_panels)
+    panels = []
+    for i, chunk in enumerate(chunks):
+        # Plain str, not numpy scalars, so the panels stay JSON-serializable
+        extra = [str(sym) for sym in rng.choice(head, size=min(len(head), 4), replace=False)]
+        symbols = ([head[0]] if i else list(head)) + extra + [str(sym) for sym in chunk]
+        panels.append({
+            "title": f"{i + 1}. Synthetic",
+            "baseSymbol": symbols[0],
+            "symbols": list(dict.fromkeys(symbols)),
+        })
+    return panels
+
+
+class SyntheticProvider:
+    """Offline stand-in for YFinanceProvider serving slices of in-memory frames.
+
+    `flaky` is the probability that a ticker comes back as an all-NaN column of a
+    multi-ticker response (as when Yahoo throttles part of a batch), `errors` the
+    probability that a multi-ticker request raises; single-ticker retries always
+    succeed. `latency` simulates per-request network time in seconds."""
+
+    def __init__(self, frames, flaky=0.0, errors=0.0, latency=0.0, seed=0):
+        self.frames = frames
+        self.flaky = flaky
+        self.errors = errors
+        self.latency = latency
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    def download(self, tickers, period=None, start=None, end=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.errors and len(tickers) > 1 and self.rng.random() < self.errors:
+            raise RuntimeError("429 Too Many Requests")
+        known = [t for t in tickers if t in self.frames["Close"].columns]
+        dropped = []
+        if self.flaky and len(tickers) > 1:
+            dropped = [t for t in known if self.rng.random() < self.flaky]
+        index = self.frames["Close"].index
+        mask = np.ones(len(index), dtype=bool)
+        if start:
+            mask &= index >= pd.Timestamp(start)
+            if end:
+                mask &= index < pd.Timestamp(end)
+        parts = {field: frame.loc[mask, known].copy() for field, frame in self.frames.items()}
+        for frame in parts.values():
+            frame[dropped] = np.nan
+        return pd.concat(parts, axis=1)
@@ -1,19 +1,80 @@
 #!/usr/bin/env python3
 """
 Fetch sector relative strength data via yfinance.
-Outputs columnar JSON files to data/ directory for use by dashboard.html.
+Outputs a deduplicated columnar store to data/store/ for use by dashboard.html:
+
+  data/store/manifest.json          master date axis, symbol table and panel manifests
+  data/store/chunks/<YYYY>-<BBB>.bin  base rows of one block of 64 symbols for one
+                                    calendar year; past years are never rewritten
+  data/store/days/<YYYY-MM-DD>.bin  append-only rows for all symbols, one file per
+                                    trading day since the last compaction
+  data/store/rs/<YYYY|YYYY-MM-DD>.bin  precomputed RS Ratings (dates x symbols, uint8),
+                                    one part per base year plus one per newer day
+  data/store/ind/<SYM>.bin          per-symbol indicator bundle for the grid tiles,
+                                    rewritten only when the store is compacted
+  data/store/ind/days/<YYYY-MM-DD>.bin  every symbol's current grid bars as of one newer day
+  data/store/screener.bin           grid and swing view metrics per symbol (latest date)
+  data/store/rrg/<BENCH>-<PERIOD>-<SMOOTH>.bin  precomputed RRG trails, rewritten only
+                                    when the store is compacted
+  data/store/rrg/days/<YYYY-MM-DD>.bin  the newest point of every RRG trail as of one newer day
+  data/store/events/<YYYY|YYYY-MM-DD>.bin  signal events (pocket pivots, breakouts,
+                                    divergences...) per symbol, one part per base
+                                    year plus one per newer day
 
 Usage:
   python3 fetch_data.py                  # full 5-year refresh (default)
   python3 fetch_data.py --mode full      # same as above
   python3 fetch_data.py --mode incremental  # append only new trading days
+  python3 fetch_data.py --mode incremental --compact  # ...and fold day files into the bases
+  python3 fetch_data.py --mode full --no-cache      # ignore cache/ and re-download everything
+  python3 fetch_data.py --report out.json           # write the run report elsewhere
+  python3 fetch_data.py --mode live                 # serve the dashboard with live session bars
+  python3 fetch_data.py --mode live --quotes fake   # ...driven by an offline random-walk feed
+  python3 fetch_data.py --shard 2/4                 # fetch a quarter of the tickers into shards/2-of-4/
+  python3 fetch_data.py --shard 2/4 --mode incremental  # ...only the bars after the store's last date
+  python3 fetch_data.py merge --mode incremental    # check shards/ and append its new days to the store
+
+Panels are read from the NN_*.txt watchlists listed in PANEL_WATCHLISTS. An
+incremental run picks up watchlist edits: added symbols are backfilled with full
+history on their own and removed ones are dropped from the store.
+
+Full refreshes go through a local raw cache (cache/, not published) so only
+the gap since the last run is downloaded.
+
+Sharded runs split the tickers across runners: each `--shard i/N` run refreshes
+its share of the raw cache (with --mode incremental: fetches only the bars after
+the store's last date) and writes it to shards/<i>-of-<N>/, and `merge` refuses
+to run unless all N shards are present and match the watchlists and the store,
+then imports them into cache/ and runs the full or incremental update offline.
+
+Live mode polls the in-progress session bar of every store symbol and serves
+the repository at http://127.0.0.1:8765/ with an SSE stream at /live; open
+index.html?live there and the dashboard patches the bars that changed in place.
+Nothing is written to the store.
+
+Every run writes per-stage wall time, CPU time, peak RSS and bytes written to
+logs/run_report.json (and appends it to logs/run_reports.jsonl); see
+benchmarks/bench_pipeline.py for the same stages on offline data.
 """
 
 import argparse
+import glob
+import hashlib
 import json
 import os
+import shutil
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
 
 try:
     import yfinance as yf
@@ -21,92 +82,308 @@ except ImportError:
     print("yfinance not installed. Run: pip3 install yfinance")
     sys.exit(1)
 
-# Mirror of the 16 panels from dashboard.html
-PANELS = [
-    {
-        "title": "1. Market ETFs Overview",
-        "baseSymbol": "SPY",
-        "symbols": ["SPY","RSP","QQQ","QQQE","DIA","IWM","XLK","RYT","XLV","RYH","XLF","RYF","XLY","RCD","XLP","RHS","XLE","RYE","XLI","RGI","XLB","RTM","XLC","RSPC","XLU","RYU","XLRE","EWRE"]
-    },
-    {
-        "title": "2. Tech - Software & Services",
-        "baseSymbol": "XLK",
-        "symbols": ["XLK","RYT","FSLY","RNG","VIAV","DOCN","VNET","KC","LLYVA","LLYVK","WULF","GDS","ZM","IDCC","NTCT","NN","META","NSIT","FFIV","RXO","MRX","FTNT","NICE","AUR","AKAM","TDC","SLDE","DLB","MTCH","INGM","BILL","RUM","ETOR","J","NET","DBX","HNGE","CDW","DLO","YOU","GOOGL","GOOG","ADEA","KBR","DDOG","NBIS","SPOT","CDNS","TRMB","ACIW","PTC","IAC","SRAD","NFLX","S","OPLN","STRK","PLUS","BILI","TWLO","FIG","EQPT","SEZL","NTNX","TME","LIF","CRWV","HPQ","CORZ","CACI","GRND","ALRM","XMTR","ATHM","PSN","DT","TENB","HUT","RBA","DXC","LDOS","BLKB","BB","CARG","CHKP","ADSK","MDB","ADBE","GEN","BSY","BOX","PEGA","IBM","PONY","TEM","SEI","CRWD","GDDY","VRSN","WIT","MANH","ROKU","CRCL","SNPS","RIOT","OTEX","BIDU","MBLY","WIX","PAYX","JKHY","DOX","SSNC","GIB","AVPT","BR","OKTA","CRM","WAY","IOT","PL","VRSK","ESTC","SNOW","ROP","TTWO","VEEV","SAIC","ORCL","CNXC","GWRE","SAIL","BLSH","APPF","NOW","TOST","MSTR","ZETA","PCOR","CRDO","FIS","COMP","PANW","WRD","CIFR","CLBT","PLTR","INFY","DOCU","QTWO","GTLB","DSGX","RBLX","CTSH","ACN","CSGP","ZS","CVLT","RBRK","PAYC","HUBS","PCTY","DUOL","CLSK","MARA","BULL","APP","WDAY","MMYT","PATH","HTFL","SOUN","TYL","TTAN","AGYS","WK","TTD","VRNS","NAVN","EXLS","GLOB","INTU","KVYO","QLYS","NTSK","BL","SNAP","PINS","IT","TRI","ZG","FRSH","Z","RDDT","VERX","EPAM","CCC","SPSC","STUB","TEAM","NIQ","DOCS","MNDY","KD","U","ABTC","ADP","AI","ALKT","AMPL","APLD","APPN","ASAN","ASGN","ATEN","BBAI","BITF","BRZE","BTDR","BTGO","CERT","COUR","CXM","DAO","DFIN","DV","EVCM","FA","FIVN","FROG","FUBO","FWONA","FWONK","GENI","GLIBK","GTM","INNV","INOD","INTA","IQ","IREN","KARO","LSPD","LZ","MGNI","NCNO","NYAX","OMCL","OPRA","ORCL/PD","PBI","PDFS","PLTK","PRGS","PXED","QUBT","RAMP","RCAT","RZLV","SIFY","TUYA","VIA","VOYG","WBTN","WLTH","XZO","YALA","YELP","ZD"]
-    },
-    {
-        "title": "3. Tech - Hardware & Semis",
-        "baseSymbol": "SMH",
-        "symbols": ["SMH","SOXX","IPGP","GLW","CGNX","TER","SNDK","CIEN","VRT","UI","ENPH","AAOI","AEIS","LFUS","ASX","COHR","WDC","ESE","GRMN","STX","NXT","STM","LASR","RUN","MOG.A","ADI","DIOD","FORM","DBD","Q","BHE","HWM","LSCC","BELFB","BELFA","ALGM","SIMO","MPWR","MU","TXN","KN","KEYS","ARM","ON","FN","AIR","NATL","CRUS","TSM","PLXS","ST","SMTC","ASML","NOVT","SITM","FTV","VSAT","DELL","TTMI","CW","VSH","PLAB","NTAP","MTSI","CSCO","VICR","NVDA","NVT","ZBRA","PSTG","ATRO","MCHP","SXI","VISN","POWI","HII","GFS","HPE","ANET","SWKS","FTAI","ESLT","TEL","MCHPP","SMCI","CAMT","QRVO","ITRI","AMBA","EMR","MTRN","FLEX","OSIS","ONTO","KLAC","AVGO","BWXT","NXPI","FSLR","MRVL","APH","TSEM","CALX","SYNA","NVMI","BE","AMKR","DRS","CLS","BA","LOAR","MRCY","AMTM","OLED","INTC","RMBS","AMD","SANM","RAL","PI","LUNR","MIR","PLUG","ACHR","RKLB","AVAV","KRMN","KTOS","ONDS","ALAB","AXON","JOBY","BETA","QBTS","FLY","RGTI","IONQ","AEHR","AEVA","ARLO","BW","CDRE","COHU","CR","CSIQ","CTS","DCO","DGII","EMBJ","EVEX","EVLV","EXTR","GE","GILT","HEI","HEI.A","HIMX","HLIT","HXL","IMOS","INFQ","JKS","LPL","MXL","NOK","NPK","NVTS","OUST","RDW","RDWR","SHLS","VECO","YSS"]
-    },
-    {
-        "title": "4. Financials",
-        "baseSymbol": "XLF",
-        "symbols": ["XLF","RYF","MBIN","CASH","XP","SNEX","IRM","BBDO","SII","BBT","TW","FFBC","BBD","HG","UNIT","VLY","VCTR","CACC","EBC","BEN","BSBR","INDB","HASI","MPT","FLG","RNR","MAC","IFS","INTR","VIRT","SPNT","BFH","ACT","LU","BGC","WAL","WSC","TCBI","HGV","BAP","MCHB","GBCI","LINE","OUT","SMA","MKTX","JXN","CBC","AX","MTH","ZION","IBKR","NMIH","MGRC","PNFP","WFC","C","CIB","FFIN","NU","VOYA","STT","WU","CCI","BN","BMA","COLD","GCMG","PRI","WD","CRBG","LNC","BUR","KYIV","FNF","BBAR","BAM","AB","URI","AVAL","HRI","PK","BANC","GS","BK","BLK","LAZ","FRHC","CNS","GGAL","LXP","SEIC","EQH","MCY","APAM","FRMI","MS","CUBI","FSV","AON","ERIE","AMP","FCNCA","DAVE","FG","PRVA","KSPI","RJF","SF","MIAX","ENVA","HQY","WTW","SCHW","ARE","PLMR","HGTY","IVZ","BXP","UHAL.B","KNSL","OBDC","UHAL","TROW","COF","CUZ","HHH","FUTU","JLL","ICE","OMF","AMG","EVR","VNO","PIPR","HLI","CBRE","BRO","APO/PA","NMRK","KRC","JEF","LPLA","SLM","TBBK","HIW","KKR/PD","APO","CG","AJG","OTF","NDAQ","MC","NP","HTGC","RKT","PAX","KKR","CHYM","UWMC","SLG","PJT","ARES/PB","CAR","RYAN","CIGI","CWK","BX","OPEN","COIN","ARES","SOFI","ARX","AFRM","XXI","LMND","HOOD","HLNE","CRVL","BMNR","TPG","OWL","STEP","GLXY","UPST","PFSI","BWIN","AAMI","ABCB","ABR","AGBK","AGM","ALLY","ALX","AMAL","AMTD","ASB","AUB","AXP","BAC","BANF","BANR","BCH","BCS","BFC","BKU","BNT","BOH","BPOP","BSAC","BUSE","CATY","CBU","CCB","CFG","CLOV","CNO","CNOB","COLB","CTBI","CTOS","CVBF","DCOM","DEI","DHC","DRH","ECPG","EFSC","EWBC","EZPW","FAF","FBK","FBNC","FBP","FCFS","FHB","FHI","FHN","FIBK","FIGR","FIHL","FINV","FITB","FNB","FOR","FRME","FULT","GEMI","GNW","GOLD","GSHD","HBAN","HBNB","HCI","HFWA","HOMB","HOPE","HST","HTH","HTZ","HWC","IBOC","IGIC","IIPR","IRS","JCAP","JOE","KB","KEY","KMPR","LC","LKFN","LOB","MAAS","MET","MTB","NBHC","NBTB","NIC","NMR","NSA","NTRS","OBK","OCFC","ONB","OSBC","OZK","PEB","PFBC","PFG","PFS","PNC","PRG","PRK","PRU","PWP","QCRH","QFIN","RBCAA","RF","RHP","RITM","RLJ","RNST","SAFE","SAN","SBCF","SFBS","SFNC","SHG","SHO","SKWD","SRCE","SSB","STBA","STC","SYBT","SYF","TCBK","TFC","TFIN","TFSL","TIGR","TMP","TOWN","TRMK","TRUP","TWFG","UBSI","UCB","UMBF","UNM","UPBD","USB","VTMX","WAFD","WF","WLFC","WSBC","WSFS","WTFC","XHR"]
-    },
-    {
-        "title": "5. Producer Manufacturing",
-        "baseSymbol": "XLI",
-        "symbols": ["XLI","RGI","LITE","MOD","RRX","GNRC","UCTT","ACMR","POWL","BDC","OII","CYD","BWA","AGCO","DAN","KLIC","CNH","GTES","GEV","MKSI","CAT","WWD","CECO","TKR","EFXT","SEDG","AMAT","KMT","ATS","CSL","NPO","FLS","ATMU","CARR","NWL","TEX","ITT","ENTG","HLIO","LEA","PSIX","LECO","PHIN","SPXC","IR","HUBB","LII","ETN","LRCX","AAON","JBL","WMS","WSO","ESAB","ALH","GFF","LCII","KAI","BRC","GTX","MHK","BC","CMI","APTV","ENS","CXT","VC","AYI","TGLS","YETI","ROK","HSAI","PNR","BMI","ATKR","VLTO","FBIN","MLI","ACLS","SYM","SMR","OKLO","QS","EOSE","ADNT","ALG","ALNT","ALSN","AMPX","AMSC","AOS","ARRY","ASTE","AWI","DAKT","DCH","DCI","DOO","ENVX","EPAC","FLNC","FPS","GRC","HNI","ICHR","JBTM","KDK","LNN","MAS","MIDD","MLKN","NNE","NPKI","PLPC","POET","ROCK","SKYT","TE","THR","TILE","TNC","TRN","USAR","VMI","WOR"]
-    },
-    {
-        "title": "6. Non-Energy Minerals (Materials)",
-        "baseSymbol": "XLB",
-        "symbols": ["XLB","RTM","ALM","ATI","SSRM","AG","SKE","KNF","CRS","CSTM","AGI","AUGO","FSM","TECK","STLD","TTAM","TGB","WS","SCCO","USAS","DNN","IAG","ORLA","PAAS","BTG","JHX","AEM","NGD","CENX","AU","CDE","FCX","EQX","ARIS","SA","WPM","NG","EXP","EXK","CX","CRH","CGAU","CCJ","FNV","RGLD","NXE","NEM","CMC","BVN","KALU","SID","HBM","RS","GFI","OR","EGO","TREX","TFPM","WFG","AA","ERO","B","DRD","UUUU","SVM","SBSW","KGC","PPTA","HMY","LPX","UEC","HL/PB","USLM","HL","IE","MP","TMC","CLF","LEU","ACA","AMRZ","ASM","CNL","CRML","ELE","IAUX","IPX","LAC","LAR","LOMA","MLM","MT","MUX","NEXA","ODV","PKX","RYZ","SGML","SLI","SLSR","TX","UFPI","VZLA"]
-    },
-    {
-        "title": "7. Consumer Services",
-        "baseSymbol": "XLY",
-        "symbols": ["XLY","RCD","CHTR","SPHR","LRN","NCLH","RCL","LYV","OSW","CUK","MSGS","CCL","VIK","CAKE","DRVN","HTHT","EDU","MGM","NXST","MSGE","TNL","WH","CNK","LTH","ATAT","H","CHH","ARMK","SIRI","TKO","RRR","WYNN","VAC","MTN","CAVA","RSI","ANDG","ABNB","SHAK","MLCO","SGHC","GHC","WING","CMG","DIS","PLNT","PSKY","CZR","VSNT","TXRH","EAT","NWSA","CHDN","LION","NWS","BKNG","ATGE","FOX","BROS","FOXA","HRB","EXPE","GBTG","DKNG","FLUT","AFYA","ARCO","BH","BH.A","BRSL","BYD","CVSA","DPZ","FUN","LIND","LUCK","LVS","MANU","PENN","PRDO","PRKS","PRSU","PTON","PZZA","SBGI","STRA","TRIP","UNF","VVV","WEN","WLY"]
-    },
-    {
-        "title": "8. Retail Trade",
-        "baseSymbol": "XRT",
-        "symbols": ["XRT","AAP","TPR","RUSHA","GRDN","TBBB","FIVE","RUSHB","BBWI","GAP","GME","TGT","SAH","KR","WMT","BJ","KSS","WSM","M","SIG","VSCO","BURL","ASO","DG","TSCO","DLTR","PAG","BOOT","GLBE","EYE","DKS","AEO","BBY","DDS","MELI","EBAY","URBN","CVS","FND","OLLI","SE","SFM","RH","KMX","AN","ANF","ABG","CPNG","AMZN","CPRI","MUSA","BLDR","LAD","CPRT","WRBY","ETSY","GPI","CHWY","PLBL","CVNA","W","AHG","AZO","BKE","BOBS","CRI","GIC","IMKTA","LUXE","PSMT","REAL","RERE","RVLV","SBH","SVV","VIPS","WINA","WMK"]
-    },
-    {
-        "title": "9. Commercial Services",
-        "baseSymbol": "SPGI",
-        "symbols": ["SPGI","RELY","STNE","LB","CPAY","GPN","ULS","ANDE","PAGS","NAMS","OMC","WEX","TAL","VVX","WMG","EEFT","BBU","ADT","MH","FISV","EFX","RHI","LAUR","KFY","MSCI","FOUR","TRU","CAE","BZ","PAY","WPP","FCN","FICO","GPGI","LOPE","TIC","SHOP","G","MCO","XYZ","BAH","PICS","SPGI","BFAM","CRL","MORN","MMS","MEDP","PYPL","HURN","DJT","FDS","ICLR","KLAR","ABM","BCO","BV","CBZ","CLVT","CMPR","CRAI","CXW","DLX","EVTC","FLYW","FOUR/PA","GEO","HCSG","ICFI","LINC","MAN","MQ","NSSC","OCS","PAYO","PGNY","PTRN","RHLD","SBET","STGW","TNET","UPWK","UTI","WLDN"]
-    },
-    {
-        "title": "10. Consumer Staples",
-        "baseSymbol": "XLP",
-        "symbols": ["XLP","RHS","UAA","UA","DAR","CENT","COLM","CENTA","CROX","DECK","COKE","KTB","ZGN","HLF","TPB","PVH","VFC","LW","BF.A","BF.B","KHC","FRPT","POST","BIRK","LEVI","SAM","ONON","CAG","RL","ASH","ELF","NKE","CPB","GIS","REYN","MICC","TAP","COCO","EL","PRMB","LULU","AKO.B","STZ","SXT","FLO","SHOO","CELH","COTY","ARW","DXPE","MCK","USFD","UNFI","CHEF","SNX","QXO","GWW","CAH","WCC","SITE","COR","HSIC","REZI","AIT","CNM","BCC","DNOW","GPC","POOL","BCPC","CCU","CHA","CLX","DOLE","ENR","FERG","FIGS","FIZZ","GCT","GIII","GIL","GLP","GOOS","HLMN","HRL","IFF","IPAR","JJSF","KOF","MKC","MZTI","NOMD","SJM","SMPL","TR","UTZ","WKC","WWW"]
-    },
-    {
-        "title": "11. Industrial Services",
-        "baseSymbol": "XLI",
-        "symbols": ["XLI","VAL","RIG","NE","KGS","LBRT","NESR","FIX","SDRL","STRL","FLR","WFRD","ROAD","FTI","PWR","EME","MTZ","DY","ECG","KNTK","TPC","PTEN","LGN","DKL","FLOC","AGX","PRIM","IESC","NOV","MYRG","VG","HP","VSEC","WHD","IBP","IHS","BLD","ACM","TTEK","GFL","BBUC","EXPO","CWST","STN","ACDC","AESI","AMRC","APG","AROC","BORR","GLNG","HAL","HLX","INVX","LNG","MWH","NBR","NGL","NVRI","OKE","PCT","PDS","PUMP","RES","SLB","WBI"]
-    },
-    {
-        "title": "12. Transportation",
-        "baseSymbol": "IYT",
-        "symbols": ["IYT","XTN","XPO","ZIM","TDW","STNG","LUV","SAIA","ARCB","SBLK","TNK","GXO","R","ODFL","JBLU","KNX","JBHT","MATX","CMRE","VNT","TFII","WERN","CAAP","ALK","CHRW","CPA","SKYW","AERO","PFGC","DAL","UAL","SNDR","LSTR","EXPD","LTM","GRAB","CART","HUBG","AAL","UBER","DASH","VRRM","LYFT","ALGT","ASR","BWLP","CCEC","CMBT","DAC","DHT","ECO","FLNG","FRO","GSL","HAFN","INSW","KEX","LPG","NAT","NMM","OMAB","PAC","SARO","TEN","TK","TRMD","UPS","VTOL"]
-    },
-    {
-        "title": "13. Process Industries",
-        "baseSymbol": "XLB",
-        "symbols": ["XLB","SSL","SOLS","ESI","CE","EMN","DD","SW","AVNT","WDFC","LYB","KWR","DOW","AMBP","IP","WLK","BG","NGVT","HUN","OC","CALM","CF","CBT","CC","MOS","MEOH","OLN","SEB","GEL","ADM","OI","IOSP","PPC","CSW","ALB","HWKN","NEU","ALB/PA","PRM","SQM","GPK","AGRO","AIN","AXTA","AZZ","BAK","DQ","ECVT","FMC","FUL","GPRE","MTX","NTR","PPG","PRLB","REX","ROG","RPM","SCL","SLVM","SMG","TROX","TRS","TTI","UAN","UFPT"]
-    },
-    {
-        "title": "14. Energy",
-        "baseSymbol": "XLE",
-        "symbols": ["XLE","RYE","CLMT","CRGY","SM","DK","CVE","OVV","NOG","CRC","IMO","MNR","DVN","MTDR","TALO","VIST","MGY","CTRA","XPRO","EQT","BKV","APA","PARR","CHRD","BTE","RRC","MPC","YPF","PBF","CNX","MUR","GPOR","AR","DINO","EXE","EC","CNR","BTU","CVI","CRK","HCC","AMR","DEC","FANG","INR","METC","METCB","NEXT","NRP","OXY","PR","PSX","SOC","VET","VLO","WTTR"]
-    },
-    {
-        "title": "15. Consumer Durables",
-        "baseSymbol": "XHB",
-        "symbols": ["XHB","HAS","OSK","AS","SWK","TOL","GRBK","NIO","PHM","TMHC","KBH","PATK","DHI","MHO","CCS","SN","LKQ","SKY","IMAX","NVR","LEN","THO","HOG","GT","CALY","TSLA","WHR","SGI","PII","LCID","FTDR","RIVN","XPEV","CVCO","MAT","STLA","AEBI","ARHS","BLBD","DFH","DORM","F","FSS","GM","GOLF","HAYW","LEG","LEN.B","MBC","PSNY","SONO","SPB","XPEL"]
-    },
-    {
-        "title": "16. Comms, Utilities & Misc",
-        "baseSymbol": "XLC",
-        "symbols": ["XLC","RSPC","XLU","RYU","SKM","LBRDK","LBRDA","LBTYA","LBTYK","IRDM","TMUS","AMX","TIGO","TEO","GSAT","LUMN","SATS","ASTS","ENLT","CSAN","AXIA/PC","AXIA/P","NRG","CTRI","HE","BEPC","VST","CEPU","XIFR","TLN","TGS","TAC","PAM","CEG","ORA","AWK","TPL","WT","CEF","FSK","PSLV","AD","ASA","AXIA","CCOI","EDN","EE","HTO","KEP","LBTYB","LILA","LILAK","PSEC","TDS","TSLX","TV","VEON","VNOM"]
-    },
+try:
+    import orjson  # optional: faster JSON encoding for the store manifest
+except ImportError:
+    orjson = None
+
+try:
+    import resource  # optional: peak RSS in the run report (not available on Windows)
+except ImportError:
+    resource = None
+
+# Dashboard panels. Symbols come from the TradingView-style watchlists next to
+# this script (one ticker per line, "###Section" headings); title and base
+# symbol, which the watchlists cannot carry, are kept here. The watchlists are the
+# user's files: the pipeline only reads them, and sync_universe() backfills edits.
+WATCHLIST_DIR = os.path.dirname(os.path.abspath(__file__))
+PANEL_WATCHLISTS = [
+    ("01_market_etfs.txt", "1. Market ETFs Overview", "SPY"),
+    ("02_tech_software.txt", "2. Tech - Software & Services", "XLK"),
+    ("03_tech_hardware_semis.txt", "3. Tech - Hardware & Semis", "SMH"),
+    ("04_financials.txt", "4. Financials", "XLF"),
+    ("05_producer_manufacturing.txt", "5. Producer Manufacturing", "XLI"),
+    ("06_non_energy_minerals.txt", "6. Non-Energy Minerals (Materials)", "XLB"),
+    ("07_consumer_services.txt", "7. Consumer Services", "XLY"),
+    ("08_retail_trade.txt", "8. Retail Trade", "XRT"),
+    ("09_commercial_services.txt", "9. Commercial Services", "SPGI"),
+    ("10_consumer_staples.txt", "10. Consumer Staples", "XLP"),
+    ("11_industrial_services.txt", "11. Industrial Services", "XLI"),
+    ("12_transportation.txt", "12. Transportation", "IYT"),
+    ("13_process_industries.txt", "13. Process Industries", "XLB"),
+    ("14_energy.txt", "14. Energy", "XLE"),
+    ("15_consumer_durables.txt", "15. Consumer Durables", "XHB"),
+    ("16_comms_utilities_misc.txt", "16. Comms, Utilities & Misc", "XLC"),
 ]
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 LAST_FULL_REFRESH_FILE = os.path.join(DATA_DIR, ".last_full_refresh")
+NAMES_FILE = os.path.join(DATA_DIR, "stock_names.json")
+
+# Local raw download cache (not published): per-ticker OHLCV history + metadata
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+CACHE_META = os.path.join(CACHE_DIR, "meta.json")
+CACHE_OVERLAP_ROWS = 5        # cached rows re-fetched to detect split/dividend re-adjustment
+CACHE_ADJUST_TOLERANCE = 1e-4  # relative close difference treated as a re-adjustment
+HISTORY_YEARS = 5
+
+# Sharded fetch: one raw-cache-shaped output per shard, merged by `fetch_data.py merge`
+SHARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shards")
+SHARD_META = "shard.json"     # written last; its presence marks a finished shard
+
+# Columnar store: shared date axis + base chunks of STORE_BLOCK_SLOTS symbols x one calendar year
+STORE_DIR = os.path.join(DATA_DIR, "store")
+STORE_MANIFEST = os.path.join(STORE_DIR, "manifest.json")
+STORE_VERSION = 3
+STORE_CHUNK_DIR = "chunks"
+STORE_BLOCK_SLOTS = 64
+STORE_VOLUME_DTYPE = "<f8"
+STORE_PRICE_DTYPE = "<f4"
+STORE_PRICE_FIELDS = [("c", "Close"), ("o", "Open"), ("h", "High"), ("l", "Low")]
+# Fold day files back into the base chunks once this many have accumulated
+STORE_COMPACT_DAYS = 21
+
+# RS Rating: weighted 1/3/6/12-month return, ranked cross-sectionally per date
+RS_LOOKBACKS = [(21, 0.4), (63, 0.3), (126, 0.2), (252, 0.1)]
+RS_DIR = "rs"                 # one uint8 (dates x slots) part per base year, then per day
+RS_MISSING = 255
+# Manifest entries describing derived artifacts (kept across compaction)
+STORE_ANALYTICS_KEYS = ["rs", "indicators", "screener", "rrg", "events"]
+
+# Indicator bundles (data/store/ind/<SYM>.bin): the last bars of each grid timeframe
+# as of the store base, plus one ind/days/<date>.bin per later date holding every
+# symbol's current bar of each timeframe
+INDICATOR_DIR = "ind"
+INDICATOR_DAY_DIR = "days"
+# (timeframe, bars kept): covers the longest grid range of each (6M, 6M, 1Y, 5Y)
+INDICATOR_TIMEFRAMES = [("daily", 160), ("3d", 60), ("weekly", 60), ("monthly", 64)]
+INDICATOR_FIELDS = ["c", "o", "h", "l", "ema8", "ema21", "ma10", "ma50", "ma200", "rsi", "ao"]
+INDICATOR_RSI_PERIOD = 14
+
+# Screener table (data/store/screener.bin): grid and swing view metrics per symbol slot
+SCREENER_FILE = "screener.bin"
+SCREENER_BENCHMARKS = ["sector", "spy", "absolute"]   # rotation benchmarks of the dashboard
+SCREENER_SIGNALS = [None, "BULLISH", "WATCH", "BEARISH"]
+SCREENER_FLOATS = [
+    "rsRating", "ema8Dist", "ema21Dist", "ret1d", "ret5d", "ret2w", "ret1m", "ret3m",
+    "rsiDelta", "ma50Dist", "adrPct", "relVolume", "accDayRatio",
+    "vsSectorCap10d", "vsSectorCap20d", "vsSectorCap40d", "vsSPY10d", "vsSPY20d",
+    "rsiDivOffset", "aoDivOffset", "rsiBearDivOffset", "aoBearDivOffset",
+]
+SCREENER_BYTES = (
+    ["swingTotal", "swingStructure", "swingAcceleration", "swingSector", "swingPanel"]
+    + [f"rotation_{b}" for b in SCREENER_BENCHMARKS] + [f"signal_{b}" for b in SCREENER_BENCHMARKS]
+)
+SCREENER_FLAGS = [
+    "swing", "nearEma8", "nearEma21", "rsLeading", "volContraction", "near52wHigh", "at52wHigh",
+    "pocketPivot", "rsLineNewHigh", "isBaseBreakout", "isEma21Reclaim", "isNew20dHigh",
+    "rsiDivergence", "rsiBearDiv", "rsiBearDivPending", "aoDivergence", "aoBearDiv",
+    "aoBearDivPending", "higherLows", "highVol", "accumulation",
+] + [f"pullback_{b}" for b in SCREENER_BENCHMARKS]
+SCREENER_SORTS = [
+    "rsRating", "swingTotal", "swingStructure", "swingAcceleration", "swingSector",
+    "ret1d", "ret5d", "ret2w", "ret1m", "ret3m", "rsiDelta", "ma50Dist", "relVolume",
+    "accDayRatio", "adrPct", "vsSectorCap10d", "vsSPY10d",
+]
+SWING_WINDOWS = (10, 20, 40)  # short / mid / long, trading days
+# Cap-weight sector ETF -> equal-weight counterpart (CAP_TO_EQUAL in index.html)
+EQUAL_WEIGHT_ETFS = {
+    "XLK": "RYT", "SMH": "SOXX", "XLF": "RYF", "XLI": "RGI", "XLB": "RTM", "XLY": "RCD",
+    "XRT": "XRT", "SPGI": "SPGI", "XLP": "RHS", "IYT": "XTN", "XLE": "RYE", "XHB": "XHB",
+    "XLC": "RSPC", "XLU": "RYU", "QQQ": "QQQE",
+}
+
+# RRG trails (data/store/rrg/<bench>-<period>-<smooth>.bin) for the sector and stock RRG views,
+# as of the store base, plus one rrg/days/<date>.bin per later date with every trail's newest point
+RRG_DIR = "rrg"
+RRG_DAY_DIR = "days"
+RRG_BENCHMARKS = ["SPY", "RSP", "sector"]      # "sector": each panel's base ETF
+RRG_PERIODS = [("daily", 1, 50, 10), ("weekly", 5, 10, 5)]   # key, sample step, RS-Ratio SMA, momentum SMA
+RRG_SMOOTHING = [1, 3, 5, 10]                   # EMA spans of the Smooth selector (1 = off)
+RRG_TAIL = 90                                   # longest Tail option
+# Daily trails are computed from this many trailing dates: enough for the tail, both
+# SMA warm-ups and the EMA seed to decay below float64 precision, so the nightly cost
+# does not grow with the history kept in the store.
+RRG_DAILY_WINDOW = 600
+
+# Signal event index (data/store/events/<YYYY|YYYY-MM-DD>.bin): every date a grid signal
+# fired, per symbol, one part per base year plus one per newer day (store_row_parts())
+EVENT_DIR = "events"
+EVENT_CONTEXT = 60            # rows before the first new date searched for divergence swing points
+EVENT_TYPES = [
+    "pocketPivot", "isBaseBreakout", "isEma21Reclaim", "isNew20dHigh", "rsLineNewHigh",
+    "rsiDivergence", "rsiBearDiv", "aoDivergence", "aoBearDiv",
+]
+
+# Download scheduling
+OHLCV_FIELDS = ["Close", "Open", "High", "Low", "Volume"]
+DOWNLOAD_BATCH_SIZE = 200
+DOWNLOAD_CONCURRENCY = 4     # batches in flight at once
+DOWNLOAD_RATE = 1.0          # provider requests per second (token bucket refill)
+DOWNLOAD_BURST = 4           # token bucket capacity
+DOWNLOAD_RETRIES = 3         # per-ticker retries after a batch misses it
+DOWNLOAD_BACKOFF = 2.0       # seconds; doubled on each retry
+
+# Live mode: in-progress session bars pushed to the dashboard over SSE
+LIVE_INTERVAL = 60.0          # seconds between quote polls
+LIVE_PORT = 8765
+LIVE_HEARTBEAT = 15.0         # seconds between keep-alive comments on an idle stream
+LIVE_HISTORY = 120            # recent diffs kept for clients resuming with Last-Event-ID
+
+# Run report: per-stage timings of the last run, next to logs/update.log
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+RUN_REPORT_FILE = os.path.join(LOG_DIR, "run_report.json")
+RUN_REPORT_HISTORY = "run_reports.jsonl"   # one line per run, next to the report
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class RunReport:
+    """Wall time, CPU time, peak RSS and bytes written per pipeline stage.
+
+    Stages may nest (downloads inside the raw cache refresh) and repeat (one
+    download per gap group); repeats are summed into one entry. CPU time covers
+    all threads of the process. Peak RSS is the process high-water mark when the
+    stage ended; rss_growth_mb is how far the stage itself raised it. Bytes
+    reported through count_written() are credited to every open stage."""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = datetime.now()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.stages = {}
+        self.open = []
+        self.bytes_written = 0
+        self.counts = {}
+        self.status = "running"
+        self.error = None
+
+    @contextmanager
+    def stage(self, name):
+        entry = self.stages.setdefault(name, {
+            "name": name, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+            "peak_rss_mb": None, "rss_growth_mb": 0.0, "bytes_written": 0,
+        })
+        entry["calls"] += 1
+        self.open.append(entry)
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry["wall_s"] += time.perf_counter() - wall
+            entry["cpu_s"] += time.process_time() - cpu
+            self.open.pop()
+            rss = peak_rss_mb()
+            if rss is not None:
+                entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0.0, rss)
+                entry["rss_growth_mb"] += rss - rss_before
+
+    def add_bytes(self, nbytes):
+        self.bytes_written += nbytes
+        for entry in self.open:
+            entry["bytes_written"] += nbytes
+
+    def to_dict(self):
+        rss = peak_rss_mb()
+        return {
+            "mode": self.mode,
+            "status": self.status,
+            "error": self.error,
+            "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "wall_s": round(time.perf_counter() - self.wall, 3),
+            "cpu_s": round(time.process_time() - self.cpu, 3),
+            "peak_rss_mb": round(rss, 1) if rss is not None else None,
+            "bytes_written": self.bytes_written,
+            "counts": self.counts,
+            "stages": [
+                {key: round(value, 3 if key.endswith("_s") else 1) if isinstance(value, float) else value
+                 for key, value in entry.items()}
+                for entry in self.stages.values()
+            ],
+        }
+
+    def summary(self):
+        """Print one line per stage."""
+        print("\nStage timings:")
+        for entry in self.stages.values():
+            rss = f"{entry['peak_rss_mb']:.0f} MB peak" if entry["peak_rss_mb"] is not None else "peak n/a"
+            print(f"  {entry['name']:<18} {entry['wall_s']:8.2f}s wall {entry['cpu_s']:8.2f}s cpu  "
+                  f"{rss:>13}  {entry['bytes_written'] / 1024:10.0f} KB written")
+
+    def save(self, path=RUN_REPORT_FILE):
+        """Write the report as JSON to `path` and append it to the run history beside it."""
+        report = self.to_dict()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        with open(os.path.join(os.path.dirname(path), RUN_REPORT_HISTORY), "a") as f:
+            f.write(json.dumps(report, separators=(",", ":")) + "\n")
+        print(f"Run report written to {path}")
+
+
+_run_report = None  # RunReport of the current run, set by start_run_report()
+
+
+def start_run_report(mode):
+    """Start recording stages into a new RunReport and return it."""
+    global _run_report
+    _run_report = RunReport(mode)
+    return _run_report
+
+
+def timed_stage(name):
+    """Context manager recording a pipeline stage in the current run report
+    (a no-op when no report is being recorded)."""
+    return _run_report.stage(name) if _run_report else nullcontext()
+
+
+def count_written(nbytes):
+    """Credit bytes written to disk to the open stages of the current run report."""
+    if _run_report:
+        _run_report.add_bytes(nbytes)
+
+
+def count_run(key, value):
+    """Record a size figure (tickers, dates, ...) in the current run report."""
+    if _run_report:
+        _run_report.counts[key] = value
+
+
+def parse_watchlist(path):
+    """Symbols of a watchlist file in order, without duplicates. Blank lines and
+    "###Section" headings are skipped; an "EXCHANGE:" prefix is dropped."""
+    symbols = {}
+    with open(path) as f:
+        for line in f:
+            sym = line.strip()
+            if not sym or sym.startswith("#"):
+                continue
+            symbols.setdefault(sym.split(":")[-1].upper(), None)
+    return list(symbols)
+
+
+def load_panels():
+    """Panel definitions ({title, baseSymbol, symbols}) built from PANEL_WATCHLISTS.
+    The base symbol leads each panel whether or not its watchlist lists it."""
+    panels = []
+    for filename, title, base in PANEL_WATCHLISTS:
+        symbols = parse_watchlist(os.path.join(WATCHLIST_DIR, filename))
+        panels.append({"title": title, "baseSymbol": base,
+                       "symbols": [base] + [sym for sym in symbols if sym != base]})
+    return panels
+
+
+PANELS = load_panels()
 
 
 def get_all_unique_tickers():
@@ -115,178 +392,2454 @@ def get_all_unique_tickers():
     for panel in PANELS:
         for sym in panel["symbols"]:
             # yfinance uses '-' instead of '/' for preferred shares
-            tickers.add(sym.replace("/", "-"))
+            tickers.add(to_yf_symbol(sym))
     return sorted(tickers)
 
 
-def fetch_all_data(tickers, period=None, start=None, end=None):
-    """Batch-download daily OHLC prices for all tickers.
-    Returns dict with keys 'Close', 'Open', 'High', 'Low' each being a DataFrame."""
+class DownloadProvider:
+    """Source of daily OHLCV history used by the download scheduler.
+
+    download() returns a yfinance-shaped DataFrame: DatetimeIndex rows and
+    (field, ticker) MultiIndex columns for Close/Open/High/Low/Volume. Tickers
+    the provider has no data for may be absent or all-NaN."""
+
+    def download(self, tickers, period=None, start=None, end=None):
+        raise NotImplementedError
+
+
+class YFinanceProvider(DownloadProvider):
+    """Split/dividend-adjusted daily bars from yf.download()."""
+
+    def download(self, tickers, period=None, start=None, end=None):
+        kwargs = dict(
+            interval="1d",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        if start:
+            kwargs["start"] = start
+            if end:
+                kwargs["end"] = end
+        else:
+            kwargs["period"] = period or "5y"
+        return yf.download(tickers, **kwargs)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def split_fields(df, tickers):
+    """Split a yfinance-shaped frame into {field: DataFrame[ticker columns]}.
+    Returns (fields, missing) where missing lists tickers without any close."""
+    fields = {}
+    if df is None or df.empty:
+        return fields, list(tickers)
+    if isinstance(df.columns, pd.MultiIndex):
+        level0 = df.columns.get_level_values(0)
+        for field in OHLCV_FIELDS:
+            if field in level0:
+                fields[field] = df[field]
+    elif len(tickers) == 1:
+        # Flat columns: a single ticker without a ticker level
+        for field in OHLCV_FIELDS:
+            if field in df.columns:
+                fields[field] = df[[field]].rename(columns={field: tickers[0]})
+
+    close = fields.get("Close")
+    if close is None:
+        return {}, list(tickers)
+    present = set(close.columns[close.notna().any()])
+    return fields, [t for t in tickers if t not in present]
+
+
+class DownloadScheduler:
+    """Runs ticker batches concurrently against a DownloadProvider.
+
+    Batches are submitted to a bounded thread pool; every provider call first
+    takes a token from a shared bucket, so concurrency and request rate are
+    limited independently. Tickers a batch did not return are retried one by
+    one with exponential backoff, as is every ticker of a batch that raised.
+    Results are combined with a single concat."""
+
+    def __init__(self, provider=None, batch_size=DOWNLOAD_BATCH_SIZE,
+                 concurrency=DOWNLOAD_CONCURRENCY, rate=DOWNLOAD_RATE,
+                 burst=DOWNLOAD_BURST, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF):
+        self.provider = provider or YFinanceProvider()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+
+    def _call(self, tickers, period, start, end):
+        self.bucket.acquire()
+        df = self.provider.download(tickers, period=period, start=start, end=end)
+        return split_fields(df, tickers)
+
+    def _run_batch(self, number, batch, period, start, end):
+        try:
+            fields, missing = self._call(batch, period, start, end)
+        except Exception as e:
+            print(f"  Error in batch {number}: {e}")
+            return {}, list(batch), True
+        print(f"  Batch {number}: {len(batch) - len(missing)}/{len(batch)} tickers")
+        return fields, missing, False
+
+    def _retry_ticker(self, ticker, period, start, end):
+        for attempt in range(self.retries):
+            time.sleep(self.backoff * (2 ** attempt))
+            try:
+                fields, missing = self._call([ticker], period, start, end)
+            except Exception:
+                continue
+            if not missing:
+                return fields
+        return None
+
+    def run(self, tickers, period=None, start=None, end=None):
+        """Download all tickers. Returns (frames, failed) where frames maps each
+        OHLCV field to one DataFrame (or None) and failed lists tickers that
+        still had no data after all retries."""
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        parts = []
+        missed = []    # tickers absent from batches that returned cleanly
+        errored = []   # tickers of batches that raised (throttling, network)
+        with timed_stage("download"), ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [
+                pool.submit(self._run_batch, i + 1, batch, period, start, end)
+                for i, batch in enumerate(batches)
+            ]
+            for future in futures:
+                fields, missing, error = future.result()
+                if fields:
+                    parts.append(fields)
+                (errored if error else missed).extend(missing)
+
+            # An entirely empty round (holiday, no new bars yet) is not a
+            # throttling problem, so only the tickers of batches that raised
+            # are worth retrying then
+            retry = errored + missed if parts else errored
+            failed = [ticker for ticker in missed if ticker not in retry]
+            recovered = {}
+            if retry and self.retries:
+                print(f"  Retrying {len(retry)} ticker(s) individually...")
+                futures = {
+                    ticker: pool.submit(self._retry_ticker, ticker, period, start, end)
+                    for ticker in retry
+                }
+                for ticker, future in futures.items():
+                    fields = future.result()
+                    if fields:
+                        recovered[ticker] = fields
+                    else:
+                        failed.append(ticker)
+            else:
+                failed.extend(retry)
+
+        frames = {}
+        with timed_stage("merge"):
+            # A batch returns the tickers it could not fetch as all-NaN columns;
+            # drop those where the retry recovered the ticker
+            parts = [{field: frame.drop(columns=[t for t in recovered if t in frame.columns])
+                      for field, frame in p.items()} for p in parts] + list(recovered.values())
+            for field in OHLCV_FIELDS:
+                pieces = [p[field] for p in parts if p.get(field) is not None]
+                if not pieces:
+                    frames[field] = None
+                    continue
+                combined = pd.concat(pieces, axis=1).sort_index()
+                frames[field] = combined.loc[:, ~combined.columns.duplicated()]
+        return frames, failed
+
+
+def fetch_all_data(tickers, period=None, start=None, end=None, scheduler=None):
+    """Download daily OHLC prices and volume for all tickers via the scheduler.
+    Returns dict with keys 'Close', 'Open', 'High', 'Low', 'Volume' each being a DataFrame."""
     if start:
         print(f"Downloading {len(tickers)} tickers ({start} to {end or 'today'})...")
     else:
         print(f"Downloading {len(tickers)} tickers ({period} of daily data)...")
 
-    batch_size = 200
-    all_close = None
-    all_open = None
-    all_high = None
-    all_low = None
-    all_volume = None
-
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i + batch_size]
-        print(f"  Batch {i // batch_size + 1}: {len(batch)} tickers...")
-        try:
-            kwargs = dict(
-                interval="1d",
-                auto_adjust=True,
-                threads=True,
-                progress=True,
-            )
-            if start:
-                kwargs["start"] = start
-                if end:
-                    kwargs["end"] = end
-            else:
-                kwargs["period"] = period or "5y"
+    scheduler = scheduler or DownloadScheduler()
+    frames, failed = scheduler.run(tickers, period=period, start=start, end=end)
+    if failed and frames["Close"] is not None:
+        print(f"  WARNING: no data for {len(failed)} ticker(s) after retries: {', '.join(sorted(failed))}")
+
+    with timed_stage("dedup_trim"):
+        # Deduplicate dates
+        for field, frame in frames.items():
+            if frame is not None and frame.index.duplicated().any():
+                frames[field] = frame[~frame.index.duplicated(keep="last")]
+
+        # Trim trailing sparse dates using close as reference
+        all_close = frames["Close"]
+        if all_close is not None:
+            keep = len(all_close)
+            while keep > 0:
+                last_row = all_close.iloc[keep - 1]
+                valid_pct = last_row.notna().sum() / len(last_row)
+                if valid_pct >= 0.5:
+                    break
+                print(f"  Dropped sparse trailing date {all_close.index[keep - 1].strftime('%Y-%m-%d')} "
+                      f"({valid_pct:.0%} coverage)")
+                keep -= 1
+            kept_dates = all_close.index[:keep]
+            for field, frame in frames.items():
+                if frame is not None:
+                    frames[field] = frame[frame.index.isin(kept_dates)]
+
+    return frames
+
+
+def to_yf_symbol(sym):
+    """yfinance uses '-' instead of '/' for preferred shares."""
+    return sym.replace("/", "-")
+
+
+def find_column(frame, sym):
+    """Return the column name holding `sym` in a downloaded frame, or None."""
+    if frame is None:
+        return None
+    yf_sym = to_yf_symbol(sym)
+    if yf_sym in frame.columns:
+        return yf_sym
+    if sym in frame.columns:
+        return sym
+    return None
 
-            df = yf.download(batch, **kwargs)
-            if df.empty:
-                print(f"  Warning: empty result for batch {i // batch_size + 1}")
-                continue
 
-            has_levels = isinstance(df.columns, type(df.columns)) and hasattr(df.columns, 'levels')
-
-            def extract_field(field):
-                if has_levels and field in df.columns.get_level_values(0):
-                    return df[field]
-                elif not has_levels:
-                    return df  # single ticker
-                return None
-
-            close = extract_field("Close")
-            opn = extract_field("Open")
-            high = extract_field("High")
-            low = extract_field("Low")
-            vol = extract_field("Volume")
-
-            def merge(existing, new):
-                if new is None:
-                    return existing
-                if existing is None:
-                    return new
-                merged = existing.join(new, how="outer", rsuffix="_dup")
-                return merged[[c for c in merged.columns if not c.endswith("_dup")]]
-
-            all_close = merge(all_close, close)
-            all_open = merge(all_open, opn)
-            all_high = merge(all_high, high)
-            all_low = merge(all_low, low)
-            all_volume = merge(all_volume, vol)
+def content_hash(payload):
+    """Short content hash of a store file; the dashboard uses it as a cache-busting
+    version so unchanged files can be served from the browser cache."""
+    return hashlib.sha1(payload).hexdigest()[:16]
 
-        except Exception as e:
-            print(f"  Error in batch {i // batch_size + 1}: {e}")
-
-    # Deduplicate and trim trailing sparse dates using close as reference
-    for frame_name, frame in [("close", all_close), ("open", all_open), ("high", all_high), ("low", all_low), ("volume", all_volume)]:
-        if frame is not None and frame.index.duplicated().any():
-            if frame_name == "close":
-                all_close = frame[~frame.index.duplicated(keep="last")]
-            elif frame_name == "open":
-                all_open = frame[~frame.index.duplicated(keep="last")]
-            elif frame_name == "high":
-                all_high = frame[~frame.index.duplicated(keep="last")]
-            elif frame_name == "low":
-                all_low = frame[~frame.index.duplicated(keep="last")]
-            elif frame_name == "volume":
-                all_volume = frame[~frame.index.duplicated(keep="last")]
-
-    if all_close is not None:
-        while len(all_close) > 0:
-            last_row = all_close.iloc[-1]
-            valid_pct = last_row.notna().sum() / len(last_row)
-            if valid_pct < 0.5:
-                dropped = all_close.index[-1].strftime("%Y-%m-%d")
-                all_close = all_close.iloc[:-1]
-                if all_open is not None: all_open = all_open.iloc[:-1]
-                if all_high is not None: all_high = all_high.iloc[:-1]
-                if all_low is not None: all_low = all_low.iloc[:-1]
-                if all_volume is not None: all_volume = all_volume.iloc[:-1]
-                print(f"  Dropped sparse trailing date {dropped} ({valid_pct:.0%} coverage)")
-            else:
-                break
 
-    return {"Close": all_close, "Open": all_open, "High": all_high, "Low": all_low, "Volume": all_volume}
+def file_hash(path):
+    """content_hash() of a file on disk."""
+    with open(path, "rb") as f:
+        return content_hash(f.read())
 
 
-def build_panel_json(panel, all_data, panel_index):
-    """Build the columnar JSON for a single panel including OHLC and volume."""
-    close_data = all_data["Close"]
-    open_data = all_data["Open"]
-    high_data = all_data["High"]
-    low_data = all_data["Low"]
-    volume_data = all_data.get("Volume")
+def chunk_filename(year, block):
+    """Relative path of the base chunk holding symbol block `block` for `year`."""
+    return f"{STORE_CHUNK_DIR}/{year}-{block:03d}.bin"
 
-    dates = [d.strftime("%Y-%m-%d") for d in close_data.index]
 
-    prices = {}
-    ohlc = {}
-    volume = {}
-    included_symbols = []
+def write_if_changed(path, payload):
+    """Write `payload` unless the file already holds exactly these bytes, so content
+    hashes (and the clients' cached copies) of unchanged files survive a rewrite.
+    Returns the number of bytes written."""
+    if os.path.exists(path) and os.path.getsize(path) == len(payload) and file_hash(path) == content_hash(payload):
+        return 0
+    with open(path, "wb") as f:
+        f.write(payload)
+    count_written(len(payload))
+    return len(payload)
 
-    def to_list(series):
-        result = []
-        for val in series:
-            if val is not None and not (isinstance(val, float) and val != val):
-                result.append(round(float(val), 4))
-            else:
-                result.append(None)
-        return result
 
+def year_row_ranges(dates):
+    """[(year, first row, end row)] of each calendar year in a sorted date list."""
+    ranges = []
+    for i, date in enumerate(dates):
+        if ranges and ranges[-1][0] == date[:4]:
+            ranges[-1][2] = i + 1
+        else:
+            ranges.append([date[:4], i, i + 1])
+    return [tuple(r) for r in ranges]
+
+
+def store_row_parts(manifest):
+    """Row ranges that append-only artifacts are split into, following the store's
+    own partition: one part per calendar year of the base rows, then one per day
+    file. Returns [(label, r0, r1)], the label being the year or the date."""
+    dates = manifest["dates"]
+    base = manifest.get("base", len(dates))
+    return year_row_ranges(dates[:base]) + [(dates[r], r, r + 1) for r in range(base, len(dates))]
+
+
+def write_row_parts(folder, manifest, matrix):
+    """Write a matrix with one row per store date as one file per store_row_parts()
+    range under STORE_DIR/folder. Past years are byte-identical from run to run and
+    are not rewritten, so a new date costs one small file; a compaction merges the
+    day parts into the current year's part. Parts no longer listed are removed.
+    Returns (manifest part entries, bytes written)."""
+    os.makedirs(os.path.join(STORE_DIR, folder), exist_ok=True)
+    parts = []
+    written = 0
+    for label, r0, r1 in store_row_parts(manifest):
+        rel = f"{folder}/{label}.bin"
+        payload = np.ascontiguousarray(matrix[r0:r1]).tobytes()
+        written += write_if_changed(os.path.join(STORE_DIR, rel), payload)
+        parts.append({"file": rel, "rows": [r0, r1], "hash": content_hash(payload)})
+    referenced = {os.path.join(STORE_DIR, part["file"]) for part in parts}
+    for path in glob.glob(os.path.join(STORE_DIR, folder, "*.bin")):
+        if path not in referenced:
+            os.remove(path)
+    return parts, written
+
+
+def row_parts_intact(entry, row_bytes):
+    """True if every part listed in a manifest entry exists with the size its rows imply."""
+    for part in entry["parts"]:
+        path = os.path.join(STORE_DIR, part["file"])
+        if not os.path.exists(path) or os.path.getsize(path) != (part["rows"][1] - part["rows"][0]) * row_bytes:
+            return False
+    return True
+
+
+def read_row_parts(entry, dtype, shape=()):
+    """Concatenate the row parts listed in a manifest entry: ndarray[rows, *shape]."""
+    chunks = []
+    for part in entry["parts"]:
+        with open(os.path.join(STORE_DIR, part["file"]), "rb") as f:
+            chunks.append(np.frombuffer(f.read(), dtype=dtype).reshape((-1,) + tuple(shape)))
+    return np.concatenate(chunks) if chunks else np.empty((0,) + tuple(shape), dtype=dtype)
+
+
+def build_panel_manifest(panel, symbols_in_store, panel_index):
+    """Reduce a panel to the lightweight manifest stored in the store manifest."""
+    included_symbols = []
     for sym in panel["symbols"]:
-        yf_sym = sym.replace("/", "-")
-        col = None
-        if yf_sym in close_data.columns:
-            col = yf_sym
-        elif sym in close_data.columns:
-            col = sym
-
-        if col is not None:
-            prices[sym] = to_list(close_data[col])
-            sym_ohlc = {}
-            if open_data is not None and col in open_data.columns:
-                sym_ohlc["o"] = to_list(open_data[col])
-            if high_data is not None and col in high_data.columns:
-                sym_ohlc["h"] = to_list(high_data[col])
-            if low_data is not None and col in low_data.columns:
-                sym_ohlc["l"] = to_list(low_data[col])
-            if sym_ohlc:
-                ohlc[sym] = sym_ohlc
-            if volume_data is not None and col in volume_data.columns:
-                vol_list = []
-                for val in volume_data[col]:
-                    if val is not None and not (isinstance(val, float) and val != val):
-                        vol_list.append(int(val))
-                    else:
-                        vol_list.append(None)
-                volume[sym] = vol_list
+        if sym in symbols_in_store:
             included_symbols.append(sym)
         else:
             print(f"  Panel {panel_index + 1}: ticker '{sym}' not found in data, skipping")
-
-    result = {
+    return {
         "title": panel["title"],
         "baseSymbol": panel["baseSymbol"],
         "symbols": included_symbols,
+    }
+
+
+def unique_panel_symbols():
+    """All panel symbols (original notation, e.g. 'ALB/PA'), deduplicated in panel order."""
+    seen = {}
+    for panel in PANELS:
+        for sym in panel["symbols"]:
+            seen.setdefault(sym, None)
+    return list(seen)
+
+
+def encode_store_columns(all_data, symbols):
+    """Encode the store's base chunks in one vectorized pass.
+
+    Each field frame is reindexed once to a (symbols x dates) matrix, rounded to
+    4 decimals and cast to the store dtype as a whole. Symbols present in the
+    close frame get consecutive slots; every STORE_BLOCK_SLOTS slots form a
+    block, cut into one chunk per calendar year. Chunk layout, field-major:
+    volume as float64 first (keeps the block 8-byte aligned), then
+    close/open/high/low as float32, each field slot-major (one run of the
+    year's rows per slot). Missing values are NaN.
+
+    A chunk's bytes depend only on its year's values and slots, so past years
+    encode identically from one run to the next.
+
+    Returns ({sym: first row with a close}, [(file, (r0, r1), (s0, s1), bytes)])."""
+    close_data = all_data["Close"]
+    present = [(sym, find_column(close_data, sym)) for sym in symbols]
+    present = [(sym, col) for sym, col in present if col is not None]
+    cols = [col for _, col in present]
+    n = len(close_data.index)
+
+    def matrix(field, dtype, decimals=None):
+        frame = all_data.get(field)
+        if frame is None:
+            values = np.full((len(cols), n), np.nan)
+        else:
+            values = frame.reindex(index=close_data.index, columns=cols).to_numpy(dtype=np.float64).T
+        if decimals is not None:
+            values = np.round(values, decimals)
+        return np.ascontiguousarray(values, dtype=dtype)
+
+    matrices = [matrix("Volume", STORE_VOLUME_DTYPE)]
+    matrices += [matrix(field, STORE_PRICE_DTYPE, 4) for _, field in STORE_PRICE_FIELDS]
+
+    valid = ~np.isnan(matrices[1])
+    starts = np.where(valid.any(axis=1), valid.argmax(axis=1), n)
+
+    dates = [d.strftime("%Y-%m-%d") for d in close_data.index]
+    chunks = []
+    for s0 in range(0, len(present), STORE_BLOCK_SLOTS):
+        s1 = min(s0 + STORE_BLOCK_SLOTS, len(present))
+        for year, r0, r1 in year_row_ranges(dates):
+            payload = b"".join(m[s0:s1, r0:r1].tobytes() for m in matrices)
+            chunks.append((chunk_filename(year, s0 // STORE_BLOCK_SLOTS), (r0, r1), (s0, s1), payload))
+    return {sym: int(starts[i]) for i, (sym, _) in enumerate(present)}, chunks
+
+
+def decode_chunk_columns(buf, slots, rows):
+    """Inverse of a chunk's layout from encode_store_columns: {field_key: ndarray[slots, rows]}."""
+    out = {}
+    offset = 0
+    for key, dtype in [("v", STORE_VOLUME_DTYPE)] + [(key, STORE_PRICE_DTYPE) for key, _ in STORE_PRICE_FIELDS]:
+        out[key] = np.frombuffer(buf, dtype=dtype, count=slots * rows, offset=offset).reshape(slots, rows)
+        offset += slots * rows * np.dtype(dtype).itemsize
+    return out
+
+
+def decode_symbol_columns(buf, rows):
+    """One symbol's (or one day file's) field-major columns: {field_key: ndarray[rows]}."""
+    return {key: m[0] for key, m in decode_chunk_columns(buf, 1, rows).items()}
+
+
+def write_store(all_data):
+    """Write the deduplicated store: the base chunks of every unique symbol plus the
+    manifest. Chunks whose bytes are already on disk are not rewritten, so only
+    the current year's chunks change between compactions. Any day files are
+    superseded and removed. Returns the manifest dict."""
+    close_data = all_data["Close"]
+    dates = [d.strftime("%Y-%m-%d") for d in close_data.index]
+    os.makedirs(os.path.join(STORE_DIR, STORE_CHUNK_DIR), exist_ok=True)
+
+    starts, encoded = encode_store_columns(all_data, unique_panel_symbols())
+    symbols = {sym: {"slot": slot, "start": start} for slot, (sym, start) in enumerate(starts.items())}
+
+    chunks = []
+    written = kept = 0
+    for rel, rows, slots, payload in encoded:
+        nbytes = write_if_changed(os.path.join(STORE_DIR, rel), payload)
+        written += nbytes
+        kept += len(payload) - nbytes
+        chunks.append({"file": rel, "rows": list(rows), "slots": list(slots), "hash": content_hash(payload)})
+
+    panels = [build_panel_manifest(panel, symbols, i) for i, panel in enumerate(PANELS)]
+
+    manifest = {
+        "version": STORE_VERSION,
+        "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "layout": {
+            "volume": STORE_VOLUME_DTYPE,
+            "price": STORE_PRICE_DTYPE,
+            "fields": ["v"] + [key for key, _ in STORE_PRICE_FIELDS],
+        },
         "dates": dates,
-        "prices": prices,
+        "base": len(dates),
+        "blockSlots": STORE_BLOCK_SLOTS,
+        "symbols": symbols,
+        "chunks": chunks,
+        "days": [],
+        "panels": panels,
+    }
+    write_manifest(manifest)
+
+    # Drop chunks no longer referenced, per-symbol files of the v2 layout, and day files
+    referenced = {os.path.join(STORE_DIR, chunk["file"]) for chunk in chunks}
+    for path in glob.glob(os.path.join(STORE_DIR, STORE_CHUNK_DIR, "*.bin")):
+        if path not in referenced:
+            os.remove(path)
+    for path in glob.glob(os.path.join(STORE_DIR, "sym", "*.bin")):
+        os.remove(path)
+    for path in glob.glob(os.path.join(STORE_DIR, "days", "*.bin")):
+        os.remove(path)
+
+    print(f"  Wrote store: {len(symbols)} symbols x {len(dates)} dates in {len(chunks)} chunks, "
+          f"{written / 1024:.0f} KB written, {kept / 1024:.0f} KB unchanged "
+          f"+ {os.path.getsize(STORE_MANIFEST) / 1024:.0f} KB manifest")
+    return manifest
+
+
+def dump_json(obj, path):
+    """Write compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+    count_written(os.path.getsize(path))
+
+
+def write_manifest(manifest):
+    """Write the store manifest (the only file rewritten by an incremental run)."""
+    manifest["updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    dump_json(manifest, STORE_MANIFEST)
+
+
+def write_day_files(manifest, new_data, index):
+    """Append one day file per date in `index` holding that day's row for every
+    symbol slot, and register them in the manifest. Returns bytes written.
+
+    Day layout mirrors a base chunk of one row, field-major across slots:
+    volume float64 for all slots, then close/open/high/low float32 for all slots."""
+    os.makedirs(os.path.join(STORE_DIR, "days"), exist_ok=True)
+    slots = sorted(manifest["symbols"], key=lambda s: manifest["symbols"][s]["slot"])
+    columns = [to_yf_symbol(sym) for sym in slots]
+
+    matrices = {}
+    for key, field in [("v", "Volume")] + STORE_PRICE_FIELDS:
+        frame = new_data.get(field)
+        if frame is None:
+            values = np.full((len(index), len(columns)), np.nan)
+        else:
+            values = frame.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+        if key == "v":
+            matrices[key] = values.astype(STORE_VOLUME_DTYPE)
+        else:
+            matrices[key] = np.round(values, 4).astype(STORE_PRICE_DTYPE)
+
+    written = 0
+    for i, ts in enumerate(index):
+        date = ts.strftime("%Y-%m-%d")
+        rel = f"days/{date}.bin"
+        payload = matrices["v"][i].tobytes() + b"".join(
+            matrices[key][i].tobytes() for key, _ in STORE_PRICE_FIELDS
+        )
+        with open(os.path.join(STORE_DIR, rel), "wb") as f:
+            f.write(payload)
+        count_written(len(payload))
+        written += len(payload)
+        manifest["dates"].append(date)
+        manifest["days"].append({"date": date, "file": rel, "count": len(slots), "hash": content_hash(payload)})
+    return written
+
+
+def decode_day_row(buf, count):
+    """Inverse of the day layout written by write_day_files: {field_key: ndarray[count]}."""
+    return decode_symbol_columns(buf, count)
+
+
+def load_store_manifest():
+    """Return the parsed store manifest, or None if there is no store yet."""
+    if not os.path.exists(STORE_MANIFEST):
+        return None
+    try:
+        with open(STORE_MANIFEST) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+
+def read_base_columns(manifest):
+    """Base rows of every slot as {field_key: ndarray[slots, base]} (NaN where a
+    chunk has no value), from the chunks or, for a v2 store, the per-symbol files."""
+    n_slots = len(manifest["symbols"])
+    if "chunks" not in manifest:
+        base = len(manifest["dates"]) - len(manifest.get("days", []))
+        out = {key: np.full((n_slots, base), np.nan) for key in ["v"] + [k for k, _ in STORE_PRICE_FIELDS]}
+        for meta in manifest["symbols"].values():
+            with open(os.path.join(STORE_DIR, meta["file"]), "rb") as f:
+                decoded = decode_symbol_columns(f.read(), meta["n"] - meta["start"])
+            for key, values in decoded.items():
+                out[key][meta["slot"], meta["start"]:meta["n"]] = values
+        return out
+    out = {key: np.full((n_slots, manifest["base"]), np.nan) for key in ["v"] + [k for k, _ in STORE_PRICE_FIELDS]}
+    for chunk in manifest["chunks"]:
+        (r0, r1), (s0, s1) = chunk["rows"], chunk["slots"]
+        with open(os.path.join(STORE_DIR, chunk["file"]), "rb") as f:
+            decoded = decode_chunk_columns(f.read(), s1 - s0, r1 - r0)
+        for key, values in decoded.items():
+            out[key][s0:s1, r0:r1] = values
+    return out
+
+
+def load_store(manifest):
+    """Read the base chunks plus the day files back into the frame dict shape
+    returned by fetch_all_data() (columns keyed by yfinance symbol)."""
+    index = pd.DatetimeIndex(pd.to_datetime(manifest["dates"]))
+    n = len(index)
+    date_pos = {d: i for i, d in enumerate(manifest["dates"])}
+    base = read_base_columns(manifest)
+    rows = {key: np.full((n, len(manifest["symbols"])), np.nan) for key in base}
+    for key, values in base.items():
+        rows[key][:values.shape[1]] = values.T
+    for day in manifest.get("days", []):
+        with open(os.path.join(STORE_DIR, day["file"]), "rb") as f:
+            decoded = decode_day_row(f.read(), day["count"])
+        for key, values in decoded.items():
+            rows[key][date_pos[day["date"]], :day["count"]] = values
+
+    columns = [to_yf_symbol(sym) for sym in store_slots(manifest)]
+    frames = {}
+    for key, field in [("v", "Volume")] + STORE_PRICE_FIELDS:
+        # float32 back to the 4-decimal values that were stored
+        values = rows[key] if key == "v" else np.round(rows[key], 4)
+        frames[field] = pd.DataFrame(values, index=index, columns=columns, dtype=np.float64)
+    return frames
+
+
+def compact_store(manifest):
+    """Fold accumulated day files back into the base chunks (also rewrites a store
+    of an older layout). Analytics entries are carried over; their universe
+    fingerprints decide whether they still apply to the rewritten slots."""
+    print(f"Compacting store: folding {len(manifest.get('days', []))} day file(s) into base chunks")
+    compacted = write_store(load_store(manifest))
+    for key in STORE_ANALYTICS_KEYS:
+        if key in manifest:
+            compacted[key] = manifest[key]
+    write_manifest(compacted)
+    return compacted
+
+
+def store_slots(manifest):
+    """Store symbols in slot order."""
+    return sorted(manifest["symbols"], key=lambda s: manifest["symbols"][s]["slot"])
+
+
+def universe_fingerprint(manifest):
+    """Short hash of the slot order; artifacts laid out by slot are only valid
+    for the universe they were computed against."""
+    return hashlib.sha1("\n".join(store_slots(manifest)).encode()).hexdigest()[:16]
+
+
+def store_close_matrix(manifest, all_data):
+    """Close prices as a (dates x slots) float64 matrix in store slot order."""
+    slots = sorted(manifest["symbols"], key=lambda s: manifest["symbols"][s]["slot"])
+    return all_data["Close"].reindex(columns=[to_yf_symbol(s) for s in slots]).to_numpy(dtype=np.float64)
+
+
+def compute_rs_scores(close, rows=None):
+    """Weighted RS score for each (date, symbol): the RS_LOOKBACKS-weighted % return,
+    divided by the weights that had a valid past price. NaN where undefined.
+
+    Mirrors computeAllRSRatings() in index.html: the lookback index is clamped to
+    the first row, and row 0 has no lookback. `rows` restricts the output to
+    those date indices (all dates by default)."""
+    n = close.shape[0]
+    rows = np.arange(n) if rows is None else np.asarray(rows)
+    current = close[rows]
+    weighted = np.zeros(current.shape)
+    total = np.zeros(current.shape)
+    for days, weight in RS_LOOKBACKS:
+        past_idx = np.maximum(rows - days, 0)
+        past = close[past_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = (current / past - 1) * 100
+        ok = ~np.isnan(ret) & (past != 0) & (past_idx < rows)[:, None]
+        weighted += np.where(ok, ret * weight, 0.0)
+        total += np.where(ok, weight, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def rank_percentiles(scores):
+    """Cross-sectional percentile (0 = worst, 100 = best) of each row's non-NaN
+    scores, ties broken by column order like a stable JS sort. Returns uint8 with
+    RS_MISSING where the score is NaN."""
+    valid = ~np.isnan(scores)
+    counts = valid.sum(axis=1)
+    order = np.argsort(np.where(valid, scores, np.inf), axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1])[None, :], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = ranks / (counts - 1)[:, None] * 100
+    pct = np.where((counts == 1)[:, None], 50, pct)
+    return np.where(valid, np.rint(pct), RS_MISSING).astype(np.uint8)
+
+
+def write_rs_parts(manifest, ratings):
+    """Write the (dates x slots) RS Rating matrix as row parts and update the
+    manifest entry. Returns bytes written."""
+    parts, written = write_row_parts(RS_DIR, manifest, ratings)
+    legacy = os.path.join(STORE_DIR, "rs_ratings.bin")   # single-file layout
+    if os.path.exists(legacy):
+        os.remove(legacy)
+    manifest["rs"] = {
+        "dir": RS_DIR,
+        "parts": parts,
+        "rows": int(ratings.shape[0]),
+        "cols": int(ratings.shape[1]),
+        "missing": RS_MISSING,
+        "universe": universe_fingerprint(manifest),
+        "lookbacks": [{"days": d, "weight": w} for d, w in RS_LOOKBACKS],
+    }
+    write_manifest(manifest)
+    return written
+
+
+def read_rs_ratings(manifest):
+    """The published RS Rating matrix, (rows x cols) uint8."""
+    rs = manifest["rs"]
+    return read_row_parts(rs, np.uint8, (rs["cols"],))
+
+
+def write_rs_ratings(manifest, all_data):
+    """Compute the RS Rating matrix for every store symbol and write it as a
+    (dates x slots) uint8 artifact next to the store."""
+    close = store_close_matrix(manifest, all_data)
+    ratings = rank_percentiles(compute_rs_scores(close))
+    written = write_rs_parts(manifest, ratings)
+    print(f"  Wrote {RS_DIR}/: {ratings.shape[0]} dates x {ratings.shape[1]} symbols "
+          f"in {len(manifest['rs']['parts'])} parts, {written / 1024:.0f} KB written")
+
+
+def update_rs_ratings(manifest, all_data):
+    """Append RS Ratings for dates added since the last run, ranking only those
+    rows; each new date becomes a small day part. Falls back to
+    write_rs_ratings() when there is no usable matrix: after a full refresh, a
+    universe change, or parts that do not line up."""
+    rs = manifest.get("rs")
+    n = len(manifest["dates"])
+    reason = None
+    if not rs or "parts" not in rs:
+        reason = "no existing matrix"
+    elif rs.get("universe") != universe_fingerprint(manifest) or rs["cols"] != len(manifest["symbols"]):
+        reason = "universe changed"
+    elif rs["rows"] > n or not row_parts_intact(rs, rs["cols"]):
+        reason = "parts do not match the date axis"
+    if reason:
+        print(f"  RS ratings: full recompute ({reason})")
+        write_rs_ratings(manifest, all_data)
+        return
+
+    old = read_rs_ratings(manifest)
+    if rs["rows"] == n and [p["rows"] for p in rs["parts"]] == [[r0, r1] for _, r0, r1 in store_row_parts(manifest)]:
+        print("  RS ratings: up to date")
+        return
+    close = store_close_matrix(manifest, all_data)
+    rows = np.arange(rs["rows"], n)
+    ratings = np.vstack([old, rank_percentiles(compute_rs_scores(close, rows))])
+    written = write_rs_parts(manifest, ratings)
+    print(f"  Appended {len(rows)} date(s) to {RS_DIR}/, {written / 1024:.0f} KB written")
+
+
+def indicator_filename(sym):
+    """Relative path of a symbol's indicator bundle inside the store."""
+    return f"{INDICATOR_DIR}/{to_yf_symbol(sym)}.bin"
+
+
+def indicator_day_filename(date):
+    """Relative path of the indicator day file holding every symbol's bars as of `date`."""
+    return f"{INDICATOR_DIR}/{INDICATOR_DAY_DIR}/{date}.bin"
+
+
+def bar_keys(dates, timeframe):
+    """Calendar bucket of each date for a grid timeframe, like barKey() in index.html:
+    the date itself, runs of three weekdays counted from Monday 1970-01-05, the
+    Monday-based week, or the month. Bars are anchored to the calendar, so a bar
+    never changes once its bucket is over and only the last one is still forming."""
+    if timeframe == "daily":
+        return np.arange(len(dates))
+    day = np.array(dates, dtype="datetime64[D]")
+    if timeframe == "monthly":
+        return day.astype("datetime64[M]").astype(np.int64)
+    day = day.astype(np.int64)
+    if timeframe == "weekly":
+        return (day + 3) // 7
+    since = day - 4
+    return (since // 7 * 5 + np.minimum(since % 7, 4)) // 3
+
+
+def bar_index(dates, timeframe):
+    """Bar number of each date for a grid timeframe (barRows() in index.html)."""
+    keys = bar_keys(dates, timeframe)
+    return np.concatenate([[0], np.cumsum(keys[1:] != keys[:-1])]).astype(np.int64)
+
+
+def resample_bars(cols, index):
+    """Aggregate daily (dates x symbols) columns into the bars numbered by `index`
+    (see bar_index()), like resampleBars() in index.html: open of the first and
+    close of the last day with a close, high/low extremes and summed volume of
+    those days. Bars without any close are NaN."""
+    n = len(index)
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    valid = ~np.isnan(cols["c"])
+    rows = np.arange(n)[:, None]
+    last = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)[np.r_[starts[1:], n] - 1]
+    first = np.minimum.accumulate(np.where(valid, rows, n)[::-1], axis=0)[::-1][starts]
+    has = last >= starts[:, None]
+    bars = {
+        "c": np.take_along_axis(cols["c"], np.maximum(last, 0), axis=0),
+        "o": np.take_along_axis(cols["o"], np.minimum(first, n - 1), axis=0),
+        "h": np.maximum.reduceat(np.where(valid, cols["h"], -np.inf), starts, axis=0),
+        "l": np.minimum.reduceat(np.where(valid, cols["l"], np.inf), starts, axis=0),
+        "v": np.add.reduceat(np.where(valid, np.nan_to_num(cols["v"]), 0.0), starts, axis=0),
+    }
+    return {key: np.where(has, m, np.nan) for key, m in bars.items()}
+
+
+def sma_columns(values, period):
+    """computeSMAArray() for every column at once: a running sum of the last
+    `period` rows, added and removed in the same order as the JS so results match
+    bit for bit. NaN unless all `period` rows are present."""
+    out = np.full(values.shape, np.nan)
+    total = np.zeros(values.shape[1])
+    count = np.zeros(values.shape[1], dtype=int)
+    for r, row in enumerate(values):
+        ok = ~np.isnan(row)
+        total = np.where(ok, total + row, total)
+        count += ok
+        if r >= period:
+            gone = values[r - period]
+            dropped = ~np.isnan(gone)
+            total = np.where(dropped, total - gone, total)
+            count -= dropped
+        if r >= period - 1:
+            out[r] = np.where(count == period, total / period, np.nan)
+    return out
+
+
+def ema_columns(close, span):
+    """emaSmooth() for every column at once: seeded with the first value, NaN rows
+    skipped without resetting, NaN output where the input is NaN."""
+    k = 2 / (span + 1)
+    out = np.full(close.shape, np.nan)
+    prev = np.full(close.shape[1], np.nan)
+    for r, row in enumerate(close):
+        ok = ~np.isnan(row)
+        prev = np.where(ok, np.where(np.isnan(prev), row, row * k + prev * (1 - k)), prev)
+        out[r] = np.where(ok, prev, np.nan)
+    return out
+
+
+def rsi_columns(close, period):
+    """computeRSIArray() for every column at once: Wilder smoothing over each
+    column's non-NaN values, seeded with the mean of the first `period` changes."""
+    out = np.full(close.shape, np.nan)
+    seen = np.zeros(close.shape[1], dtype=int)
+    prev = np.full(close.shape[1], np.nan)
+    gain = np.zeros(close.shape[1])
+    loss = np.zeros(close.shape[1])
+    for r, row in enumerate(close):
+        ok = ~np.isnan(row)
+        change = row - prev
+        up = change > 0
+        seed = ok & (seen >= 1) & (seen <= period)
+        gain = np.where(seed & up, gain + change, gain)
+        loss = np.where(seed & ~up, loss - change, loss)
+        first = ok & (seen == period)
+        gain = np.where(first, gain / period, gain)
+        loss = np.where(first, loss / period, loss)
+        step = ok & (seen > period)
+        gain = np.where(step, (gain * (period - 1) + np.where(up, change, 0)) / period, gain)
+        loss = np.where(step, (loss * (period - 1) + np.where(change < 0, -change, 0)) / period, loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(loss == 0, 100.0, 100 - (100 / (1 + gain / loss)))
+        out[r] = np.where(first | step, rsi, np.nan)
+        prev = np.where(ok, row, prev)
+        seen += ok
+    return out
+
+
+def awesome_oscillator_columns(high, low):
+    """computeAOArray() for every column at once: SMA(5) - SMA(34) of the (H+L)/2
+    median. NaN rows count as gaps, so callers pass bars compacted to those with a
+    close."""
+    median = (high + low) / 2
+    return sma_columns(median, 5) - sma_columns(median, 34)
+
+
+def bar_indicators(bars):
+    """Add the grid tile's EMA8/EMA21, MA10/MA50/MA200, RSI(14) and AO to resampled
+    bars in place, computed like computeTileSpark() over each column's bars with a
+    close only, so empty bars (before a listing, long halts) do not break the
+    windows. NaN on empty bars."""
+    valid = ~np.isnan(bars["c"])
+    order = np.argsort(~valid, axis=0, kind="stable")
+    close = np.take_along_axis(bars["c"], order, axis=0)
+    computed = {
+        "ema8": ema_columns(close, 8),
+        "ema21": ema_columns(close, 21),
+        "ma10": sma_columns(close, 10),
+        "ma50": sma_columns(close, 50),
+        "ma200": sma_columns(close, 200),
+        "rsi": rsi_columns(close, INDICATOR_RSI_PERIOD),
+        "ao": awesome_oscillator_columns(np.take_along_axis(bars["h"], order, axis=0),
+                                         np.take_along_axis(bars["l"], order, axis=0)),
+    }
+    for key, m in computed.items():
+        out = np.empty(m.shape)
+        np.put_along_axis(out, order, m, axis=0)
+        bars[key] = np.where(valid, out, np.nan)
+    return bars
+
+
+def indicator_daily_columns(manifest, all_data):
+    """Daily v/c/o/h/l as (dates x slots) float64 matrices, o/h/l filled with the
+    close where missing as the grid tile does."""
+    columns = [to_yf_symbol(sym) for sym in store_slots(manifest)]
+    daily = {
+        key: all_data[field].reindex(columns=columns).to_numpy(dtype=np.float64)
+        for key, field in [("v", "Volume")] + STORE_PRICE_FIELDS
+    }
+    for key in ("o", "h", "l"):
+        daily[key] = np.where(np.isnan(daily[key]), daily["c"], daily[key])
+    return daily
+
+
+def indicator_bars(dates, daily, rows):
+    """Bars and indicators of every grid timeframe over the first `rows` dates:
+    {timeframe: (bar index per date, {field: (bars x slots)})}."""
+    window = {key: m[:rows] for key, m in daily.items()}
+    out = {}
+    for timeframe, _ in INDICATOR_TIMEFRAMES:
+        index = bar_index(dates[:rows], timeframe)
+        out[timeframe] = (index, bar_indicators(resample_bars(window, index)))
+    return out
+
+
+def indicator_base_sizes(dates, base):
+    """Bars of each timeframe held in a bundle computed over the first `base` dates."""
+    return [min(keep, int(bar_index(dates[:base], timeframe)[-1]) + 1)
+            for timeframe, keep in INDICATOR_TIMEFRAMES]
+
+
+def encode_indicator_bundles(dates, daily, base):
+    """Compute every store symbol's indicator bundle as of the first `base` dates
+    in one vectorized pass.
+
+    Each grid timeframe (INDICATOR_TIMEFRAMES) is resampled into calendar bars and
+    its indicators computed over the whole history, then only the last bars kept
+    for that timeframe are stored. Layout per symbol: every timeframe's volume as
+    float64 first, then per timeframe the INDICATOR_FIELDS as float32. NaN where a
+    bar has no close.
+
+    Returns [bytes] in slot order."""
+    computed = indicator_bars(dates, daily, base)
+    volumes, values = [], []
+    for (timeframe, _), size in zip(INDICATOR_TIMEFRAMES, indicator_base_sizes(dates, base)):
+        bars = computed[timeframe][1]
+        tail = slice(bars["c"].shape[0] - size, None)
+        volumes.append(np.ascontiguousarray(bars["v"][tail].T, dtype=STORE_VOLUME_DTYPE))
+        values.extend(np.ascontiguousarray(bars[key][tail].T, dtype=STORE_PRICE_DTYPE)
+                      for key in INDICATOR_FIELDS)
+    return [b"".join(m[j].tobytes() for m in volumes + values) for j in range(daily["c"].shape[1])]
+
+
+class IndicatorState:
+    """Running state of the grid tile indicators (bar_indicators()) over one bar
+    row of every slot at a time, so the bars of new dates extend the state instead
+    of recomputing the whole history. Empty bars are skipped per slot, as
+    bar_indicators() compacts them away, and every update repeats its arithmetic
+    in the same order, so values match bit for bit."""
+
+    MA_PERIODS = (10, 50, 200)
+    AO_PERIODS = (5, 34)
+
+    def __init__(self, n_cols):
+        self.seen = np.zeros(n_cols, dtype=int)           # bars with a close so far
+        self.ema = {span: np.full(n_cols, np.nan) for span in (8, 21)}
+        self.closes = np.full((max(self.MA_PERIODS), n_cols), np.nan)    # ring by `seen`
+        self.medians = np.full((max(self.AO_PERIODS), n_cols), np.nan)
+        self.ma = {period: np.zeros(n_cols) for period in self.MA_PERIODS}
+        self.ao = {period: np.zeros(n_cols) for period in self.AO_PERIODS}
+        self.prev = np.full(n_cols, np.nan)
+        self.gain = np.zeros(n_cols)
+        self.loss = np.zeros(n_cols)
+
+    def _sma(self, totals, ring, period, value, ok):
+        """sma_columns() one row on: the new running total and SMA."""
+        cols = np.arange(len(value))
+        total = np.where(ok, totals[period] + value, totals[period])
+        full = ok & (self.seen >= period)
+        with np.errstate(invalid="ignore"):
+            total = np.where(full, total - ring[(self.seen - period) % len(ring), cols], total)
+        return total, np.where(ok & (self.seen >= period - 1), total / period, np.nan)
+
+    def step(self, bar, commit=True):
+        """Indicators of one bar row ({c, h, l} per slot), NaN where the bar has no
+        close. With commit=False the state is left as it was: the bar is still
+        forming and the next date replaces it."""
+        ok = ~np.isnan(bar["c"])
+        close = bar["c"]
+        out, ema, ma, ao = {}, {}, {}, {}
+        for span, prev in self.ema.items():
+            k = 2 / (span + 1)
+            ema[span] = np.where(ok, np.where(np.isnan(prev), close, close * k + prev * (1 - k)), prev)
+            out[f"ema{span}"] = np.where(ok, ema[span], np.nan)
+        for period in self.MA_PERIODS:
+            ma[period], out[f"ma{period}"] = self._sma(self.ma, self.closes, period, close, ok)
+        median = (bar["h"] + bar["l"]) / 2
+        smas = {}
+        for period in self.AO_PERIODS:
+            ao[period], smas[period] = self._sma(self.ao, self.medians, period, median, ok)
+        out["ao"] = smas[5] - smas[34]
+
+        # rsi_columns() one row on
+        period = INDICATOR_RSI_PERIOD
+        seen = self.seen
+        change = close - self.prev
+        up = change > 0
+        seed = ok & (seen >= 1) & (seen <= period)
+        gain = np.where(seed & up, self.gain + change, self.gain)
+        loss = np.where(seed & ~up, self.loss - change, self.loss)
+        first = ok & (seen == period)
+        gain = np.where(first, gain / period, gain)
+        loss = np.where(first, loss / period, loss)
+        later = ok & (seen > period)
+        gain = np.where(later, (gain * (period - 1) + np.where(up, change, 0)) / period, gain)
+        loss = np.where(later, (loss * (period - 1) + np.where(change < 0, -change, 0)) / period, loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(loss == 0, 100.0, 100 - (100 / (1 + gain / loss)))
+        out["rsi"] = np.where(first | later, rsi, np.nan)
+
+        if commit:
+            cols = np.flatnonzero(ok)
+            self.closes[seen[cols] % len(self.closes), cols] = close[cols]
+            self.medians[seen[cols] % len(self.medians), cols] = median[cols]
+            self.ema, self.ma, self.ao = ema, ma, ao
+            self.prev = np.where(ok, close, self.prev)
+            self.gain, self.loss = gain, loss
+            self.seen = seen + ok
+        return out
+
+
+def encode_indicator_days(dates, daily, first):
+    """Indicator day files for dates `first` onward: every symbol's current bar of
+    each timeframe as of that date, in the bundle layout with one entry per slot
+    (all timeframes' volumes, then their fields).
+
+    The bars that are over before `first` run through IndicatorState once; each
+    date then only adds the bars completed since and its own forming bar, so a
+    catch-up over several dates costs one pass over the history.
+
+    Returns [bytes] for dates[first:]."""
+    n = len(dates)
+    volumes = [[] for _ in range(first, n)]
+    values = [[] for _ in range(first, n)]
+    for timeframe, _ in INDICATOR_TIMEFRAMES:
+        index = bar_index(dates, timeframe)
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        bars = resample_bars(daily, index)      # final for every bar over before the last date
+        state = IndicatorState(daily["c"].shape[1])
+        done = 0
+        for k, row in enumerate(range(first, n)):
+            while done < index[row]:
+                state.step({key: m[done] for key, m in bars.items()})
+                done += 1
+            window = {key: m[starts[index[row]]:row + 1] for key, m in daily.items()}
+            forming = {key: m[0] for key, m in resample_bars(window, np.zeros(len(window["c"]), dtype=np.int64)).items()}
+            forming.update(state.step(forming, commit=False))
+            volumes[k].append(forming["v"].astype(STORE_VOLUME_DTYPE).tobytes())
+            values[k].extend(forming[key].astype(STORE_PRICE_DTYPE).tobytes() for key in INDICATOR_FIELDS)
+    return [b"".join(v + f) for v, f in zip(volumes, values)]
+
+
+def decode_indicator_bundle(buf, sizes):
+    """Inverse of encode_indicator_bundles() given the bars held per timeframe
+    (indicator_base_sizes()); a day file decodes with the slot count for every
+    timeframe. Returns {timeframe: {field: ndarray}}."""
+    vol_size = np.dtype(STORE_VOLUME_DTYPE).itemsize
+    value_size = np.dtype(STORE_PRICE_DTYPE).itemsize
+    out = {}
+    offset = 0
+    for (timeframe, _), n in zip(INDICATOR_TIMEFRAMES, sizes):
+        out[timeframe] = {"v": np.frombuffer(buf, dtype=STORE_VOLUME_DTYPE, count=n, offset=offset)}
+        offset += n * vol_size
+    for (timeframe, _), n in zip(INDICATOR_TIMEFRAMES, sizes):
+        for field in INDICATOR_FIELDS:
+            out[timeframe][field] = np.frombuffer(buf, dtype=STORE_PRICE_DTYPE, count=n, offset=offset)
+            offset += n * value_size
+    return out
+
+
+def indicator_layout():
+    """The manifest's description of the bundle layout; bundles written with
+    another layout are recomputed."""
+    return {
+        "timeframes": [{"key": key, "bars": bars} for key, bars in INDICATOR_TIMEFRAMES],
+        "fields": ["v"] + INDICATOR_FIELDS,
+        "rsiPeriod": INDICATOR_RSI_PERIOD,
     }
-    if ohlc:
-        result["ohlc"] = ohlc
-    if volume:
-        result["volume"] = volume
-    return result
+
+
+def indicator_files_intact(manifest, ind):
+    """True if every bundle and day file listed in the manifest entry exists with
+    the size the layout implies."""
+    bar_bytes = np.dtype(STORE_VOLUME_DTYPE).itemsize + len(INDICATOR_FIELDS) * np.dtype(STORE_PRICE_DTYPE).itemsize
+    base_bytes = sum(indicator_base_sizes(manifest["dates"], ind["base"])) * bar_bytes
+    day_bytes = len(INDICATOR_TIMEFRAMES) * ind["cols"] * bar_bytes
+    expected = [(os.path.join(STORE_DIR, indicator_filename(sym)), base_bytes) for sym in manifest["symbols"]]
+    expected += [(os.path.join(STORE_DIR, day["file"]), day_bytes) for day in ind["days"]]
+    return all(os.path.exists(path) and os.path.getsize(path) == size for path, size in expected)
+
+
+def write_indicator_bundles(manifest, daily):
+    """Write one indicator bundle per store symbol as of the store base, drop the
+    indicator day files and describe the bundles in the manifest. Returns bytes written."""
+    base = manifest.get("base", len(manifest["dates"]))
+    os.makedirs(os.path.join(STORE_DIR, INDICATOR_DIR), exist_ok=True)
+    referenced = set()
+    written = 0
+    digest = hashlib.sha1()
+    for sym, payload in zip(store_slots(manifest), encode_indicator_bundles(manifest["dates"], daily, base)):
+        path = os.path.join(STORE_DIR, indicator_filename(sym))
+        written += write_if_changed(path, payload)
+        referenced.add(path)
+        digest.update(payload)
+    for path in glob.glob(os.path.join(STORE_DIR, INDICATOR_DIR, "*.bin")):
+        if path not in referenced:
+            os.remove(path)
+    for path in glob.glob(os.path.join(STORE_DIR, INDICATOR_DIR, INDICATOR_DAY_DIR, "*.bin")):
+        os.remove(path)
+
+    manifest["indicators"] = {
+        "dir": INDICATOR_DIR,
+        "hash": digest.hexdigest()[:16],   # bundles are only rewritten together, at compaction
+        "base": base,
+        "rows": base,
+        "cols": len(referenced),
+        "universe": universe_fingerprint(manifest),
+        **indicator_layout(),
+        "days": [],
+    }
+    return written
+
+
+def update_indicator_bundles(manifest, all_data):
+    """Bring the indicator bundles up to the last store date. Each date added since
+    the last run becomes one day file with every symbol's current bar per
+    timeframe; the per-symbol bundles are only rewritten when the store base moves
+    (a compaction or full refresh), the universe or the layout changes, or the
+    files do not line up."""
+    ind = manifest.get("indicators")
+    dates = manifest["dates"]
+    n = len(dates)
+    reason = None
+    if not ind or "days" not in ind:
+        reason = "no existing bundles"
+    elif ind.get("universe") != universe_fingerprint(manifest) or ind["cols"] != len(manifest["symbols"]):
+        reason = "universe changed"
+    elif any(ind.get(key) != value for key, value in indicator_layout().items()):
+        reason = "layout changed"
+    elif ind["base"] != manifest.get("base", n):
+        reason = "store base moved"
+    elif ind["rows"] > n or not indicator_files_intact(manifest, ind):
+        reason = "files do not match the date axis"
+
+    daily = indicator_daily_columns(manifest, all_data)
+    written = 0
+    if reason:
+        written = write_indicator_bundles(manifest, daily)
+        ind = manifest["indicators"]
+        print(f"  Indicator bundles: rewrote {ind['cols']} bundles as of {ind['base']} dates ({reason})")
+    elif ind["rows"] == n:
+        print("  Indicator bundles: up to date")
+        return
+
+    os.makedirs(os.path.join(STORE_DIR, INDICATOR_DIR, INDICATOR_DAY_DIR), exist_ok=True)
+    for row, payload in enumerate(encode_indicator_days(dates, daily, ind["rows"]), ind["rows"]):
+        rel = indicator_day_filename(dates[row])
+        written += write_if_changed(os.path.join(STORE_DIR, rel), payload)
+        ind["days"].append({"date": dates[row], "file": rel, "hash": content_hash(payload)})
+    added = n - ind["rows"]
+    ind["rows"] = n
+    write_manifest(manifest)
+    print(f"  Indicator bundles: {added} day file(s), {written / 1024:.0f} KB written")
+
+
+def pairwise_rsi_columns(close, period):
+    """The grid view's RSI for every column at once: Wilder smoothing over
+    day-to-day changes, skipping any change with a NaN on either day. Unlike
+    rsi_columns() the seed covers rows 1..period by position, as in the JS."""
+    n = close.shape[0]
+    out = np.full(close.shape, np.nan)
+    gain = np.zeros(close.shape[1])
+    loss = np.zeros(close.shape[1])
+    for r in range(1, n):
+        ok = ~np.isnan(close[r]) & ~np.isnan(close[r - 1])
+        change = close[r] - close[r - 1]
+        if r <= period:
+            gain = np.where(ok & (change > 0), gain + change, gain)
+            loss = np.where(ok & ~(change > 0), loss - change, loss)
+            if r < period:
+                continue
+            gain = np.where(ok, gain / period, gain)
+            loss = np.where(ok, loss / period, loss)
+        else:
+            gain = np.where(ok, (gain * (period - 1) + np.where(change > 0, change, 0)) / period, gain)
+            loss = np.where(ok, (loss * (period - 1) + np.where(change < 0, -change, 0)) / period, loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+        out[r] = np.where(ok, rsi, np.nan)
+    return out
+
+
+def window_return(closes, end, window):
+    """getWindowReturn(): % return over `window` rows ending at `end`, or None."""
+    start = end - window
+    if start < 0:
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = (closes[end] / closes[start] - 1) * 100
+    return float(ret) if np.isfinite(ret) else None
+
+
+def rotation_stage(r10, r20, r40):
+    """Rotation stage 1-4 (Accumulation, Markup, Distribution, Decline) from
+    relative returns over the short/mid/long swing windows."""
+    if r10 < 0 and r20 < 0 and r40 < 0:
+        return 4
+    if r40 < 0 and r10 > 0:
+        return 1
+    if r10 > 0 and r20 > 0 and r40 > 0:
+        return 2
+    if r40 > 0 and r10 < 0:
+        return 3
+    return 2 if (r10 > 0) + (r20 > 0) + (r40 > 0) >= 2 else 4
+
+
+def compute_swing_scores(manifest, close, ratings):
+    """computeAllSwingScores() for every rotation benchmark at once.
+
+    Walks the panels in order like the dashboard, so a symbol listed in several
+    panels keeps the scores of the last one (its sector context). Returns
+    {slot: record}; ETFs are not skipped here, the dashboard drops them."""
+    slot_of = {sym: meta["slot"] for sym, meta in manifest["symbols"].items()}
+    panels = manifest["panels"]
+    end = close.shape[0] - 1
+    if not panels or "SPY" not in panels[0]["symbols"] or end < SWING_WINDOWS[2]:
+        return {}
+    short, mid, long = SWING_WINDOWS
+
+    def closes(sym):
+        return close[:, slot_of[sym]]
+
+    def ret(prices, window):
+        return window_return(prices, end, window) if prices is not None else None
+
+    def rating(slot, row):
+        value = ratings[row, slot] if 0 <= row < ratings.shape[0] else RS_MISSING
+        return None if value == RS_MISSING else int(value)
+
+    spy = closes("SPY")
+    spy_ret = {w: ret(spy, w) for w in SWING_WINDOWS}
+    scores = {}
+    for pi, panel in enumerate(panels):
+        members = panel["symbols"]
+        if panel["baseSymbol"] not in members:
+            continue
+        base = closes(panel["baseSymbol"])
+        ew_sym = EQUAL_WEIGHT_ETFS.get(panel["baseSymbol"])
+        ew = None
+        if ew_sym in members or ew_sym in panels[0]["symbols"]:
+            ew = closes(ew_sym)
+        base_ret = {w: ret(base, w) for w in SWING_WINDOWS}
+        ew_ret = {w: ret(ew, w) if ew is not None else base_ret[w] for w in SWING_WINDOWS}
+        sector_vs_spy = [(base_ret[w] or 0) - (spy_ret[w] or 0) for w in SWING_WINDOWS]
+
+        for sym in members:
+            slot = slot_of[sym]
+            prices = closes(sym)
+            stock = {w: ret(prices, w) for w in SWING_WINDOWS}
+            if stock[short] is None or stock[mid] is None:
+                continue
+            vs_cap = {w: (stock[w] or 0) - (base_ret[w] or 0) for w in SWING_WINDOWS}
+            vs_ew = {w: (stock[w] or 0) - (ew_ret[w] or 0) for w in (short, mid)}
+            vs_spy = {w: (stock[w] or 0) - (spy_ret[w] or 0) for w in SWING_WINDOWS}
+
+            structure = sum(v > 0 for v in (vs_cap[short], vs_cap[mid], vs_ew[short],
+                                            vs_ew[mid], vs_spy[short], vs_spy[mid]))
+            acceleration = sum(d[short] > d[mid] for d in (vs_cap, vs_ew, vs_spy))
+            rs_now, rs_10, rs_20 = rating(slot, end), rating(slot, end - 10), rating(slot, end - 20)
+            acceleration += rs_now is not None and rs_10 is not None and rs_now > rs_10
+            acceleration += rs_now is not None and rs_20 is not None and rs_now > rs_20
+            sector = sum(v > 0 for v in sector_vs_spy)
+            total = structure + acceleration + sector
+
+            relative = {
+                "sector": vs_cap,
+                "spy": vs_spy,
+                "absolute": {w: stock[w] or 0 for w in SWING_WINDOWS},
+            }
+            rotation, signal = {}, {}
+            for bench in SCREENER_BENCHMARKS:
+                stage = rotation_stage(*(relative[bench][w] for w in SWING_WINDOWS))
+                rotation[bench] = stage
+                signal[bench] = 0
+                if total >= 12 and stage in (1, 2) and rs_now is not None and rs_now > 75:
+                    signal[bench] = SCREENER_SIGNALS.index("BULLISH")
+                elif total <= 2 and stage in (3, 4) and rs_now is not None and rs_now < 25:
+                    signal[bench] = SCREENER_SIGNALS.index("BEARISH")
+                elif total >= 9 and stage == 1 and acceleration >= 4:
+                    signal[bench] = SCREENER_SIGNALS.index("WATCH")
+            scores[slot] = {
+                "swingTotal": total, "swingStructure": structure,
+                "swingAcceleration": acceleration, "swingSector": sector, "swingPanel": pi,
+                "swingRsRating": rs_now,
+                "vsSectorCap10d": vs_cap[short], "vsSectorCap20d": vs_cap[mid],
+                "vsSectorCap40d": vs_cap[long], "vsSPY10d": vs_spy[short], "vsSPY20d": vs_spy[mid],
+                "rotation": rotation, "signal": signal,
+            }
+    return scores
+
+
+def present(x):
+    """True for a non-NaN value (a non-null one in the dashboard's plain arrays)."""
+    return x == x
+
+
+def last_present(values):
+    for x in values[::-1]:
+        if present(x):
+            return x
+    return np.nan
+
+
+def swing_points(values, osc, start, stop, radius, is_turn, keep):
+    """Bars i in [start, stop) whose value is the extreme of the +/-radius window
+    (is_turn(neighbour, value) rejects) and whose oscillator passes keep()."""
+    n = len(values)
+    points = []
+    for i in range(start, stop):
+        if not present(values[i]) or not present(osc[i]):
+            continue
+        window = range(i - radius, min(i + radius, n - 1) + 1)
+        if any(j != i and present(values[j]) and is_turn(values[j], values[i]) for j in window):
+            continue
+        if keep(osc[i]):
+            points.append((i, values[i], osc[i]))
+    return points
+
+
+def grid_features(p, h, l, v, spy, ema8, ema21, rsi, rs):
+    """Per-symbol metrics of buildGridView() as of the last row, from the symbol's
+    full-length columns (NaN = missing): close, high, low, volume, SPY close,
+    EMA8/EMA21 (ema_columns), RSI (pairwise_rsi_columns) and RS Rating.
+
+    Returns (features, setup). The pullback flag also depends on the swing score of
+    each rotation benchmark, so only its price setup is returned for the caller."""
+    n = len(p)
+    last = last_present(p)
+    f = dict.fromkeys(SCREENER_FLAGS, False)
+    f.update(dict.fromkeys(SCREENER_FLOATS, None))
+    if not present(last):
+        return f, False
+    hi = np.where(np.isnan(h), p, h)
+    lo = np.where(np.isnan(l), p, l)
+    valid = p[~np.isnan(p)]
+
+    e8, e21 = last_present(ema8), last_present(ema21)
+    if present(e8):
+        f["ema8Dist"] = (last - e8) / e8 * 100
+        f["nearEma8"] = 0 <= f["ema8Dist"] <= 3
+    if present(e21):
+        f["ema21Dist"] = (last - e21) / e21 * 100
+        f["nearEma21"] = 0 <= f["ema21Dist"] <= 5
+
+    for key, back in (("ret1d", 2), ("ret5d", 6), ("ret2w", 11), ("ret1m", 22), ("ret3m", 65)):
+        if len(valid) >= back:
+            f[key] = (last - valid[-back]) / valid[-back] * 100
+
+    rsi_valid = rsi[~np.isnan(rsi)]
+    if len(rsi_valid) >= 6:
+        f["rsiDelta"] = rsi_valid[-1] - rsi_valid[-6]
+    if len(valid) >= 50:
+        ma50 = sum(valid[-50:].tolist()) / 50
+        trs = [max(hi[i] - lo[i], abs(hi[i] - p[i - 1]), abs(lo[i] - p[i - 1]))
+               for i in range(n - 14, n) if i >= 1 and present(p[i]) and present(p[i - 1])]
+        if trs:
+            atr = sum(trs) / len(trs)
+            f["ma50Dist"] = (last - ma50) / atr if atr > 0 else None
+
+    # ADR% = (SMA(High, 14) / SMA(Low, 14) - 1) * 100
+    days = [i for i in range(max(0, n - 14), n) if present(h[i]) and present(l[i])]
+    if days:
+        h_sum, l_sum = sum(h[days].tolist()), sum(l[days].tolist())
+        if l_sum > 0:
+            f["adrPct"] = ((h_sum / len(days)) / (l_sum / len(days)) - 1) * 100
+
+    # RS leading price: rating up 5+ over 20 sessions while price is flat or down
+    if n > 20:
+        rs_now, rs_ago = last_present(rs), rs[n - 21]
+        f["rsLeading"] = (present(rs_now) and present(rs_ago) and rs_now - rs_ago >= 5
+                          and f["ret1m"] is not None and f["ret1m"] <= 2)
+
+    # Pullback setup; the caller adds the RS Rating >= 60 / rotation 1-2 condition
+    near_ma = ((f["ema8Dist"] is not None and -3 <= f["ema8Dist"] <= 1)
+               or (f["ema21Dist"] is not None and -3 <= f["ema21Dist"] <= 2))
+    drawdown = None
+    recent = p[-20:][~np.isnan(p[-20:])] if n >= 20 else []
+    if len(recent) >= 10:
+        drawdown = (last - recent.max()) / recent.max() * 100
+    min_draw = -max(f["adrPct"], 3) if f["adrPct"] is not None else -3
+    setup = (near_ma and f["rsiDelta"] is not None and f["rsiDelta"] < 0
+             and drawdown is not None and -15 <= drawdown <= min_draw
+             and (f["ret1m"] is None or f["ret1m"] < 40))
+
+    def true_ranges(start):
+        return [max(hi[i] - lo[i], abs(hi[i] - p[i - 1]), abs(lo[i] - p[i - 1]))
+                for i in range(start, n) if i >= 1 and present(p[i]) and present(p[i - 1])]
+
+    # Volatility contraction: 5-day ATR under 70% of the 20-day ATR
+    if n >= 40:
+        atr5, atr20 = true_ranges(n - 5), true_ranges(n - 20)
+        if atr5 and atr20:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                f["volContraction"] = bool((sum(atr5) / len(atr5)) / (sum(atr20) / len(atr20)) < 0.7)
+
+    if n >= 252:
+        window = p[n - 252:][~np.isnan(p[n - 252:])]
+        if len(window) and window.max() > 0:
+            from_high = (last - window.max()) / window.max() * 100
+            f["at52wHigh"] = from_high >= -2
+            f["near52wHigh"] = from_high >= -5 and not f["at52wHigh"]
+
+    # Relative volume and pocket pivot
+    if n >= 50 and present(v[n - 1]) and v[n - 1] > 0:
+        prior = v[max(0, n - 51):n - 1]
+        prior = prior[~np.isnan(prior)]
+        if len(prior):
+            with np.errstate(divide="ignore"):
+                f["relVolume"] = v[n - 1] / (sum(prior.tolist()) / len(prior))
+        if present(p[n - 1]) and present(p[n - 2]) and p[n - 1] > p[n - 2]:
+            down = [v[i] for i in range(n - 11, n - 1)
+                    if i >= 1 and present(p[i]) and present(p[i - 1]) and present(v[i]) and p[i] < p[i - 1]]
+            max_down = max(down, default=0)
+            if max_down > 0 and v[n - 1] > max_down:
+                f["pocketPivot"] = ((f["ema8Dist"] is not None and abs(f["ema8Dist"]) <= 5)
+                                    or (f["ema21Dist"] is not None and abs(f["ema21Dist"]) <= 5))
+
+    # RS line new high: price/SPY within 1% of its 20-day high
+    if spy is not None and n >= 20:
+        ratios = [p[i] / spy[i] for i in range(n - 20, n) if present(p[i]) and present(spy[i]) and spy[i] != 0]
+        if ratios:
+            spy_last = spy[n - 1] if present(spy[n - 1]) and spy[n - 1] != 0 else 1
+            f["rsLineNewHigh"] = bool(last / spy_last >= max(ratios) * 0.99)
+
+    # Base breakout: tight base and a close above the prior 11-day high in the last 3 days
+    if f["volContraction"] and n >= 12:
+        for di in range(n - 1, n - 4, -1):
+            if not present(p[di]):
+                continue
+            prior = p[max(0, di - 11):di]
+            prior = prior[~np.isnan(prior)]
+            if len(prior) and p[di] > prior.max():
+                f["isBaseBreakout"] = True
+                break
+
+    # Accumulation: share of above-average-volume days in the last 20 that closed up
+    if n >= 21:
+        base = v[max(0, n - 51):n - 1]
+        base = base[~np.isnan(base)]
+        avg = sum(base.tolist()) / len(base) if len(base) else 0
+        if avg > 0:
+            acc = dist = 0
+            for i in range(n - 20, n):
+                if i < 1 or not (present(p[i]) and present(p[i - 1]) and present(v[i])) or not v[i] > avg:
+                    continue
+                acc += p[i] > p[i - 1]
+                dist += p[i] < p[i - 1]
+            if acc + dist:
+                f["accDayRatio"] = acc / (acc + dist)
+
+    # EMA21 reclaim: crossed above EMA21 in the last 3 days after 5+ days below
+    if n >= 30:
+        for ci in range(n - 3, n):
+            if not (present(p[ci]) and present(p[ci - 1]) and present(ema21[ci]) and present(ema21[ci - 1])):
+                continue
+            if p[ci] > ema21[ci] and p[ci - 1] <= ema21[ci - 1]:
+                below = 0
+                for bi in range(ci - 1, -1, -1):
+                    if not (present(p[bi]) and present(ema21[bi])) or p[bi] > ema21[bi]:
+                        break
+                    below += 1
+                if below >= 5:
+                    f["isEma21Reclaim"] = True
+                    break
+
+    if n >= 20:
+        recent = p[n - 20:][~np.isnan(p[n - 20:])]
+        f["isNew20dHigh"] = bool(len(recent) and last >= recent.max() * 0.99)
+
+    if n >= 40:
+        # RSI bullish divergence: lower low in price, higher low in RSI (< 40),
+        # confirmed by a close above the interim high
+        lows = swing_points(p, rsi, max(3, n - 30), n - 3, 3, lambda x, y: x < y, lambda r: r < 40)
+        if len(lows) >= 2:
+            (i1, p1, r1), (i2, p2, r2) = lows[-2:]
+            between = range(i1 + 1, i2)
+            if (i2 - i1 >= 5 and p2 < p1 and r2 > r1
+                    and not any(p[k] < p2 or rsi[k] >= 50 for k in between)):
+                interim = max((p[k] for k in between if present(p[k])), default=-np.inf)
+                if any(p[k] > interim for k in range(i2 + 1, n)):
+                    f["rsiDivergence"] = True
+                    f["rsiDivOffset"] = n - 1 - i2
+        # RSI bearish divergence: higher high in price, lower high in RSI (>= 55)
+        highs = swing_points(p, rsi, max(3, n - 50), n, 3, lambda x, y: x > y, lambda r: r >= 55)
+        if len(highs) >= 2:
+            (i1, p1, r1), (i2, p2, r2) = highs[-2:]
+            between = range(i1 + 1, i2)
+            if (i2 - i1 >= 5 and p2 > p1 and r2 < r1
+                    and not any(p[k] > p2 or rsi[k] < 45 for k in between)):
+                f["rsiBearDivPending"] = True
+                f["rsiBearDivOffset"] = n - 1 - i2
+                interim = min((p[k] for k in between if present(p[k])), default=np.inf)
+                f["rsiBearDiv"] = any(p[k] < interim for k in range(i2 + 1, n))
+
+    if n >= 50:
+        # AO over the (H+L)/2 median; only the last 50 bars are searched
+        median = (hi + lo) / 2
+        ao = np.full(n, np.nan)
+        for i in range(max(33, n - 50), n):
+            if present(median[i]) and not np.isnan(median[i - 33:i + 1]).any():
+                ao[i] = sum(median[i - 4:i + 1].tolist()) / 5 - sum(median[i - 33:i + 1].tolist()) / 34
+        # AO bullish divergence: lower low in price, higher (negative) AO low,
+        # confirmed by a close above the interim high
+        lows = swing_points(lo, ao, max(3, n - 30), n - 3, 3, lambda x, y: x < y, lambda a: a < 0)
+        if len(lows) >= 2:
+            (i1, p1, a1), (i2, p2, a2) = lows[-2:]
+            between = range(i1 + 1, i2)
+            if (i2 - i1 >= 5 and p2 < p1 and a2 > a1
+                    and not any(lo[k] < p2 or ao[k] >= 0 for k in between)):
+                interim = max((hi[k] for k in between if present(hi[k])), default=-np.inf)
+                if any(p[k] > interim for k in range(i2 + 1, n)):
+                    f["aoDivergence"] = True
+                    f["aoDivOffset"] = n - 1 - i2
+        # AO bearish divergence: higher high in price, lower (positive) AO high
+        highs = swing_points(hi, ao, max(3, n - 50), n, 3, lambda x, y: x > y, lambda a: a > 0)
+        if len(highs) >= 2:
+            (i1, p1, a1), (i2, p2, a2) = highs[-2:]
+            between = range(i1 + 1, i2)
+            if (i2 - i1 >= 5 and p2 > p1 and a2 < a1
+                    and not any(hi[k] > p2 or ao[k] < 0 for k in between)):
+                f["aoBearDivPending"] = True
+                f["aoBearDivOffset"] = n - 1 - i2
+                interim = min((lo[k] for k in between if present(lo[k])), default=np.inf)
+                f["aoBearDiv"] = any(p[k] < interim for k in range(i2 + 1, n))
+
+    # Higher lows: 3+ rising lows within the last 15 bars, above EMA21
+    if n >= 15 and present(e21) and last > e21:
+        recent_lows = lo[max(0, n - 15):]
+        recent_lows = recent_lows[~np.isnan(recent_lows)]
+        rising = 1
+        for i in range(len(recent_lows) - 1, 0, -1):
+            if not recent_lows[i] > recent_lows[i - 1]:
+                break
+            rising += 1
+        f["higherLows"] = len(recent_lows) >= 3 and rising >= 3
+
+    f["highVol"] = f["relVolume"] is not None and f["relVolume"] >= 1.5
+    f["accumulation"] = f["accDayRatio"] is not None and f["accDayRatio"] >= 0.6
+    return f, setup
+
+
+def encode_screener_table(manifest, all_data, ratings):
+    """Build the screener table: one row per store slot with the grid and swing
+    view metrics as of the last date.
+
+    Layout (offsets in the manifest entry): SCREENER_FLOATS as float32 columns
+    (NaN = none), SCREENER_BYTES as uint8 columns (255 = none), SCREENER_FLAGS
+    as bitmaps of ceil(slots / 32) little-endian uint32 words, then one index
+    per SCREENER_SORTS: the slots ordered by that column descending, missing
+    values last, ties in slot order. Returns (payload, entry)."""
+    slots = store_slots(manifest)
+    columns = [to_yf_symbol(sym) for sym in slots]
+
+    def matrix(field):
+        return all_data[field].reindex(columns=columns).to_numpy(dtype=np.float64)
+
+    close, high, low, volume = (matrix(field) for field in ("Close", "High", "Low", "Volume"))
+    ema8, ema21 = ema_columns(close, 8), ema_columns(close, 21)
+    rsi = pairwise_rsi_columns(close, INDICATOR_RSI_PERIOD)
+    rs = np.where(ratings == RS_MISSING, np.nan, ratings.astype(np.float64))
+    spy = close[:, slots.index("SPY")] if "SPY" in manifest["panels"][0]["symbols"] else None
+    swing = compute_swing_scores(manifest, close, ratings)
+
+    n = len(slots)
+    rows = []
+    for s in range(n):
+        features, setup = grid_features(close[:, s], high[:, s], low[:, s], volume[:, s],
+                                        spy, ema8[:, s], ema21[:, s], rsi[:, s], rs[:, s])
+        score = swing.get(s)
+        features["swing"] = score is not None
+        features["rsRating"] = score["swingRsRating"] if score else None
+        for key in SCREENER_BYTES:
+            features[key] = None
+        if score:
+            features.update({key: value for key, value in score.items() if key in features})
+            for bench in SCREENER_BENCHMARKS:
+                stage = score["rotation"][bench]
+                features[f"rotation_{bench}"] = stage
+                features[f"signal_{bench}"] = score["signal"][bench]
+                features[f"pullback_{bench}"] = bool(
+                    setup and score["swingRsRating"] is not None and score["swingRsRating"] >= 60
+                    and stage in (1, 2))
+        rows.append(features)
+
+    parts, offsets, offset = [], {}, 0
+
+    def add(key, array):
+        nonlocal offset
+        payload = array.tobytes()
+        offsets[key] = offset
+        parts.append(payload + b"\0" * (-len(payload) % 4))
+        offset += len(parts[-1])
+
+    floats = {}
+    for key in SCREENER_FLOATS:
+        floats[key] = np.array([np.nan if r[key] is None else r[key] for r in rows], dtype=np.float64)
+        add(key, floats[key].astype("<f4"))
+    for key in SCREENER_BYTES:
+        add(key, np.array([255 if r[key] is None else r[key] for r in rows], dtype=np.uint8))
+    words = -(-n // 32)
+    for key in SCREENER_FLAGS:
+        bits = np.zeros(words * 32, dtype=bool)
+        bits[:n] = [bool(r.get(key)) for r in rows]
+        add(key, np.packbits(bits.reshape(-1, 8), axis=1, bitorder="little").ravel().view("<u4"))
+    index_dtype = "<u2" if n <= 0xFFFF else "<u4"
+    for key in SCREENER_SORTS:
+        values = floats[key] if key in floats else np.array(
+            [np.nan if r[key] is None else r[key] for r in rows], dtype=np.float64)
+        order = np.lexsort((np.arange(n), -np.nan_to_num(values, nan=-np.inf), np.isnan(values)))
+        add(f"sort:{key}", order.astype(index_dtype))
+
+    payload = b"".join(parts)
+    entry = {
+        "file": SCREENER_FILE,
+        "hash": content_hash(payload),
+        "rows": len(manifest["dates"]),
+        "cols": n,
+        "universe": universe_fingerprint(manifest),
+        "words": words,
+        "floats": {key: offsets[key] for key in SCREENER_FLOATS},
+        "bytes": {key: offsets[key] for key in SCREENER_BYTES},
+        "flags": {key: offsets[key] for key in SCREENER_FLAGS},
+        "sorts": {key: offsets[f"sort:{key}"] for key in SCREENER_SORTS},
+        "indexType": "u2" if index_dtype == "<u2" else "u4",
+        "benchmarks": SCREENER_BENCHMARKS,
+        "signals": SCREENER_SIGNALS,
+    }
+    return payload, entry
+
+
+def write_screener_table(manifest, all_data):
+    """Write the screener table for the grid and swing views and describe it in
+    the manifest. RS Ratings are read from the matrix written just before."""
+    rs = manifest.get("rs")
+    if not rs:
+        print("  Screener: skipped (no RS ratings)")
+        return
+    ratings = read_rs_ratings(manifest)
+    payload, entry = encode_screener_table(manifest, all_data, ratings)
+    with open(os.path.join(STORE_DIR, SCREENER_FILE), "wb") as f:
+        f.write(payload)
+    count_written(len(payload))
+    manifest["screener"] = entry
+    write_manifest(manifest)
+    print(f"  Wrote {SCREENER_FILE}: {entry['cols']} symbols, {len(payload) / 1024:.0f} KB")
+
+
+def rrg_window_ratio(values, window):
+    """values / mean(non-NaN values of the trailing `window` rows) * 100, per column.
+    NaN for the first window-1 rows and where the value is NaN. Sums run oldest
+    first, as in the dashboard's loops."""
+    n = values.shape[0]
+    total = np.zeros(values.shape)
+    count = np.zeros(values.shape)
+    for lag in range(min(window, n + 1) - 1, -1, -1):
+        shifted = np.full(values.shape, np.nan)
+        shifted[lag:] = values[:n - lag]
+        present = ~np.isnan(shifted)
+        total += np.where(present, shifted, 0)
+        count += present
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = values / (total / count) * 100
+    out[:window - 1] = np.nan
+    return out
+
+
+def ema_smooth_columns(values, span):
+    """emaSmooth() of the dashboard for every column: seeded with the first non-NaN
+    value, NaN rows are skipped and stay NaN. span <= 1 returns the input."""
+    if span <= 1:
+        return values
+    k = 2 / (span + 1)
+    out = np.full(values.shape, np.nan)
+    prev = np.full(values.shape[1], np.nan)
+    for r in range(values.shape[0]):
+        row = values[r]
+        prev = np.where(np.isnan(row), prev, np.where(np.isnan(prev), row, row * k + prev * (1 - k)))
+        out[r] = np.where(np.isnan(row), np.nan, prev)
+    return out
+
+
+def rrg_tail(x, y, tail):
+    """The last `tail` rows of each column where both x and y are present, right
+    aligned: (count per column, (tail x columns x 2) points, NaN before the first)."""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    from_end = np.cumsum(valid[::-1], axis=0)[::-1]   # valid rows at or after each row
+    keep = valid & (from_end <= tail)
+    rows, cols = np.nonzero(keep)
+    points = np.full((tail, x.shape[1], 2), np.nan, dtype=np.float32)
+    points[tail - from_end[rows, cols], cols, 0] = x[rows, cols]
+    points[tail - from_end[rows, cols], cols, 1] = y[rows, cols]
+    return np.minimum(from_end[0], tail).astype(np.uint8), points
+
+
+def sample_rows(n, step):
+    """Rows getWeeklyPrices() keeps out of `n`: every `step`-th from the first, plus the last."""
+    rows = list(range(0, n, step))
+    if rows[-1] != n - 1:
+        rows.append(n - 1)
+    return rows
+
+
+def rrg_pairs(manifest):
+    """(symbol, sector ETF) pairs of the sector-benchmark trails: every panel symbol
+    against its panel's base, panels after the first in order, first pair wins."""
+    pairs = {}
+    for panel in manifest["panels"][1:]:
+        base = panel["baseSymbol"]
+        if base not in manifest["symbols"]:
+            continue
+        for sym in panel["symbols"]:
+            pairs.setdefault((sym, base), None)
+    return list(pairs)
+
+
+def rrg_series(manifest, close):
+    """RRG series as computeRRGData() / computeStockRRGData() build them, for every
+    benchmark, period and smoothing. Yields (bench, period, smooth, ratio, momentum):
+
+      RS-Ratio    = RS line / SMA(RS line, sma) * 100, EMA-smoothed
+      RS-Momentum = RS-Ratio / SMA(RS-Ratio, mom) * 100, EMA-smoothed
+
+    as (samples x rows) matrices on closes sampled every `step` rows from the first
+    date plus the last one. Rows are store slots for SPY and RSP and rrg_pairs()
+    for "sector". Daily series only read the last RRG_DAILY_WINDOW dates."""
+    slot_of = {sym: meta["slot"] for sym, meta in manifest["symbols"].items()}
+    pairs = rrg_pairs(manifest)
+    pair_rows = np.array([slot_of[sym] for sym, _ in pairs], dtype=np.intp)
+    pair_bench = np.array([slot_of[base] for _, base in pairs], dtype=np.intp)
+    n = close.shape[0]
+    for period, step, sma, mom in RRG_PERIODS:
+        sample = sample_rows(n, step)
+        if step == 1:
+            sample = sample[-RRG_DAILY_WINDOW:]
+        sampled = close[sample]
+        for bench in RRG_BENCHMARKS:
+            if bench == "sector":
+                if not pairs:
+                    continue
+                prices, bench_prices = sampled[:, pair_rows], sampled[:, pair_bench]
+            elif bench in slot_of:
+                prices, bench_prices = sampled, sampled[:, [slot_of[bench]]]
+            else:
+                continue
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rs_line = prices / bench_prices
+            rs_line[~np.isfinite(rs_line)] = np.nan
+            raw_ratio = rrg_window_ratio(rs_line, sma)
+            for smooth in RRG_SMOOTHING:
+                ratio = ema_smooth_columns(raw_ratio, smooth)
+                momentum = ema_smooth_columns(rrg_window_ratio(ratio, mom), smooth)
+                yield bench, period, smooth, ratio, momentum
+
+
+def encode_rrg_trails(manifest, close):
+    """Trail files of every rrg_series(): yields (bench, period, smooth, payload).
+    Payload: a uint8 point count per row (padded to 4 bytes), then per row
+    RRG_TAIL (x, y) float32 points, right aligned."""
+    for bench, period, smooth, ratio, momentum in rrg_series(manifest, close):
+        counts, points = rrg_tail(ratio, momentum, RRG_TAIL)
+        payload = counts.tobytes()
+        payload += b"\0" * (-len(payload) % 4)
+        payload += np.ascontiguousarray(points.transpose(1, 0, 2)).astype("<f4").tobytes()
+        yield bench, period, smooth, payload
+
+
+def encode_rrg_day(manifest, close):
+    """The newest point of every rrg_series() over `close`, i.e. as of its last row:
+    per trail file in manifest order, each row's (x, y) as float32, NaN where the
+    point is missing."""
+    return b"".join(
+        np.ascontiguousarray(np.stack([ratio[-1], momentum[-1]], axis=1)).astype("<f4").tobytes()
+        for _, _, _, ratio, momentum in rrg_series(manifest, close)
+    )
+
+
+def rrg_filename(bench, period, smooth):
+    """Relative path of one benchmark/period/smoothing trail file inside the store."""
+    return f"{RRG_DIR}/{bench}-{period}-{smooth}.bin"
+
+
+def rrg_base_rows(manifest):
+    """Rows the trail files are computed over: the store base, cut back so the last
+    row is a sample of every period. Sampled points are final once their row is
+    in, so trails of these rows never change; the weekly point of a later row that
+    is not a multiple of the step only lasts until the next date."""
+    base = manifest.get("base", len(manifest["dates"]))
+    step = max(step for _, step, _, _ in RRG_PERIODS)
+    return (base - 1) // step * step + 1
+
+
+def rrg_fingerprint(manifest):
+    """Short hash of the trail rows: store slots and the sector pairs."""
+    pairs = "\n".join(f"{sym}|{base}" for sym, base in rrg_pairs(manifest))
+    return hashlib.sha1(f"{universe_fingerprint(manifest)}\n{pairs}".encode()).hexdigest()[:16]
+
+
+def rrg_layout():
+    """The manifest's description of the trail layout; trails written with another
+    layout are recomputed."""
+    return {
+        "tail": RRG_TAIL,
+        "periods": [{"key": key, "step": step, "sma": sma, "mom": mom} for key, step, sma, mom in RRG_PERIODS],
+        "smoothing": RRG_SMOOTHING,
+    }
+
+
+def rrg_files_intact(rrg):
+    """True if every trail and day file listed in the manifest entry exists with
+    the size its rows imply."""
+    point_bytes = 2 * np.dtype("<f4").itemsize
+    expected = [(entry["file"], -(-entry["rows"] // 4) * 4 + entry["rows"] * RRG_TAIL * point_bytes)
+                for entry in rrg["files"].values()]
+    day_bytes = sum(entry["rows"] for entry in rrg["files"].values()) * point_bytes
+    expected += [(day["file"], day_bytes) for day in rrg["days"]]
+    return all(os.path.exists(os.path.join(STORE_DIR, rel)) and
+               os.path.getsize(os.path.join(STORE_DIR, rel)) == size for rel, size in expected)
+
+
+def write_rrg_trails(manifest, close):
+    """Write the RRG trail files as of rrg_base_rows(), drop the RRG day files and
+    describe the trails in the manifest. Files whose content did not change keep
+    their hash, so clients keep their cached copy. Returns bytes written."""
+    os.makedirs(os.path.join(STORE_DIR, RRG_DIR), exist_ok=True)
+    base = rrg_base_rows(manifest)
+    files, written = {}, 0
+    for bench, period, smooth, payload in encode_rrg_trails(manifest, close[:base]):
+        rel = rrg_filename(bench, period, smooth)
+        rows = len(rrg_pairs(manifest)) if bench == "sector" else len(manifest["symbols"])
+        files[f"{bench}-{period}-{smooth}"] = {"file": rel, "hash": content_hash(payload), "rows": rows}
+        written += write_if_changed(os.path.join(STORE_DIR, rel), payload)
+    referenced = {os.path.join(STORE_DIR, entry["file"]) for entry in files.values()}
+    for path in glob.glob(os.path.join(STORE_DIR, RRG_DIR, "*.bin")):
+        if path not in referenced:
+            os.remove(path)
+    for path in glob.glob(os.path.join(STORE_DIR, RRG_DIR, RRG_DAY_DIR, "*.bin")):
+        os.remove(path)
+
+    manifest["rrg"] = {
+        "base": base,
+        "rows": base,
+        "sectorRows": len(rrg_pairs(manifest)),
+        "universe": rrg_fingerprint(manifest),
+        **rrg_layout(),
+        "files": files,
+        "days": [],
+    }
+    return written
+
+
+def update_rrg_trails(manifest, all_data):
+    """Bring the RRG trails up to the last store date. Each date added since the
+    last run becomes one day file with the newest point of every trail; the trail
+    files themselves are only rewritten when the store base moves, the universe,
+    sector pairs or layout change, or the files do not line up."""
+    rrg = manifest.get("rrg")
+    dates = manifest["dates"]
+    n = len(dates)
+    reason = None
+    if not rrg or "days" not in rrg:
+        reason = "no existing trails"
+    elif rrg.get("universe") != rrg_fingerprint(manifest):
+        reason = "universe changed"
+    elif any(rrg.get(key) != value for key, value in rrg_layout().items()):
+        reason = "layout changed"
+    elif rrg["base"] != rrg_base_rows(manifest):
+        reason = "store base moved"
+    elif rrg["rows"] > n or not rrg_files_intact(rrg):
+        reason = "files do not match the date axis"
+
+    close = store_close_matrix(manifest, all_data)
+    written = 0
+    if reason:
+        written = write_rrg_trails(manifest, close)
+        rrg = manifest["rrg"]
+        print(f"  RRG trails: rewrote {len(rrg['files'])} trail files as of {rrg['base']} dates ({reason})")
+    elif rrg["rows"] == n:
+        print("  RRG trails: up to date")
+        return
+
+    os.makedirs(os.path.join(STORE_DIR, RRG_DIR, RRG_DAY_DIR), exist_ok=True)
+    for row in range(rrg["rows"], n):
+        payload = encode_rrg_day(manifest, close[:row + 1])
+        rel = f"{RRG_DIR}/{RRG_DAY_DIR}/{dates[row]}.bin"
+        written += write_if_changed(os.path.join(STORE_DIR, rel), payload)
+        rrg["days"].append({"date": dates[row], "file": rel, "hash": content_hash(payload)})
+    added = n - rrg["rows"]
+    rrg["rows"] = n
+    write_manifest(manifest)
+    print(f"  RRG trails: {added} day file(s), {written / 1024:.0f} KB written")
+
+
+def rolling_columns(values, window, how):
+    """Trailing `window`-row max / min / mean per column, NaN skipped (NaN when the
+    window has no value)."""
+    roll = pd.DataFrame(values).rolling(window, min_periods=1)
+    return getattr(roll, how)().to_numpy()
+
+
+def shift_rows(values, by=1):
+    """values moved down `by` rows, NaN filled at the top."""
+    out = np.full(values.shape, np.nan)
+    out[by:] = values[:-by]
+    return out
+
+
+def onset(state):
+    """True where `state` holds and did not on the row before."""
+    before = np.zeros(state.shape, dtype=bool)
+    before[1:] = state[:-1]
+    return state & ~before
+
+
+def signal_event_matrices(close, high, low, volume, spy, ema8, ema21):
+    """{type: (fired, strength)} as (dates x slots) matrices for the signals found
+    without swing points, each as grid_features() would flag it with that date as
+    the last row. The 20-day high and RS line high hold for days on end, so they
+    fire on the first date of a run only."""
+    n = close.shape[0]
+    prev = shift_rows(close)
+    history = np.arange(n)[:, None] + 1     # rows up to and including each date
+    hi = np.where(np.isnan(high), close, high)
+    lo = np.where(np.isnan(low), close, low)
+    events = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Pocket pivot: an up close on more volume than any down day of the prior 10,
+        # within 5% of EMA8 or EMA21
+        max_down = shift_rows(rolling_columns(np.where(close < prev, volume, np.nan), 10, "max"))
+        near_ma = (np.abs(close - ema8) / ema8 * 100 <= 5) | (np.abs(close - ema21) / ema21 * 100 <= 5)
+        fired = (history >= 50) & (close > prev) & (volume > 0) & (max_down > 0) & (volume > max_down) & near_ma
+        events["pocketPivot"] = (fired, volume / max_down)
+
+        # Base breakout: a close above the prior 11-day high while the 5-day ATR is
+        # under 70% of the 20-day ATR
+        tr = np.where(np.isnan(prev), np.nan,
+                      np.maximum(hi - lo, np.maximum(np.abs(hi - prev), np.abs(lo - prev))))
+        tight = rolling_columns(tr, 5, "mean") / rolling_columns(tr, 20, "mean") < 0.7
+        prior_high = shift_rows(rolling_columns(close, 11, "max"))
+        fired = (history >= 40) & tight & (close > prior_high)
+        events["isBaseBreakout"] = (fired, (close / prior_high - 1) * 100)
+
+        # EMA21 reclaim: a cross above EMA21 after 5+ closes at or below it
+        below = np.zeros(close.shape)
+        run = np.zeros(close.shape[1])
+        for r in range(n):
+            run = np.where(close[r] <= ema21[r], run + 1, 0)
+            below[r] = run
+        below = shift_rows(below)
+        fired = (history >= 30) & (close > ema21) & (prev <= shift_rows(ema21)) & (below >= 5)
+        events["isEma21Reclaim"] = (fired, below)
+
+        # 20-day high: within 1% of the 20-day closing high
+        state = (history >= 20) & (close >= rolling_columns(close, 20, "max") * 0.99)
+        fired = onset(state)
+        events["isNew20dHigh"] = (fired, (close / shift_rows(rolling_columns(close, 19, "max")) - 1) * 100)
+
+        # RS line high: close / SPY within 1% of its 20-day high
+        if spy is not None:
+            ratio = close / np.where(spy == 0, np.nan, spy)[:, None]
+            state = (history >= 20) & (ratio >= rolling_columns(ratio, 20, "max") * 0.99)
+            fired = onset(state)
+            events["rsLineNewHigh"] = (fired, (ratio / shift_rows(rolling_columns(ratio, 19, "max")) - 1) * 100)
+    return events
+
+
+def swing_turns(values, osc, lowest, keep):
+    """Indices (from 3) whose value is the extreme of its +/-3 window (NaN neighbours
+    ignored, as swing_points()) and whose oscillator passes keep()."""
+    roll = pd.Series(values).rolling(7, center=True, min_periods=1)
+    extreme = (roll.min() if lowest else roll.max()).to_numpy()
+    with np.errstate(invalid="ignore"):
+        turn = ~np.isnan(values) & ~np.isnan(osc) & (values == extreme) & keep(osc)
+    turn[:3] = False
+    return np.flatnonzero(turn)
+
+
+def divergence_events(p, ext, interim_src, osc, turns, window, bullish, keep, osc_bad, start):
+    """Confirmed divergences between consecutive swing points `turns` of `ext`, as
+    [(date, first point, second point)] for dates >= start.
+
+    Bullish: a lower low in price with a higher oscillator low and nothing lower (or
+    an oscillator past osc_bad) in between, confirmed by a close above the interim
+    high of `interim_src`; bearish mirrored. The event is dated once both the second
+    point (3 bars on) and the confirmation are known, and only while grid_features()
+    would still pair the two points: the first within `window` bars, no later turn
+    (for highs, none in the last 3 bars either, judged on windows cut at the date)."""
+    events = []
+    n = len(p)
+    for t in range(len(turns) - 1):
+        i1, i2 = turns[t], turns[t + 1]
+        if i2 - i1 < 5 or i1 + window - 1 < start:
+            continue
+        v1, v2, o1, o2 = ext[i1], ext[i2], osc[i1], osc[i2]
+        if bullish and not (v2 < v1 and o2 > o1) or not bullish and not (v2 > v1 and o2 < o1):
+            continue
+        between = slice(i1 + 1, i2)
+        with np.errstate(invalid="ignore"):
+            beyond = ext[between] < v2 if bullish else ext[between] > v2
+            if beyond.any() or osc_bad(osc[between]).any():
+                continue
+            src = interim_src[between]
+            src = src[~np.isnan(src)]
+            interim = (src.max() if len(src) else -np.inf) if bullish else (src.min() if len(src) else np.inf)
+            after = p[i2 + 1:]
+            crossed = np.flatnonzero(after > interim if bullish else after < interim)
+        if not len(crossed):
+            continue
+        date = max(i2 + 1 + crossed[0], i2 + 3)
+        later = turns[t + 2] if t + 2 < len(turns) else n
+        if date < start or date >= n or date > i1 + window - 1 or later <= date - 3:
+            continue
+        if not bullish and any(keep(osc[i]) and ext[i] >= np.nanmax(ext[i - 3:date + 1])
+                               for i in range(max(i2 + 1, date - 2), date + 1) if present(ext[i])):
+            # grid_features() searches highs up to the last row, windows cut there
+            continue
+        events.append((date, i1, i2))
+    return events
+
+
+def detect_signal_events(manifest, all_data, start=0):
+    """Every signal event dated `start` or later as (slot, date, type, strength)
+    arrays. An event only depends on the rows up to its date, so events already
+    found stay valid when days are appended.
+
+    Strength per type: pocket pivot volume / the largest prior down-day volume;
+    breakout, 20-day high and RS line high % above the prior high; EMA21 reclaim
+    closes below it beforehand; RSI divergences the RSI difference of the two
+    points; AO divergences their AO difference as % of price."""
+    slots = store_slots(manifest)
+    columns = [to_yf_symbol(sym) for sym in slots]
+
+    def matrix(field):
+        return all_data[field].reindex(columns=columns).to_numpy(dtype=np.float64)
+
+    close, high, low, volume = (matrix(field) for field in ("Close", "High", "Low", "Volume"))
+    ema8, ema21 = ema_columns(close, 8), ema_columns(close, 21)
+    rsi = pairwise_rsi_columns(close, INDICATOR_RSI_PERIOD)
+    spy = close[:, slots.index("SPY")] if "SPY" in manifest["symbols"] else None
+    hi = np.where(np.isnan(high), close, high)
+    lo = np.where(np.isnan(low), close, low)
+    # AO as in grid_features(): NaN unless the whole 34-bar median window is present
+    median = pd.DataFrame((hi + lo) / 2)
+    ao = (median.rolling(5).mean() - median.rolling(34).mean()).to_numpy()
+
+    found = {"slot": [], "date": [], "type": [], "strength": []}
+
+    def add(slot, dates, kind, strength):
+        found["slot"].append(np.full(len(dates), slot))
+        found["date"].append(np.asarray(dates))
+        found["type"].append(np.full(len(dates), EVENT_TYPES.index(kind)))
+        found["strength"].append(np.asarray(strength, dtype=np.float64))
+
+    for kind, (fired, strength) in signal_event_matrices(close, high, low, volume, spy, ema8, ema21).items():
+        fired[:start] = False
+        dates, cols = np.nonzero(fired)
+        add(cols, dates, kind, strength[dates, cols])
+
+    # Divergences pair swing points at most 50 bars apart, so only the rows from
+    # EVENT_CONTEXT before `start` are searched
+    base = max(0, start - EVENT_CONTEXT)
+    close, hi, lo, rsi, ao = (values[base:] for values in (close, hi, lo, rsi, ao))
+    for s in range(len(slots)):
+        p = close[:, s]
+        # grid_features() looks for RSI divergences from 40 rows of history, AO ones from 50
+        for kind, ext, interim_src, osc, window, bullish, keep, osc_bad, scale, rows in (
+            ("rsiDivergence", p, p, rsi[:, s], 30, True, lambda r: r < 40, lambda r: r >= 50, None, 40),
+            ("rsiBearDiv", p, p, rsi[:, s], 50, False, lambda r: r >= 55, lambda r: r < 45, None, 40),
+            ("aoDivergence", lo[:, s], hi[:, s], ao[:, s], 30, True, lambda a: a < 0, lambda a: a >= 0, lo[:, s], 50),
+            ("aoBearDiv", hi[:, s], lo[:, s], ao[:, s], 50, False, lambda a: a > 0, lambda a: a < 0, hi[:, s], 50),
+        ):
+            turns = swing_turns(ext, osc, bullish, keep)
+            events = divergence_events(p, ext, interim_src, osc, turns, window, bullish, keep, osc_bad,
+                                       max(start, rows - 1) - base)
+            if not events:
+                continue
+            dates, first, second = (np.array(x) for x in zip(*events))
+            diff = osc[second] - osc[first] if bullish else osc[first] - osc[second]
+            add(s, dates + base, kind, diff / scale[second] * 100 if scale is not None else diff)
+
+    if not found["slot"]:
+        return tuple(np.zeros(0, dtype=dtype) for dtype in (np.int64, np.int64, np.int64, np.float64))
+    return tuple(np.concatenate(found[key]) for key in ("slot", "date", "type", "strength"))
+
+
+def encode_signal_events(n_slots, slot, date, kind, strength):
+    """Events sorted by (slot, date, type). Layout: uint32 start offset of each slot's
+    events plus the total (n_slots + 1), then float32 strengths, uint16 date
+    indices and uint8 type indices. Returns (payload, offsets of the columns)."""
+    order = np.lexsort((kind, date, slot))
+    starts = np.searchsorted(slot[order], np.arange(n_slots + 1)).astype("<u4")
+    strengths = np.nan_to_num(strength[order], nan=0.0, posinf=0.0, neginf=0.0).astype("<f4")
+    parts = [starts.tobytes(), strengths.tobytes(), date[order].astype("<u2").tobytes(),
+             kind[order].astype(np.uint8).tobytes()]
+    offsets, offset = {}, 0
+    for key, part in zip(("starts", "strength", "date", "type"), parts):
+        offsets[key] = offset
+        offset += len(part)
+    return b"".join(parts), offsets
+
+
+def decode_signal_events(buf, n_slots, count):
+    """Inverse of encode_signal_events(): (slot, date, type, strength) arrays."""
+    starts = np.frombuffer(buf, dtype="<u4", count=n_slots + 1)
+    offset = starts.nbytes
+    strength = np.frombuffer(buf, dtype="<f4", count=count, offset=offset).astype(np.float64)
+    offset += count * 4
+    date = np.frombuffer(buf, dtype="<u2", count=count, offset=offset).astype(np.int64)
+    kind = np.frombuffer(buf, dtype=np.uint8, count=count, offset=offset + count * 2).astype(np.int64)
+    slot = np.repeat(np.arange(n_slots), np.diff(starts.astype(np.int64)))
+    return slot, date, kind, strength
+
+
+def write_signal_events(manifest, slot, date, kind, strength):
+    """Write the event index as one part per store_row_parts() range, each holding
+    the events dated in its rows, and describe it in the manifest. Past years are
+    byte-identical from run to run and are not rewritten, so a new date costs one
+    small part. Returns bytes written."""
+    n_slots = len(manifest["symbols"])
+    os.makedirs(os.path.join(STORE_DIR, EVENT_DIR), exist_ok=True)
+    parts, written = [], 0
+    for label, r0, r1 in store_row_parts(manifest):
+        keep = (date >= r0) & (date < r1)
+        payload, offsets = encode_signal_events(n_slots, slot[keep], date[keep], kind[keep], strength[keep])
+        rel = f"{EVENT_DIR}/{label}.bin"
+        written += write_if_changed(os.path.join(STORE_DIR, rel), payload)
+        parts.append({"file": rel, "rows": [r0, r1], "hash": content_hash(payload),
+                      "count": int(keep.sum()), "offsets": offsets})
+    referenced = {os.path.join(STORE_DIR, part["file"]) for part in parts}
+    for path in glob.glob(os.path.join(STORE_DIR, EVENT_DIR, "*.bin")):
+        if path not in referenced:
+            os.remove(path)
+    legacy = os.path.join(STORE_DIR, "events.bin")   # single-file layout
+    if os.path.exists(legacy):
+        os.remove(legacy)
+
+    manifest["events"] = {
+        "dir": EVENT_DIR,
+        "parts": parts,
+        "rows": len(manifest["dates"]),
+        "cols": n_slots,
+        "count": int(len(slot)),
+        "universe": universe_fingerprint(manifest),
+        "types": EVENT_TYPES,
+    }
+    write_manifest(manifest)
+    return written
+
+
+def read_signal_events(manifest):
+    """All published events, (slot, date, type, strength) arrays in part order."""
+    events = manifest["events"]
+    decoded = []
+    for part in events["parts"]:
+        with open(os.path.join(STORE_DIR, part["file"]), "rb") as f:
+            decoded.append(decode_signal_events(f.read(), events["cols"], part["count"]))
+    return [np.concatenate(column) for column in zip(*decoded)]
+
+
+def update_signal_events(manifest, all_data):
+    """Scan the dates added since the last run for signal events and merge them into
+    the index. Falls back to a scan of the full history when there is no usable
+    index: after a full refresh, a universe change, or parts that do not match."""
+    events = manifest.get("events")
+    n = len(manifest["dates"])
+    reason = None
+    if not events or "parts" not in events:
+        reason = "no existing index"
+    elif events.get("universe") != universe_fingerprint(manifest) or events["cols"] != len(manifest["symbols"]):
+        reason = "universe changed"
+    elif events["rows"] > n or events.get("types") != EVENT_TYPES or not all(
+            os.path.exists(os.path.join(STORE_DIR, part["file"])) and
+            os.path.getsize(os.path.join(STORE_DIR, part["file"])) == (events["cols"] + 1) * 4 + part["count"] * 7
+            for part in events["parts"]):
+        reason = "index does not match the date axis"
+    if reason:
+        print(f"  Signal events: full scan ({reason})")
+        written = write_signal_events(manifest, *detect_signal_events(manifest, all_data))
+        print(f"  Wrote {EVENT_DIR}/: {manifest['events']['count']} events in "
+              f"{len(manifest['events']['parts'])} parts, {written / 1024:.0f} KB written")
+        return
+
+    old = read_signal_events(manifest)
+    if events["rows"] == n:
+        if [p["rows"] for p in events["parts"]] == [[r0, r1] for _, r0, r1 in store_row_parts(manifest)]:
+            print("  Signal events: up to date")
+            return
+        new = [column[:0] for column in old]   # store compacted: regroup the parts
+    else:
+        new = detect_signal_events(manifest, all_data, start=events["rows"])
+    written = write_signal_events(manifest, *(np.concatenate(pair) for pair in zip(old, new)))
+    print(f"  Added {len(new[0])} event(s) on {n - events['rows']} new date(s) to {EVENT_DIR}/, "
+          f"{written / 1024:.0f} KB written")
+
+
+def write_analytics(manifest):
+    """Recompute the derived artifacts published next to the store. Inputs are read
+    back from the store so they match exactly what the dashboard sees."""
+    print("\nComputing analytics...")
+    with timed_stage("load_store"):
+        all_data = load_store(manifest)
+    with timed_stage("rs_ratings"):
+        update_rs_ratings(manifest, all_data)
+    with timed_stage("indicator_bundles"):
+        update_indicator_bundles(manifest, all_data)
+    with timed_stage("screener"):
+        write_screener_table(manifest, all_data)
+    with timed_stage("rrg_trails"):
+        update_rrg_trails(manifest, all_data)
+    with timed_stage("signal_events"):
+        update_signal_events(manifest, all_data)
+
+
+def legacy_panel_paths():
+    """Paths of panel_NN.json files written before the columnar store existed."""
+    return sorted(glob.glob(os.path.join(DATA_DIR, "panel_[0-9][0-9].json")))
+
+
+def migrate_legacy_panels():
+    """Convert legacy panel_NN.json files into the store and remove them.
+    Returns the new manifest, or None if there was nothing to migrate."""
+    paths = legacy_panel_paths()
+    if not paths:
+        return None
+    print(f"Migrating {len(paths)} legacy panel file(s) into {STORE_DIR}/")
+
+    frames = {field: {} for field in ("Close", "Open", "High", "Low", "Volume")}
+    index = None
+    for path in paths:
+        with open(path) as f:
+            panel = json.load(f)
+        panel_index = pd.DatetimeIndex(pd.to_datetime(panel["dates"]))
+        index = panel_index if index is None else index.union(panel_index)
+        ohlc = panel.get("ohlc", {})
+        volume = panel.get("volume", {})
+        for sym in panel["symbols"]:
+            col = to_yf_symbol(sym)
+            if col in frames["Close"]:
+                continue
+            sym_ohlc = ohlc.get(sym, {})
+            for field, values in [("Close", panel["prices"].get(sym)),
+                                  ("Open", sym_ohlc.get("o")),
+                                  ("High", sym_ohlc.get("h")),
+                                  ("Low", sym_ohlc.get("l")),
+                                  ("Volume", volume.get(sym))]:
+                if values is None:
+                    continue
+                # Older incremental runs could double-append a day; keep the
+                # most recent values aligned with the end of the date axis
+                values = ([None] * (len(panel_index) - len(values)) + values)[-len(panel_index):]
+                frames[field][col] = pd.Series(values, index=panel_index, dtype=np.float64)
+
+    all_data = {
+        field: pd.DataFrame(cols).reindex(index)
+        for field, cols in frames.items()
+    }
+    manifest = write_store(all_data)
+    for path in paths:
+        os.remove(path)
+    return manifest
+
+
+def load_or_migrate_store():
+    """The store manifest, converting legacy panel_NN.json files into the store
+    first if there is none yet. None when there is neither."""
+    manifest = load_store_manifest()
+    if manifest is None:
+        manifest = migrate_legacy_panels()
+    return manifest if manifest and manifest.get("dates") else None
+
+
+class RawCache:
+    """Per-ticker raw OHLCV history under cache/ohlcv/<TICKER>.npz plus cache/meta.json
+    (last cached date and fetch day per ticker, company names)."""
+
+    def __init__(self, root=None):
+        self.root = root or CACHE_DIR
+        self.meta_path = os.path.join(self.root, "meta.json")
+        self.meta = {"tickers": {}, "names": {}}
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path) as f:
+                    self.meta.update(json.load(f))
+            except (json.JSONDecodeError, OSError):
+                pass
+
+    def path(self, ticker):
+        return os.path.join(self.root, "ohlcv", f"{ticker}.npz")
+
+    def get(self, ticker):
+        """Cached history as a DataFrame with OHLCV_FIELDS columns, or None."""
+        if ticker not in self.meta["tickers"] or not os.path.exists(self.path(ticker)):
+            return None
+        with np.load(self.path(ticker)) as npz:
+            index = pd.DatetimeIndex(npz["dates"].astype("datetime64[ns]"))
+            return pd.DataFrame({field: npz[field] for field in OHLCV_FIELDS}, index=index)
+
+    def put(self, ticker, frame):
+        os.makedirs(os.path.join(self.root, "ohlcv"), exist_ok=True)
+        frame = frame.dropna(subset=["Close"])
+        np.savez(
+            self.path(ticker),
+            dates=frame.index.values.astype("datetime64[D]"),
+            **{field: frame[field].to_numpy(dtype=np.float64) for field in OHLCV_FIELDS},
+        )
+        count_written(os.path.getsize(self.path(ticker)))
+        self.meta["tickers"][ticker] = {
+            "last": frame.index[-1].strftime("%Y-%m-%d") if len(frame) else None,
+            "fetched": datetime.now().strftime("%Y-%m-%d"),
+        }
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.meta_path, "w") as f:
+            json.dump(self.meta, f)
+        count_written(os.path.getsize(self.meta_path))
+
+
+def ticker_frame(frames, ticker):
+    """One ticker's columns out of fetch_all_data() frames, or None if it has no closes."""
+    close = frames.get("Close")
+    if close is None or ticker not in close.columns or close[ticker].notna().sum() == 0:
+        return None
+    return pd.DataFrame({
+        field: frames[field][ticker] if frames.get(field) is not None and ticker in frames[field].columns
+        else np.nan
+        for field in OHLCV_FIELDS
+    }, index=close.index)
+
+
+def adjustment_changed(cached, fresh):
+    """True if closes on overlapping dates differ, i.e. Yahoo re-adjusted history
+    for a split or dividend since it was cached."""
+    overlap = cached.index.intersection(fresh.index)
+    old = cached.loc[overlap, "Close"]
+    new = fresh.loc[overlap, "Close"]
+    both = old.notna() & new.notna() & (old != 0)
+    if not both.any():
+        return False
+    return bool((np.abs(new[both] / old[both] - 1) > CACHE_ADJUST_TOLERANCE).any())
+
+
+def refresh_raw_cache(tickers, scheduler=None, cache=None):
+    """Bring the raw cache up to date and return fetch_all_data()-shaped frames
+    covering the last HISTORY_YEARS years.
+
+    Uncached tickers get full history. Cached tickers only fetch the gap since
+    their last cached date, starting CACHE_OVERLAP_ROWS rows earlier so the
+    overlap can be compared; tickers whose overlap no longer matches (split or
+    dividend re-adjustment) are re-fetched in full."""
+    cache = cache or RawCache()
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    full = []
+    gaps = {}  # overlap start date -> tickers
+    cached = {}
+    with timed_stage("cache_read"):
+        for ticker in tickers:
+            frame = cache.get(ticker)
+            if frame is None or frame.empty:
+                full.append(ticker)
+                continue
+            cached[ticker] = frame
+            if cache.meta["tickers"][ticker].get("fetched") == today:
+                continue
+            start = frame.index[max(0, len(frame) - CACHE_OVERLAP_ROWS)].strftime("%Y-%m-%d")
+            gaps.setdefault(start, []).append(ticker)
+
+    print(f"Raw cache: {len(cached)} cached, {len(full)} uncached, "
+          f"{sum(len(g) for g in gaps.values())} to extend")
+
+    adjusted = []
+    for start, group in sorted(gaps.items()):
+        fresh = fetch_all_data(group, start=start, scheduler=scheduler)
+        for ticker in group:
+            new = ticker_frame(fresh, ticker)
+            if new is None:
+                continue
+            old = cached[ticker]
+            if adjustment_changed(old, new):
+                adjusted.append(ticker)
+                continue
+            merged = pd.concat([old, new.loc[new.index > old.index[-1]]])
+            cache.put(ticker, merged)
+            cached[ticker] = merged
+    if adjusted:
+        print(f"  Adjustment changed for {len(adjusted)} ticker(s), re-fetching full history: "
+              f"{', '.join(sorted(adjusted))}")
+
+    refetch = full + adjusted
+    if refetch:
+        fresh = fetch_all_data(refetch, period=f"{HISTORY_YEARS}y", scheduler=scheduler)
+        for ticker in refetch:
+            new = ticker_frame(fresh, ticker)
+            if new is not None:
+                cache.put(ticker, new)
+                cached[ticker] = new
+    cache.save()
+
+    if not cached:
+        return {field: None for field in OHLCV_FIELDS}
+    with timed_stage("cache_merge"):
+        index = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in cached.values()))))
+        cutoff = index[-1] - pd.DateOffset(years=HISTORY_YEARS)
+        index = index[index >= cutoff]
+        return {
+            field: pd.DataFrame({ticker: frame[field] for ticker, frame in cached.items()}).reindex(index)
+            for field in OHLCV_FIELDS
+        }
+
+
+def fetch_company_names(tickers, cache=None, lookup=True):
+    """Company names keyed by original panel symbol. Names already known from
+    the cache or data/stock_names.json are reused; only new tickers hit yfinance,
+    and none do with lookup=False."""
+    cache = cache or RawCache()
+    names = dict(cache.meta.get("names", {}))
+    if os.path.exists(NAMES_FILE):
+        try:
+            with open(NAMES_FILE) as f:
+                names = {**json.load(f), **names}
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    panel_syms = set(unique_panel_symbols())
+
+    def orig_symbol(sym):
+        # Restore original symbol format (with '/')
+        alt = sym.replace("-", "/")
+        return alt if "-" in sym and alt in panel_syms else sym
+
+    missing = [sym for sym in tickers if orig_symbol(sym) not in names]
+    if not lookup:
+        print(f"\nCompany names: {len(tickers) - len(missing)} known, {len(missing)} not looked up")
+        missing = []
+    else:
+        print(f"\nFetching company names for {len(missing)} new ticker(s) "
+              f"({len(tickers) - len(missing)} cached)...")
+    batch_size = 100
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        try:
+            tickers_obj = yf.Tickers(" ".join(batch))
+            for sym in batch:
+                try:
+                    info = tickers_obj.tickers[sym].info
+                    name = info.get("shortName") or info.get("longName") or ""
+                    if name:
+                        names[orig_symbol(sym)] = name
+                except Exception:
+                    pass
+        except Exception as e:
+            print(f"  Error in names batch {i // batch_size + 1}: {e}")
+        print(f"  Names batch {i // batch_size + 1}: {len(batch)} tickers")
+
+    cache.meta["names"] = names
+    wanted = {orig_symbol(sym) for sym in tickers}
+    return {sym: name for sym, name in names.items() if sym in wanted}
 
 
 def save_last_full_refresh():
@@ -315,33 +2868,109 @@ def check_full_refresh_reminder():
     days_ago = (datetime.now() - last).days
     if days_ago > 30:
         print(f"Note: Last full refresh was {days_ago} days ago. "
-              f"Run with --mode full periodically to pick up split adjustments.")
+              f"Run with --mode full periodically to pick up split adjustments "
+              f"(cached tickers are only re-downloaded if their adjustment changed).")
 
 
 def get_last_date():
-    """Read panel_01.json and return the last date string, or None."""
-    path = os.path.join(DATA_DIR, "panel_01.json")
-    if not os.path.exists(path):
-        return None
-    try:
-        with open(path) as f:
-            data = json.load(f)
-        if data.get("dates"):
-            return data["dates"][-1]
-    except (json.JSONDecodeError, OSError):
-        pass
+    """Return the last date string in the store, or None."""
+    manifest = load_store_manifest()
+    if manifest and manifest.get("dates"):
+        return manifest["dates"][-1]
     return None
 
 
-def incremental_update():
-    """Append new trading days to existing panel JSON files."""
+def universe_diff(manifest):
+    """Compare the watchlist panels with the store. Returns (added, removed) symbol
+    lists in original notation, added in panel order."""
+    wanted = unique_panel_symbols()
+    stored = manifest["symbols"]
+    added = [sym for sym in wanted if sym not in stored]
+    removed = sorted(set(stored) - set(wanted))
+    return added, removed
+
+
+def write_company_names(names):
+    with open(NAMES_FILE, "w") as f:
+        json.dump(names, f, indent=0)
+    count_written(os.path.getsize(NAMES_FILE))
+    print(f"  Wrote stock_names.json: {len(names)} names, {os.path.getsize(NAMES_FILE) / 1024:.0f} KB")
+
+
+def sync_universe(manifest, scheduler=None, cache=None, lookup_names=True):
+    """Bring the store in line with the watchlist panels without a full refresh.
+
+    Only symbols added to a watchlist are downloaded (full history, through the
+    raw cache); symbols no longer in any panel are dropped. The store is then
+    rewritten on its existing date axis with the new slot order and panel
+    manifests, and stock_names.json is updated for the changed symbols.
+    Returns (manifest, changed)."""
+    added, removed = universe_diff(manifest)
+    if not added and not removed:
+        panels = [build_panel_manifest(panel, manifest["symbols"], i) for i, panel in enumerate(PANELS)]
+        if panels == manifest["panels"]:
+            return manifest, False
+
+    print(f"\nUniverse changed: {len(added)} added, {len(removed)} removed")
+    if added:
+        print(f"  Added: {', '.join(added)}")
+    if removed:
+        print(f"  Removed: {', '.join(removed)}")
+
+    cache = cache or RawCache()
+    all_data = load_store(manifest)
+    backfilled = []
+    if added:
+        backfill = refresh_raw_cache([to_yf_symbol(sym) for sym in added], scheduler=scheduler, cache=cache)
+        backfilled = [sym for sym in added if find_column(backfill["Close"], sym) is not None]
+        for field in OHLCV_FIELDS:
+            if backfill[field] is not None:
+                frame = backfill[field].reindex(all_data[field].index)
+                all_data[field] = pd.concat([all_data[field], frame], axis=1)
+        print(f"  Backfilled {len(backfilled)}/{len(added)} added symbol(s)")
+        if not backfilled and not removed:
+            cache.save()
+            return manifest, False
+    for field in OHLCV_FIELDS:
+        all_data[field] = all_data[field].drop(columns=[to_yf_symbol(sym) for sym in removed])
+
+    # write_store() keeps the symbols of the current panels, in panel order
+    analytics = {key: manifest[key] for key in STORE_ANALYTICS_KEYS if key in manifest}
+    manifest = write_store(all_data)
+    manifest.update(analytics)
+    write_manifest(manifest)
+
+    if os.path.exists(NAMES_FILE):
+        with open(NAMES_FILE) as f:
+            names = json.load(f)
+        panel_syms = set(unique_panel_symbols())
+        names = {sym: name for sym, name in names.items() if sym in panel_syms}
+        names.update(fetch_company_names([to_yf_symbol(sym) for sym in backfilled], cache=cache,
+                                         lookup=lookup_names))
+        write_company_names(names)
+    cache.save()
+    return manifest, True
+
+
+def incremental_update(scheduler=None, lookup_names=True):
+    """Append new trading days to the columnar store as day files.
+    Compacts once STORE_COMPACT_DAYS day files have accumulated."""
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Incremental update started")
 
-    last_date_str = get_last_date()
-    if not last_date_str:
+    manifest = load_or_migrate_store()
+    if not manifest:
         print("ERROR: No existing data found. Run with --mode full first.")
         sys.exit(1)
+    if manifest.get("version") != STORE_VERSION:
+        manifest = compact_store(manifest)
 
+    # Watchlist edits: backfill only the added symbols, drop removed ones
+    with timed_stage("universe_sync"):
+        manifest, changed = sync_universe(manifest, scheduler=scheduler, lookup_names=lookup_names)
+    if changed:
+        write_analytics(manifest)
+
+    last_date_str = manifest["dates"][-1]
     last_date = datetime.strptime(last_date_str, "%Y-%m-%d")
     start_date = last_date + timedelta(days=1)
     today = datetime.now()
@@ -358,133 +2987,51 @@ def incremental_update():
     # Collect all unique tickers
     all_tickers = get_all_unique_tickers()
     print(f"Total unique tickers: {len(all_tickers)}")
+    count_run("tickers", len(all_tickers))
 
     # Fetch only the new date range
-    all_data = fetch_all_data(
+    new_data = fetch_all_data(
         all_tickers,
         start=start_date.strftime("%Y-%m-%d"),
+        scheduler=scheduler,
     )
-    close_data = all_data["Close"]
-    open_data = all_data["Open"]
-    high_data = all_data["High"]
-    low_data = all_data["Low"]
-    volume_data = all_data.get("Volume")
+    close_data = new_data["Close"]
 
     if close_data is None or close_data.empty:
         print("No new trading data available (weekend/holiday?).")
         return
 
-    new_dates = [d.strftime("%Y-%m-%d") for d in close_data.index]
+    # Filter out any dates already in the store (prevent dupes)
+    fresh = ~close_data.index.isin(pd.to_datetime(manifest["dates"]))
+    if not fresh.any():
+        print("All fetched dates already present, nothing to append.")
+        return
+
+    fresh_index = close_data.index[fresh]
+    new_dates = [d.strftime("%Y-%m-%d") for d in fresh_index]
     print(f"\nFetched {len(new_dates)} new trading day(s): {new_dates[0]} to {new_dates[-1]}")
 
-    def round_val(val):
-        if val is not None and not (isinstance(val, float) and val != val):
-            return round(float(val), 4)
-        return None
+    # Append-only: one new day file per date plus the manifest.
+    # Symbols not in the new download are stored as NaN by the reindex.
+    count_run("new_dates", len(new_dates))
+    with timed_stage("day_files"):
+        written = write_day_files(manifest, new_data, fresh_index)
+        write_manifest(manifest)
+    print(f"  Wrote {len(new_dates)} day file(s), {written / 1024:.0f} KB "
+          f"({len(manifest['days'])} pending compaction)")
 
-    def int_val(val):
-        if val is not None and not (isinstance(val, float) and val != val):
-            return int(val)
-        return None
+    if len(manifest["days"]) >= STORE_COMPACT_DAYS:
+        with timed_stage("compact"):
+            manifest = compact_store(manifest)
 
-    # Append to each panel JSON
-    for i, panel in enumerate(PANELS):
-        filename = f"panel_{i + 1:02d}.json"
-        filepath = os.path.join(DATA_DIR, filename)
+    write_analytics(manifest)
 
-        # Load existing data
-        try:
-            with open(filepath) as f:
-                existing = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            print(f"  WARNING: {filename} missing or corrupt, skipping. Run --mode full to fix.")
-            continue
+    print(f"\nDone! Store updated with {len(new_dates)} new trading day(s).")
 
-        # Filter out any dates already in the existing data (prevent dupes)
-        existing_date_set = set(existing["dates"])
-        dates_to_add = [d for d in new_dates if d not in existing_date_set]
-        if not dates_to_add:
-            print(f"  {filename}: all dates already present, skipping")
-            continue
-        date_mask = [d in set(dates_to_add) for d in new_dates]
-
-        # Append new dates
-        existing["dates"].extend(dates_to_add)
-
-        # Ensure ohlc and volume dicts exist
-        if "ohlc" not in existing:
-            existing["ohlc"] = {}
-        if "volume" not in existing:
-            existing["volume"] = {}
-
-        # Append new prices + OHLC + volume for each symbol already in the panel
-        symbols_in_new_data = set()
-        for sym in existing["symbols"]:
-            yf_sym = sym.replace("/", "-")
-            col = None
-            if yf_sym in close_data.columns:
-                col = yf_sym
-            elif sym in close_data.columns:
-                col = sym
-
-            if col is not None:
-                symbols_in_new_data.add(sym)
-                c_series = close_data[col]
-                o_series = open_data[col] if open_data is not None and col in open_data.columns else None
-                h_series = high_data[col] if high_data is not None and col in high_data.columns else None
-                l_series = low_data[col] if low_data is not None and col in low_data.columns else None
-                v_series = volume_data[col] if volume_data is not None and col in volume_data.columns else None
-
-                # Ensure ohlc arrays exist for this symbol
-                n_existing = len(existing["dates"]) - len(dates_to_add)
-                if sym not in existing["ohlc"]:
-                    existing["ohlc"][sym] = {
-                        "o": [None] * n_existing,
-                        "h": [None] * n_existing,
-                        "l": [None] * n_existing,
-                    }
-                if sym not in existing["volume"]:
-                    existing["volume"][sym] = [None] * n_existing
-
-                for j, val in enumerate(c_series):
-                    if not date_mask[j]:
-                        continue
-                    existing["prices"][sym].append(round_val(val))
-                    existing["ohlc"][sym]["o"].append(round_val(o_series.iloc[j]) if o_series is not None else None)
-                    existing["ohlc"][sym]["h"].append(round_val(h_series.iloc[j]) if h_series is not None else None)
-                    existing["ohlc"][sym]["l"].append(round_val(l_series.iloc[j]) if l_series is not None else None)
-                    existing["volume"][sym].append(int_val(v_series.iloc[j]) if v_series is not None else None)
-            else:
-                # Symbol not in new download — fill with nulls
-                for _ in dates_to_add:
-                    existing["prices"][sym].append(None)
-                    if sym in existing.get("ohlc", {}):
-                        existing["ohlc"][sym]["o"].append(None)
-                        existing["ohlc"][sym]["h"].append(None)
-                        existing["ohlc"][sym]["l"].append(None)
-                    if sym in existing.get("volume", {}):
-                        existing["volume"][sym].append(None)
-
-        # Check for symbols in panel definition but not in existing data
-        existing_syms = set(existing["symbols"])
-        panel_syms = set(panel["symbols"])
-        new_syms = panel_syms - existing_syms
-        if new_syms:
-            print(f"  WARNING: {filename} missing symbols {new_syms}. "
-                  f"Run --mode full to add them with full history.")
-
-        # Write updated file
-        with open(filepath, "w") as f:
-            json.dump(existing, f)
-
-        size_kb = os.path.getsize(filepath) / 1024
-        print(f"  Updated {filename}: +{len(new_dates)} dates, {size_kb:.0f} KB")
-
-    print(f"\nDone! {len(PANELS)} panel files updated with {len(new_dates)} new trading day(s).")
-
-
-def full_refresh():
-    """Full 5-year download — original behavior."""
+
+def full_refresh(scheduler=None, use_cache=True, lookup_names=True):
+    """Full 5-year rebuild of the store. With the raw cache only the gap since the
+    last run (and tickers with changed adjustments) is downloaded."""
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Full refresh started")
 
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -492,79 +3039,675 @@ def full_refresh():
     # Collect all unique tickers
     all_tickers = get_all_unique_tickers()
     print(f"Total unique tickers: {len(all_tickers)}")
+    count_run("tickers", len(all_tickers))
 
-    # Fetch all data at once
-    all_data = fetch_all_data(all_tickers, period="5y")
+    cache = RawCache()
+    if use_cache:
+        with timed_stage("raw_cache"):
+            all_data = refresh_raw_cache(all_tickers, scheduler=scheduler, cache=cache)
+    else:
+        all_data = fetch_all_data(all_tickers, period=f"{HISTORY_YEARS}y", scheduler=scheduler)
     close_data = all_data["Close"]
 
     if close_data is None or close_data.empty:
         print("ERROR: No data was downloaded. Check your internet connection.")
         sys.exit(1)
 
-    print(f"\nDownloaded data for {len(close_data.columns)} tickers, {len(close_data)} trading days")
+    print(f"\nLoaded data for {len(close_data.columns)} tickers, {len(close_data)} trading days")
     print(f"Date range: {close_data.index[0].strftime('%Y-%m-%d')} to {close_data.index[-1].strftime('%Y-%m-%d')}")
 
-    # Build and write JSON for each panel
-    for i, panel in enumerate(PANELS):
-        panel_json = build_panel_json(panel, all_data, i)
-        filename = f"panel_{i + 1:02d}.json"
-        filepath = os.path.join(DATA_DIR, filename)
+    # Write the deduplicated store (panels become symbol-list manifests)
+    with timed_stage("store_write"):
+        manifest = write_store(all_data)
+    count_run("symbols", len(manifest["symbols"]))
+    count_run("dates", len(manifest["dates"]))
+    for i, panel in enumerate(manifest["panels"]):
+        print(f"  Panel {i + 1:02d}: {len(panel['symbols'])} symbols")
 
-        with open(filepath, "w") as f:
-            json.dump(panel_json, f)
+    # Legacy per-panel files are superseded by the store
+    for path in legacy_panel_paths():
+        os.remove(path)
 
-        size_kb = os.path.getsize(filepath) / 1024
-        print(f"  Wrote {filename}: {len(panel_json['symbols'])} symbols, {size_kb:.0f} KB")
+    write_analytics(manifest)
 
     # Build stock names mapping
-    print("\nFetching company names...")
-    names = {}
-    batch_size = 100
-    for i in range(0, len(all_tickers), batch_size):
-        batch = all_tickers[i:i + batch_size]
+    with timed_stage("names"):
+        names = fetch_company_names(all_tickers, cache=cache, lookup=lookup_names)
+        cache.save()
+        write_company_names(names)
+
+    save_last_full_refresh()
+    print(f"\nDone! Store ({len(manifest['symbols'])} symbols) + stock_names.json written to {DATA_DIR}/")
+
+
+def parse_shard(spec):
+    """argparse type for --shard: "i/N" with 1 <= i <= N, as (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {spec!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {spec} out of range (need 1 <= i <= N)")
+    return index, count
+
+
+def shard_tickers(tickers, index, count):
+    """Shard `index` of `count` (1-based): every count-th ticker in sorted order,
+    so shard sizes differ by at most one and every runner agrees on the split."""
+    return sorted(tickers)[index - 1::count]
+
+
+def ticker_fingerprint(tickers):
+    """Short hash of a ticker list; shards fetched for other watchlists differ."""
+    return hashlib.sha1("\n".join(sorted(tickers)).encode()).hexdigest()[:16]
+
+
+def shard_path(index, count, root=None):
+    return os.path.join(root or SHARD_DIR, f"{index}-of-{count}")
+
+
+def fetch_shard_tail(tickers, manifest, scheduler=None):
+    """fetch_all_data()-shaped frames for an incremental shard: only the bars after
+    the store's last date for tickers already in the store, full history for ones a
+    watchlist added since (sync_universe backfills those in the merge). Returns
+    (frames, tickers left out because the store is already up to date)."""
+    stored = {to_yf_symbol(sym) for sym in manifest["symbols"]}
+    tails = [ticker for ticker in tickers if ticker in stored]
+    added = [ticker for ticker in tickers if ticker not in stored]
+    start = datetime.strptime(manifest["dates"][-1], "%Y-%m-%d") + timedelta(days=1)
+    current = []
+    if start.date() > datetime.now().date():
+        current, tails = tails, []
+    print(f"Store ends {manifest['dates'][-1]}: {len(tails)} ticker(s) from {start.strftime('%Y-%m-%d')}, "
+          f"{len(added)} added with full history" + (", store already up to date" if current else ""))
+
+    frames = {field: None for field in OHLCV_FIELDS}
+    for group, kwargs in ((tails, {"start": start.strftime("%Y-%m-%d")}),
+                          (added, {"period": f"{HISTORY_YEARS}y"})):
+        if not group:
+            continue
+        fresh = fetch_all_data(group, scheduler=scheduler, **kwargs)
+        for field in OHLCV_FIELDS:
+            if fresh[field] is not None:
+                frames[field] = fresh[field] if frames[field] is None else pd.concat([frames[field], fresh[field]], axis=1)
+    return frames, current
+
+
+def fetch_shard(index, count, mode="full", scheduler=None, use_cache=True, root=None):
+    """Download one shard of the universe into shards/<i>-of-<N>/.
+
+    In full mode the shard's tickers are brought up to date in the raw cache
+    exactly as a full refresh would (only the gap since the last run with the
+    cache). In incremental mode the raw cache is not read: only the bars after
+    the store's last date are fetched (full history for tickers not in the store
+    yet), as an unsharded incremental update would. Either way the frames and
+    company names are written as a RawCache directory plus SHARD_META listing
+    the tickers it covers and the ones that failed. Nothing in data/ is touched
+    beyond the conversion of legacy panel files an incremental update would make
+    (the merge converts the same files to the same store); `merge` builds the
+    store from all shards. Without a store or legacy panels to update, an
+    incremental shard is fetched as a full one."""
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Shard {index}/{count} {mode} fetch started")
+
+    all_tickers = get_all_unique_tickers()
+    tickers = shard_tickers(all_tickers, index, count)
+    print(f"Shard {index}/{count}: {len(tickers)} of {len(all_tickers)} tickers")
+    count_run("tickers", len(tickers))
+
+    manifest = None
+    if mode == "incremental":
+        manifest = load_or_migrate_store()
+        if not manifest:
+            print("No existing data found: fetching the shard in full.")
+            mode = "full"
+
+    path = shard_path(index, count, root)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+
+    cache = RawCache()
+    current = []
+    if manifest:
+        with timed_stage("download"):
+            frames, current = fetch_shard_tail(tickers, manifest, scheduler=scheduler)
+    elif use_cache:
+        with timed_stage("raw_cache"):
+            frames = refresh_raw_cache(tickers, scheduler=scheduler, cache=cache)
+    else:
+        frames = fetch_all_data(tickers, period=f"{HISTORY_YEARS}y", scheduler=scheduler)
+
+    out = RawCache(path)
+    fetched, failed = [], []
+    with timed_stage("shard_write"):
+        for ticker in tickers:
+            if ticker in current:
+                continue
+            frame = ticker_frame(frames, ticker)
+            if frame is None:
+                failed.append(ticker)
+                continue
+            out.put(ticker, frame)
+            fetched.append(ticker)
+
+    with timed_stage("names"):
+        out.meta["names"] = fetch_company_names(tickers, cache=cache)
+        if not manifest:
+            cache.save()
+    out.save()
+
+    close = frames["Close"]
+    record = {
+        "index": index,
+        "count": count,
+        "mode": mode,
+        "base": manifest["dates"][-1] if manifest else None,
+        "universe": ticker_fingerprint(all_tickers),
+        "tickers": tickers,
+        "fetched": fetched,
+        "failed": failed,
+        "last": close.index[-1].strftime("%Y-%m-%d") if close is not None and len(close) else None,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    dump_json(record, os.path.join(path, SHARD_META))
+    if failed:
+        print(f"  WARNING: no data for {len(failed)} ticker(s): {', '.join(failed)}")
+    print(f"\nDone! Shard {index}/{count}: {len(fetched)}/{len(tickers)} tickers written to {path}/")
+
+
+def check_shards(root=None):
+    """Read the shard outputs under `root` and check them against the current
+    watchlists. Returns (shards, problems): the SHARD_META records in shard
+    order and one line per problem that makes a merge unsafe (unfinished,
+    missing or duplicate shards, mixed split counts, stale ticker lists)."""
+    root = root or SHARD_DIR
+    records, problems = [], []
+    for path in sorted(glob.glob(os.path.join(root, "*", ""))):
+        meta = os.path.join(path, SHARD_META)
+        if not os.path.exists(meta):
+            problems.append(f"{os.path.basename(path.rstrip(os.sep))}: no {SHARD_META}, the shard did not finish")
+            continue
+        with open(meta) as f:
+            record = json.load(f)
+        record["path"] = path
+        records.append(record)
+
+    counts = sorted({record["count"] for record in records})
+    if not counts:
+        problems.append(f"no shard outputs in {root}")
+        return [], problems
+    if len(counts) > 1:
+        problems.append(f"shards split {' and '.join(map(str, counts))} ways; re-run them with one --shard i/N")
+        return records, problems
+    count = counts[0]
+
+    by_index = {}
+    for record in records:
+        index = record["index"]
+        if index in by_index:
+            problems.append(f"shard {index}/{count} found twice: {by_index[index]['path']} and {record['path']}")
+        by_index[index] = record
+    missing = [f"{index}/{count}" for index in range(1, count + 1) if index not in by_index]
+    if missing:
+        problems.append(f"missing shard(s): {', '.join(missing)}")
+
+    all_tickers = get_all_unique_tickers()
+    stale = [f"{index}/{count}" for index, record in sorted(by_index.items())
+             if record["universe"] != ticker_fingerprint(all_tickers)]
+    if stale:
+        # With a shard missing its tickers are unknown, so only complete sets name the change
+        fetched = set().union(*(record["tickers"] for record in records)) if not missing else set(all_tickers)
+        added = sorted(set(all_tickers) - fetched)
+        removed = sorted(fetched - set(all_tickers))
+        problems.append(f"watchlists changed since shard(s) {', '.join(stale)} were fetched"
+                        + (f"; added: {', '.join(added)}" if added else "")
+                        + (f"; removed: {', '.join(removed)}" if removed else ""))
+    else:
+        for index, record in sorted(by_index.items()):
+            if record["tickers"] != shard_tickers(all_tickers, index, count):
+                problems.append(f"shard {index}/{count} does not hold the tickers of shard {index}/{count}")
+    return [by_index[index] for index in sorted(by_index)], problems
+
+
+class CacheProvider(DownloadProvider):
+    """Daily bars served from a RawCache instead of the network. `merge` runs the
+    regular full or incremental update through it once the shards are imported,
+    so the store is built by the same code as an unsharded run."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def download(self, tickers, period=None, start=None, end=None):
+        frames = {}
+        for ticker in tickers:
+            frame = self.cache.get(ticker)
+            if frame is None:
+                continue
+            if start:
+                frame = frame.loc[frame.index >= pd.Timestamp(start)]
+            if end:
+                frame = frame.loc[frame.index < pd.Timestamp(end)]
+            frames[ticker] = frame
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+
+def import_shards(shards, cache, manifest=None):
+    """Copy every shard's histories and company names into the raw cache.
+
+    Incremental shards hold only the bars after the store's last date for the
+    tickers in `manifest`; those are appended to the cached history. A ticker the
+    cache is missing, or has not followed up to the store's last date, takes its
+    history from the store instead of being re-downloaded."""
+    stored = {to_yf_symbol(sym) for sym in manifest["symbols"]} if manifest else set()
+    store_data = None
+    for record in shards:
+        part = RawCache(record["path"])
+        for ticker in record["fetched"]:
+            frame = part.get(ticker)
+            if frame is None:
+                continue
+            if ticker in stored:
+                history = cache.get(ticker)
+                if history is None or history.empty or history.index[-1] < pd.Timestamp(record["base"]):
+                    if store_data is None:
+                        store_data = load_store(manifest)
+                    held = ticker_frame(store_data, ticker)
+                    if held is not None:
+                        held = held.dropna(subset=["Close"])
+                        history = held if history is None or history.empty else \
+                            pd.concat([history, held.loc[held.index > history.index[-1]]])
+                if history is not None and not history.empty:
+                    frame = pd.concat([history, frame.loc[frame.index > history.index[-1]]])
+            cache.put(ticker, frame)
+        cache.meta["names"].update(part.meta.get("names", {}))
+    cache.save()
+
+
+def merge_shards(mode="full", root=None):
+    """Validate the shard outputs and build data/ from them.
+
+    Refuses to merge (exit 1) when any shard is missing, unfinished or stale,
+    or was fetched incremental against another store, naming each one.
+    Otherwise the shards are imported into the raw cache and the regular full
+    refresh or incremental update runs against it through CacheProvider,
+    without network access. An incremental merge first converts legacy panel
+    files, and runs as a full refresh when there is no data to update."""
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Shard merge started")
+
+    with timed_stage("shard_check"):
+        shards, problems = check_shards(root)
+    if problems:
+        print(f"ERROR: cannot merge the shards in {root or SHARD_DIR}:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+
+    # Incremental shards hold only the bars after the store's last date: they need
+    # the store they were fetched against, and cannot seed a full refresh
+    manifest = load_or_migrate_store() if mode == "incremental" else None
+    if mode == "incremental" and not manifest:
+        print("No existing data found: merging as a full refresh.")
+        mode = "full"
+    last = manifest["dates"][-1] if manifest else None
+    for record in shards:
+        fetched_mode = record.get("mode", "full")
+        if fetched_mode == "incremental" and mode != "incremental":
+            problems.append(f"shard {record['index']}/{record['count']} was fetched incremental, "
+                            f"re-run it with --mode {mode}")
+        elif fetched_mode == "incremental" and record["base"] != last:
+            problems.append(f"shard {record['index']}/{record['count']} was fetched after {record['base']} "
+                            f"but the store ends {last or 'nowhere'}")
+    if problems:
+        print(f"ERROR: cannot merge the shards in {root or SHARD_DIR}:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+
+    count = shards[0]["count"]
+    print(f"Merging {count} shard(s), {sum(len(r['fetched']) for r in shards)} tickers")
+    for record in shards:
+        if record["failed"]:
+            print(f"  WARNING: shard {record['index']}/{count} has no data for "
+                  f"{len(record['failed'])} ticker(s): {', '.join(record['failed'])}")
+    count_run("shards", count)
+
+    cache = RawCache()
+    with timed_stage("shard_import"):
+        import_shards(shards, cache, manifest)
+
+    # Local reads: no throttling, and a ticker the shards did not have will not appear on retry
+    scheduler = DownloadScheduler(provider=CacheProvider(cache), rate=1e9, burst=1e9, retries=0)
+    if mode == "incremental":
+        incremental_update(scheduler=scheduler, lookup_names=False)
+    else:
+        full_refresh(scheduler=scheduler, lookup_names=False)
+
+
+class QuoteProvider:
+    """Source of the in-progress session bar used by live mode.
+
+    quotes() returns (date, bars): the session date as YYYY-MM-DD and
+    {ticker: (open, high, low, close, volume)} for the tickers it has a quote
+    for. Tickers without one may be absent; date is None when there is none."""
+
+    def quotes(self, tickers):
+        raise NotImplementedError
+
+
+class ScheduledQuoteProvider(QuoteProvider):
+    """Last daily bar of each ticker through the download scheduler; during the
+    session yf.download() returns the day so far as the last bar."""
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or DownloadScheduler(retries=0)
+
+    def quotes(self, tickers):
+        frames, _ = self.scheduler.run(tickers, period="1d")
+        close = frames["Close"]
+        if close is None or close.empty:
+            return None, {}
+        last = close.index[-1]
+        rows = [frames[field].loc[last] if frames[field] is not None else None
+                for field in ("Open", "High", "Low", "Close", "Volume")]
+        bars = {
+            ticker: tuple(row.get(ticker, np.nan) if row is not None else np.nan for row in rows)
+            for ticker in close.columns
+        }
+        return last.strftime("%Y-%m-%d"), bars
+
+
+class RandomWalkQuoteProvider(QuoteProvider):
+    """Offline quote feed: each call moves a random share of the tickers one
+    step from their last bar, starting at `closes` ({ticker: last close}).
+    Drives live mode, and its benchmarks, without a network."""
+
+    def __init__(self, closes, date, step=0.002, active=0.3, seed=0):
+        self.closes = closes
+        self.date = date
+        self.step = step
+        self.active = active
+        self.rng = np.random.default_rng(seed)
+        self.bars = {}
+
+    def quotes(self, tickers):
+        moves = self.rng.normal(0, self.step, len(tickers))
+        moving = self.rng.random(len(tickers)) < self.active
+        for ticker, move, moved in zip(tickers, moves, moving):
+            bar = self.bars.get(ticker)
+            if bar is None:
+                close = self.closes.get(ticker)
+                if close is None or not np.isfinite(close):
+                    continue
+                bar = (close, close, close, close, 0.0)
+            elif not moved:
+                continue
+            o, h, l, c, v = bar
+            c *= 1 + move
+            self.bars[ticker] = (o, max(h, c), min(l, c), c, v + float(self.rng.integers(100, 10_000)))
+        return self.date, {t: self.bars[t] for t in tickers if t in self.bars}
+
+
+def live_bar(bar):
+    """Quote tuple as the [o, h, l, c, v] list sent to the dashboard (prices to the
+    store's 4 decimals, None for missing values), or None without a close."""
+    o, h, l, c, v = (float(x) if x is not None and np.isfinite(x) else None for x in bar)
+    if c is None:
+        return None
+    return [round(x, 4) if x is not None else None for x in (o, h, l, c)] + [round(v) if v is not None else None]
+
+
+class LiveSession:
+    """In-progress session bars of the store universe, polled from a QuoteProvider.
+
+    poll() records the bars that changed since the previous poll as one numbered
+    diff and wakes the SSE streams; updates_since() brings a stream at a given
+    diff number up to date. Streams that are new, or further behind than the
+    diffs kept, get the whole session as a snapshot instead."""
+
+    def __init__(self, manifest, provider):
+        self.symbols = {to_yf_symbol(sym): sym for sym in manifest["symbols"]}
+        self.provider = provider
+        self.date = None
+        self.bars = {}
+        self.seq = 0
+        self.history = deque(maxlen=LIVE_HISTORY)
+        self.changed = threading.Condition()
+
+    def poll(self):
+        """Fetch quotes for every symbol. Returns {sym: bar} of the bars that changed."""
+        date, quotes = self.provider.quotes(list(self.symbols))
+        if date is None:
+            return {}
+        with self.changed:
+            if date != self.date:
+                # A new session: the previous session's bars no longer apply
+                self.date = date
+                self.bars = {}
+                self.history.clear()
+            diff = {}
+            for ticker, quote in quotes.items():
+                sym = self.symbols.get(ticker)
+                bar = live_bar(quote) if sym else None
+                if bar is not None and self.bars.get(sym) != bar:
+                    diff[sym] = bar
+            if diff:
+                self.bars.update(diff)
+                self.seq += 1
+                self.history.append((self.seq, diff))
+                self.changed.notify_all()
+        return diff
+
+    def updates_since(self, seq):
+        """([(event, payload)], seq) for a stream that has seen diffs up to `seq`."""
+        with self.changed:
+            if self.date is None or seq == self.seq:
+                return [], seq
+            if seq > self.seq or not self.history or seq < self.history[0][0] - 1:
+                return [("snapshot", {"date": self.date, "seq": self.seq, "bars": dict(self.bars)})], self.seq
+            return [("bars", {"date": self.date, "seq": n, "bars": diff})
+                    for n, diff in self.history if n > seq], self.seq
+
+    def wait(self, seq, timeout):
+        """Block until a diff after `seq` is recorded or `timeout` seconds pass."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.seq != seq, timeout)
+
+
+class LiveRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the repository (dashboard and data/) plus the /live SSE stream."""
+
+    def __init__(self, *args, session=None, **kwargs):
+        self.session = session
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/live":
+            return super().do_GET()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        last = self.headers.get("Last-Event-ID", "")
+        seq = int(last) if last.isdigit() else -1
         try:
-            tickers_obj = yf.Tickers(" ".join(batch))
-            for sym in batch:
-                try:
-                    info = tickers_obj.tickers[sym].info
-                    name = info.get("shortName") or info.get("longName") or ""
-                    if name:
-                        # Restore original symbol format (with '/')
-                        orig_sym = sym.replace("-", "/") if "-" in sym and sym.replace("-", "/") in {
-                            s for p in PANELS for s in p["symbols"]
-                        } else sym
-                        names[orig_sym] = name
-                except Exception:
-                    pass
-        except Exception as e:
-            print(f"  Error in names batch {i // batch_size + 1}: {e}")
-        print(f"  Names batch {i // batch_size + 1}: {len(batch)} tickers")
+            while True:
+                messages, seq = self.session.updates_since(seq)
+                for event, payload in messages:
+                    data = json.dumps(payload, separators=(",", ":"))
+                    self.wfile.write(f"id: {payload['seq']}\nevent: {event}\ndata: {data}\n\n".encode())
+                if not messages:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                self.session.wait(seq, LIVE_HEARTBEAT)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        # One line per data file request would bury the poll log
+        pass
 
-    names_path = os.path.join(DATA_DIR, "stock_names.json")
-    with open(names_path, "w") as f:
-        json.dump(names, f, indent=0)
-    print(f"  Wrote stock_names.json: {len(names)} names, {os.path.getsize(names_path) / 1024:.0f} KB")
 
-    save_last_full_refresh()
-    print(f"\nDone! {len(PANELS)} JSON files + stock_names.json written to {DATA_DIR}/")
+def fake_quote_provider(manifest):
+    """RandomWalkQuoteProvider from the store's last closes, for the next business day."""
+    closes = load_store(manifest)["Close"].ffill().iloc[-1]
+    date = (pd.Timestamp(manifest["dates"][-1]) + pd.offsets.BDay()).strftime("%Y-%m-%d")
+    return RandomWalkQuoteProvider(closes.to_dict(), date)
+
+
+def live_session(provider=None, interval=LIVE_INTERVAL, port=LIVE_PORT):
+    """Poll session bars every `interval` seconds and serve them until interrupted."""
+    manifest = load_store_manifest()
+    if not manifest:
+        print("ERROR: No store found. Run a full refresh first.")
+        sys.exit(1)
+
+    session = LiveSession(manifest, provider or ScheduledQuoteProvider())
+    handler = partial(LiveRequestHandler, session=session, directory=WATCHLIST_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    count_run("symbols", len(session.symbols))
+    print(f"Live mode: open http://127.0.0.1:{port}/index.html?live "
+          f"({len(session.symbols)} symbols, polled every {interval:.0f}s; Ctrl-C to stop)")
+
+    try:
+        while True:
+            started = time.monotonic()
+            with timed_stage("live_poll"):
+                try:
+                    diff = session.poll()
+                except Exception as e:
+                    print(f"  Quote poll failed: {e}")
+                    diff = {}
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {session.date or 'no session'}: "
+                  f"{len(diff)} bar(s) changed")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\nLive mode stopped")
+    finally:
+        server.shutdown()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Fetch sector relative strength data via yfinance.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["update", "merge"],
+        default="update",
+        help="update = fetch and write data/ (default); merge = build data/ from --shard outputs",
+    )
     parser.add_argument(
         "--mode",
-        choices=["full", "incremental"],
+        choices=["full", "incremental", "live"],
         default="full",
-        help="full = re-download 5y history (default); incremental = append new days only",
+        help="full = re-download 5y history (default); incremental = append new days only; "
+             "live = serve the dashboard with in-progress session bars",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="with --mode incremental: fold pending day files into the base chunks",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DOWNLOAD_CONCURRENCY,
+        help=f"download batches in flight at once (default {DOWNLOAD_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DOWNLOAD_RATE,
+        help=f"max download requests per second (default {DOWNLOAD_RATE})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="with --mode full (also sharded): ignore the raw cache and re-download full history",
+    )
+    parser.add_argument(
+        "--quotes",
+        choices=["yfinance", "fake"],
+        default="yfinance",
+        help="with --mode live: quote source (fake = offline random walk from the store)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=LIVE_INTERVAL,
+        help=f"with --mode live: seconds between quote polls (default {LIVE_INTERVAL:.0f})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=LIVE_PORT,
+        help=f"with --mode live: port of the local server (default {LIVE_PORT})",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="fetch only shard I of N of the tickers into --shard-dir for a later merge "
+             "(with --mode incremental: only the bars after the store's last date)",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=SHARD_DIR,
+        help="where --shard writes and merge reads shard outputs (default shards/)",
+    )
+    parser.add_argument(
+        "--report",
+        default=RUN_REPORT_FILE,
+        help="where to write the JSON run report (default logs/run_report.json)",
     )
     args = parser.parse_args()
+    if args.shard and (args.command == "merge" or args.mode == "live"):
+        parser.error("--shard only applies to full and incremental updates")
+    if args.command == "merge" and args.mode == "live":
+        parser.error("merge builds a full or incremental update")
 
     os.makedirs(DATA_DIR, exist_ok=True)
+    scheduler = DownloadScheduler(concurrency=args.concurrency, rate=args.rate)
 
-    if args.mode == "incremental":
-        incremental_update()
+    if args.command == "merge":
+        report = start_run_report(f"merge {args.mode}")
+    elif args.shard:
+        report = start_run_report(f"shard {args.shard[0]}/{args.shard[1]}")
     else:
-        full_refresh()
+        report = start_run_report(args.mode)
+    try:
+        if args.command == "merge":
+            merge_shards(args.mode, root=args.shard_dir)
+        elif args.shard:
+            fetch_shard(*args.shard, mode=args.mode, scheduler=scheduler, use_cache=not args.no_cache,
+                        root=args.shard_dir)
+        elif args.mode == "incremental":
+            incremental_update(scheduler=scheduler)
+            manifest = load_store_manifest()
+            if args.compact and manifest and manifest.get("days"):
+                with timed_stage("compact"):
+                    manifest = compact_store(manifest)
+                write_analytics(manifest)
+        elif args.mode == "live":
+            manifest = load_store_manifest()
+            if args.quotes == "fake" and manifest:
+                provider = fake_quote_provider(manifest)
+            else:
+                provider = ScheduledQuoteProvider(
+                    DownloadScheduler(concurrency=args.concurrency, rate=args.rate, retries=0))
+            live_session(provider=provider, interval=args.interval, port=args.port)
+        else:
+            full_refresh(scheduler=scheduler, use_cache=not args.no_cache)
+        report.status = "ok"
+    except BaseException as e:
+        report.status = "failed"
+        report.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        report.summary()
+        report.save(args.report)
 
 
 if __name__ == "__main__":